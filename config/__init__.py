@@ -13,6 +13,7 @@ from .settings import (
     OSCILLATION_BUFFER_SIZE,
     MIN_OSCILLATION_SAMPLES,
     ENTROPY_BUFFER_SIZE,
+    SETTINGS,
 )
 
 __all__ = [
@@ -26,4 +27,5 @@ __all__ = [
     "OSCILLATION_BUFFER_SIZE",
     "MIN_OSCILLATION_SAMPLES",
     "ENTROPY_BUFFER_SIZE",
+    "SETTINGS",
 ]
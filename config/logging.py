@@ -2,12 +2,120 @@
 Logging configuration
 """
 
+import atexit
 import logging
+import os
 import sys
+import threading
+import time
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from queue import Queue
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 
-from .settings import LOG_LEVEL, LOG_FORMAT, LOG_FILE, DEBUG
+from .settings import (
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_FILE,
+    LOG_BUFFER_CAPACITY,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    DEBUG,
+)
+
+
+# ログレベル名 -> 数値（不明な名前はINFO扱い）
+_LEVELS: Dict[str, int] = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+class CachedFormatter(logging.Formatter):
+    """asctime の秒単位部分をキャッシュするフォーマッタ"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_time: Tuple[Optional[int], str] = (None, "")
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        """同一秒内のレコードではstrftimeを再計算しない"""
+        second = int(record.created)
+        cached_second, time_str = self._cached_time
+        if second != cached_second:
+            time_str = time.strftime(datefmt or self.default_time_format, self.converter(record.created))
+            self._cached_time = (second, time_str)
+        
+        # ミリ秒は秒未満なのでレコードごとに付加
+        if datefmt or not self.default_msec_format:
+            return time_str
+        return self.default_msec_format % (time_str, record.msecs)
+
+
+# フォーマッタは一度だけ生成して全ハンドラで共有
+_STD_FORMATTER = CachedFormatter(LOG_FORMAT)
+_DEBUG_FORMATTER = CachedFormatter(
+    '%(asctime)s - %(name)s - %(levelname)s - '
+    '%(filename)s:%(lineno)d - %(funcName)s() - %(message)s'
+)
+
+# 生成済みハンドラのキャッシュ（(出力先, レベル) -> ハンドラ）
+_HANDLER_CACHE: Dict[Tuple[str, int], logging.Handler] = {}
+
+# 作成済みのログディレクトリ
+_MKDIR_CACHE: Set[str] = set()
+
+# 非同期ロギング用のキューとリスナー（I/Oは専用スレッドで実行）
+# ハンドラの組み合わせごとに1組のキューハンドラとリスナーを持ち、
+# ロガーごとの出力先・レベルが他のロガーの設定で上書きされないようにする
+_listeners: Dict[Tuple[logging.Handler, ...], Tuple[QueueHandler, QueueListener]] = {}
+_listener_lock = threading.Lock()
+_atexit_registered = False
+
+
+def _get_queue_handler(handlers: Tuple[logging.Handler, ...]) -> QueueHandler:
+    """ハンドラの組み合わせに対応するキューハンドラを取得（リスナーは初回に起動）"""
+    global _atexit_registered
+    with _listener_lock:
+        entry = _listeners.get(handlers)
+        if entry is None:
+            queue: Queue = Queue(-1)
+            listener = QueueListener(queue, *handlers, respect_handler_level=True)
+            listener.start()
+            entry = _listeners[handlers] = (QueueHandler(queue), listener)
+            if not _atexit_registered:
+                atexit.register(_stop_listeners)
+                _atexit_registered = True
+        return entry[0]
+
+
+def _stop_listeners():
+    """キューに残ったレコードを書き出してすべてのリスナーを停止"""
+    with _listener_lock:
+        for _, listener in _listeners.values():
+            listener.stop()
+            # バッファリング中のレコードもディスクへ書き出す
+            for handler in listener.handlers:
+                handler.flush()
+        _listeners.clear()
+
+
+def _reset_after_fork():
+    """フォーク後の子プロセスではリスナースレッドが存在しないため再作成する"""
+    global _listener_lock
+    _listener_lock = threading.Lock()
+    for handlers, (queue_handler, _) in list(_listeners.items()):
+        queue: Queue = Queue(-1)
+        queue_handler.queue = queue
+        listener = QueueListener(queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners[handlers] = (queue_handler, listener)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
 
 
 def setup_logging(
@@ -29,48 +137,82 @@ def setup_logging(
     # Get logger
     logger = logging.getLogger(name)
     
+    log_level = _LEVELS.get((level or LOG_LEVEL).upper(), logging.INFO)
+    file_path = log_file or LOG_FILE
+    
+    # Already configured with the same settings
+    previous_handler = getattr(logger, "_mcp_queue_handler", None)
+    if (previous_handler is not None and previous_handler in logger.handlers
+            and getattr(logger, "_mcp_configured", None) == (log_level, file_path)):
+        return logger
+    
     # Set level
-    log_level = getattr(logging, (level or LOG_LEVEL).upper())
     logger.setLevel(log_level)
     
-    # Remove existing handlers
-    logger.handlers = []
+    # Select formatter (more detailed in debug mode)
+    formatter = _DEBUG_FORMATTER if DEBUG else _STD_FORMATTER
     
-    # Create formatter
-    formatter = logging.Formatter(LOG_FORMAT)
+    # Console handler (reused across calls)
+    console_handler = _HANDLER_CACHE.get(("<stdout>", log_level))
+    if console_handler is None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(log_level)
+        console_handler.setFormatter(formatter)
+        _HANDLER_CACHE[("<stdout>", log_level)] = console_handler
+    handlers = [console_handler]
     
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler (if specified)
-    file_path = log_file or LOG_FILE
+    # File handler (if specified, reused across calls)
+    file_error = None
     if file_path:
-        try:
-            # Create log directory if needed
-            log_path = Path(file_path)
-            log_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Create file handler
-            file_handler = logging.FileHandler(file_path, encoding='utf-8')
-            file_handler.setLevel(log_level)
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-        except Exception as e:
-            logger.warning(f"Failed to create log file handler: {e}")
+        buffered_handler = _HANDLER_CACHE.get((file_path, log_level))
+        if buffered_handler is None:
+            try:
+                # Create log directory if needed (once per directory)
+                log_dir = str(Path(file_path).parent)
+                if log_dir not in _MKDIR_CACHE:
+                    Path(log_dir).mkdir(parents=True, exist_ok=True)
+                    _MKDIR_CACHE.add(log_dir)
+                
+                # Create file handler (opened on first write, rotated by size)
+                file_handler = RotatingFileHandler(
+                    file_path,
+                    maxBytes=LOG_MAX_BYTES,
+                    backupCount=LOG_BACKUP_COUNT,
+                    encoding='utf-8',
+                    delay=True
+                )
+                file_handler.setLevel(log_level)
+                file_handler.setFormatter(formatter)
+                
+                # 小さな書き込みをまとめてフラッシュ（ERROR以上は即時）
+                buffered_handler = MemoryHandler(
+                    capacity=LOG_BUFFER_CAPACITY,
+                    flushLevel=logging.ERROR,
+                    target=file_handler,
+                    flushOnClose=True
+                )
+                buffered_handler.setLevel(log_level)
+                _HANDLER_CACHE[(file_path, log_level)] = buffered_handler
+            except Exception as e:
+                file_error = e
+        if buffered_handler is not None:
+            handlers.append(buffered_handler)
     
     # Debug mode adjustments
     if DEBUG:
         logger.setLevel(logging.DEBUG)
-        # Add more detailed formatter for debug
-        debug_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - '
-            '%(filename)s:%(lineno)d - %(funcName)s() - %(message)s'
-        )
-        for handler in logger.handlers:
-            handler.setFormatter(debug_formatter)
+    
+    # 実I/Oはリスナースレッドに任せ、ロガーにはキューハンドラのみを付与
+    queue_handler = _get_queue_handler(tuple(handlers))
+    if previous_handler is not None and previous_handler is not queue_handler:
+        logger.removeHandler(previous_handler)
+    if queue_handler not in logger.handlers:
+        logger.addHandler(queue_handler)
+    logger._mcp_queue_handler = queue_handler
+    logger._mcp_configured = (log_level, file_path)
+    
+    if file_error is not None:
+        logger.warning("Failed to create log file handler: %s", file_error)
     
     return logger
 
@@ -88,19 +230,43 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+def log_lazy(logger: logging.Logger, level: int, msg_fn: Callable[..., str], *args: Any):
+    """
+    Log a message built by msg_fn only if the level is enabled
+    
+    Usage:
+        log_lazy(logger, logging.DEBUG, lambda: f"payload={heavy(x)}")
+    
+    Args:
+        logger: Logger instance
+        level: Log level
+        msg_fn: Callable returning the message string
+        *args: Arguments passed to msg_fn
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, msg_fn(*args))
+
+
 # Configure logging for common libraries
+_NOISY_LIBS = ("chromadb", "sentence_transformers", "transformers", "torch", "urllib3")
+_LIB_LOGGING_CONFIGURED = globals().get("_LIB_LOGGING_CONFIGURED", False)
+
+
 def configure_library_logging():
-    """Configure logging levels for common libraries"""
+    """Configure logging levels for common libraries (runs once per process)"""
+    global _LIB_LOGGING_CONFIGURED
+    if _LIB_LOGGING_CONFIGURED:
+        return
+    
     # Reduce noise from libraries
-    logging.getLogger("chromadb").setLevel(logging.WARNING)
-    logging.getLogger("sentence_transformers").setLevel(logging.WARNING)
-    logging.getLogger("transformers").setLevel(logging.WARNING)
-    logging.getLogger("torch").setLevel(logging.WARNING)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
+    for lib_name in _NOISY_LIBS:
+        logging.getLogger(lib_name).setLevel(logging.WARNING)
     
     # Enable debug for our modules in debug mode
     if DEBUG:
         logging.getLogger("vector_database_mcp").setLevel(logging.DEBUG)
+    
+    _LIB_LOGGING_CONFIGURED = True
 
 
 # Initialize library logging configuration
@@ -2,88 +2,210 @@
 Global settings and configuration management
 """
 
+import functools
 import os
 import platform
+import sys
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
 
 # Try to load from .env file if python-dotenv is available
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass
+# (once per process, even if this module is reloaded)
+if not globals().get("_DOTENV_LOADED", False):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(override=False)
+    except ImportError:
+        pass
+    _DOTENV_LOADED = True
+
+# Snapshot of the environment after .env has been applied
+_ENV_CACHE: Dict[str, str] = dict(os.environ)
+
+
+def get_env(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Read an environment variable from the cached snapshot, falling back to os.environ"""
+    value = _ENV_CACHE.get(key)
+    if value is None:
+        return os.environ.get(key, default)
+    return value
+
 
 # Base paths
 BASE_DIR = Path(__file__).parent.parent
 PROJECT_ROOT = BASE_DIR.parent
+BASE_DIR_STR = str(BASE_DIR)
+PROJECT_ROOT_STR = str(PROJECT_ROOT)
 
 # Database paths
-CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", str(BASE_DIR / "chroma_db"))
-SESSION_DIR = os.getenv("SESSION_DIR", str(BASE_DIR / "session_states"))
+CHROMA_DB_PATH = get_env("CHROMA_DB_PATH", str(BASE_DIR / "chroma_db"))
+SESSION_DIR = get_env("SESSION_DIR", str(BASE_DIR / "session_states"))
 
 # Document paths
-DOCS_DIR = Path(os.getenv("DOCS_DIR", str(PROJECT_ROOT)))
+DOCS_DIR = Path(get_env("DOCS_DIR", PROJECT_ROOT_STR))
+DOCS_DIR_STR = str(DOCS_DIR)
 
 # Model settings
 # システムに応じてモデルを選択
 if platform.machine().startswith('arm'):
     # Raspberry Pi用：軽量な多言語モデル
-    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+    EMBEDDING_MODEL = get_env("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
 else:
     # 通常のシステム用：高品質モデル
-    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-mpnet-base-v2")
+    EMBEDDING_MODEL = get_env("EMBEDDING_MODEL", "paraphrase-multilingual-mpnet-base-v2")
+
+# 埋め込みモデルの実行デバイス（auto / cpu / cuda / cuda:N / mps）
+EMBEDDING_DEVICE = get_env("EMBEDDING_DEVICE", "auto").strip().lower()
 
 # Security settings
-MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # 10MB
-SESSION_CLEANUP_DAYS = int(os.getenv("SESSION_CLEANUP_DAYS", "30"))
+MAX_FILE_SIZE = int(get_env("MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # 10MB
+SESSION_CLEANUP_DAYS = int(get_env("SESSION_CLEANUP_DAYS", "30"))
 
 # Oscillation settings
-OSCILLATION_BUFFER_SIZE = int(os.getenv("OSCILLATION_BUFFER_SIZE", "1000"))
-MIN_OSCILLATION_SAMPLES = int(os.getenv("MIN_OSCILLATION_SAMPLES", "5"))
+OSCILLATION_BUFFER_SIZE = int(get_env("OSCILLATION_BUFFER_SIZE", "1000"))
+MIN_OSCILLATION_SAMPLES = int(get_env("MIN_OSCILLATION_SAMPLES", "5"))
+OSCILLATION_MAX_SESSIONS = int(get_env("OSCILLATION_MAX_SESSIONS", "64"))  # メモリ上に保持するセッションバッファ数
 
 # Entropy settings
-ENTROPY_BUFFER_SIZE = int(os.getenv("ENTROPY_BUFFER_SIZE", "1000"))
+ENTROPY_BUFFER_SIZE = int(get_env("ENTROPY_BUFFER_SIZE", "1000"))
+ENTROPY_QUALITY_TTL = float(get_env("ENTROPY_QUALITY_TTL", "30.0"))  # エントロピー品質評価のキャッシュ秒数
 
 # MCP Server settings
-MCP_SERVER_NAME = os.getenv("MCP_SERVER_NAME", "vector-database-server-v31-secure-entropy-docs-oscillation-fixed")
-MCP_SERVER_VERSION = os.getenv("MCP_SERVER_VERSION", "3.1.4-complete-fixed")
+MCP_SERVER_NAME = get_env("MCP_SERVER_NAME", "vector-database-server-v31-secure-entropy-docs-oscillation-fixed")
+MCP_SERVER_VERSION = get_env("MCP_SERVER_VERSION", "3.1.4-complete-fixed")
 
-# Available documents configuration
-AVAILABLE_DOCUMENTS = {
-    "engine_system": os.getenv("ENGINE_SYSTEM_DOC", "unified-inner-engine-v3.1.txt"),
-    "manual": os.getenv("MANUAL_DOC", "unified-engine-mcp-manual.md")
-}
+# Available documents configuration (read-only; copy before modifying)
+AVAILABLE_DOCUMENTS = MappingProxyType({
+    "engine_system": get_env("ENGINE_SYSTEM_DOC", "unified-inner-engine-v3.1.txt"),
+    "manual": get_env("MANUAL_DOC", "unified-engine-mcp-manual.md")
+})
+AVAILABLE_DOCUMENT_ITEMS = tuple(AVAILABLE_DOCUMENTS.items())
 
 # Logging settings
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-LOG_FILE = os.getenv("LOG_FILE", None)
+LOG_LEVEL = get_env("LOG_LEVEL", "INFO")
+LOG_FORMAT = get_env("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+LOG_FILE = get_env("LOG_FILE", None)
+LOG_BUFFER_CAPACITY = int(get_env("LOG_BUFFER_CAPACITY", "512"))  # ファイル出力のバッファレコード数
+LOG_MAX_BYTES = int(get_env("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # 10MB
+LOG_BACKUP_COUNT = int(get_env("LOG_BACKUP_COUNT", "3"))
 
 # Test mode settings
-TEST_MODE = os.getenv("TEST_MODE", "false").lower() in ("true", "1", "yes", "on")
+TEST_MODE = get_env("TEST_MODE", "false").lower() in ("true", "1", "yes", "on")
 
 # Performance settings
-EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
-CHROMADB_PERSIST_INTERVAL = int(os.getenv("CHROMADB_PERSIST_INTERVAL", "100"))
+EMBEDDING_BATCH_SIZE = int(get_env("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT = float(get_env("EMBEDDING_BATCH_WAIT", "0.005"))  # 埋め込み要求をまとめる最大待機時間（秒）
+EMBEDDING_CACHE_SIZE = int(get_env("EMBEDDING_CACHE_SIZE", "4096"))  # 埋め込みLRUキャッシュのエントリ数
+CHROMADB_PERSIST_INTERVAL = int(get_env("CHROMADB_PERSIST_INTERVAL", "100"))
+CHROMADB_WRITE_BATCH_SIZE = int(get_env("CHROMADB_WRITE_BATCH_SIZE", "128"))  # 一括書き込みの件数閾値
+CHROMADB_FLUSH_INTERVAL = float(get_env("CHROMADB_FLUSH_INTERVAL", "2.0"))  # 定期フラッシュ間隔（秒、0で無効）
+SESSION_STATE_COALESCE_WINDOW = float(get_env("SESSION_STATE_COALESCE_WINDOW", "0.05"))  # セッション開始レコードを直後の更新とまとめる待機時間（秒）
+EMBED_ENTROPY_LOGS = get_env("EMBED_ENTROPY_LOGS", "false").lower() in ("true", "1", "yes", "on")  # エントロピーログを意味検索用に埋め込むか
+USE_MSGSPEC_SCHEMAS = get_env("USE_MSGSPEC_SCHEMAS", "false").lower() in ("true", "1", "yes", "on")  # msgspec.Struct 版エントリを使用するか（msgspec が必要）
 
 # Development settings
-DEBUG = os.getenv("DEBUG", "false").lower() in ("true", "1", "yes", "on")
-
-def get_config_summary() -> dict:
-    """Get a summary of current configuration"""
-    return {
-        "base_dir": str(BASE_DIR),
-        "chroma_db_path": CHROMA_DB_PATH,
-        "session_dir": SESSION_DIR,
-        "docs_dir": str(DOCS_DIR),
-        "embedding_model": EMBEDDING_MODEL,
-        "max_file_size": MAX_FILE_SIZE,
-        "session_cleanup_days": SESSION_CLEANUP_DAYS,
-        "oscillation_buffer_size": OSCILLATION_BUFFER_SIZE,
-        "min_oscillation_samples": MIN_OSCILLATION_SAMPLES,
-        "entropy_buffer_size": ENTROPY_BUFFER_SIZE,
-        "log_level": LOG_LEVEL,
-        "debug": DEBUG,
-        "available_documents": AVAILABLE_DOCUMENTS,
-    }
+DEBUG = get_env("DEBUG", "false").lower() in ("true", "1", "yes", "on")
+
+# Resolved settings (read-only view, built once at import)
+_CONFIG: Dict[str, Any] = {
+    "BASE_DIR": BASE_DIR,
+    "PROJECT_ROOT": PROJECT_ROOT,
+    "CHROMA_DB_PATH": CHROMA_DB_PATH,
+    "SESSION_DIR": SESSION_DIR,
+    "DOCS_DIR": DOCS_DIR,
+    "EMBEDDING_MODEL": EMBEDDING_MODEL,
+    "EMBEDDING_DEVICE": EMBEDDING_DEVICE,
+    "MAX_FILE_SIZE": MAX_FILE_SIZE,
+    "SESSION_CLEANUP_DAYS": SESSION_CLEANUP_DAYS,
+    "OSCILLATION_BUFFER_SIZE": OSCILLATION_BUFFER_SIZE,
+    "MIN_OSCILLATION_SAMPLES": MIN_OSCILLATION_SAMPLES,
+    "OSCILLATION_MAX_SESSIONS": OSCILLATION_MAX_SESSIONS,
+    "ENTROPY_BUFFER_SIZE": ENTROPY_BUFFER_SIZE,
+    "ENTROPY_QUALITY_TTL": ENTROPY_QUALITY_TTL,
+    "MCP_SERVER_NAME": MCP_SERVER_NAME,
+    "MCP_SERVER_VERSION": MCP_SERVER_VERSION,
+    "AVAILABLE_DOCUMENTS": AVAILABLE_DOCUMENTS,
+    "LOG_LEVEL": LOG_LEVEL,
+    "LOG_FORMAT": LOG_FORMAT,
+    "LOG_FILE": LOG_FILE,
+    "LOG_BUFFER_CAPACITY": LOG_BUFFER_CAPACITY,
+    "LOG_MAX_BYTES": LOG_MAX_BYTES,
+    "LOG_BACKUP_COUNT": LOG_BACKUP_COUNT,
+    "TEST_MODE": TEST_MODE,
+    "EMBEDDING_BATCH_SIZE": EMBEDDING_BATCH_SIZE,
+    "EMBEDDING_BATCH_WAIT": EMBEDDING_BATCH_WAIT,
+    "EMBEDDING_CACHE_SIZE": EMBEDDING_CACHE_SIZE,
+    "CHROMADB_PERSIST_INTERVAL": CHROMADB_PERSIST_INTERVAL,
+    "CHROMADB_WRITE_BATCH_SIZE": CHROMADB_WRITE_BATCH_SIZE,
+    "CHROMADB_FLUSH_INTERVAL": CHROMADB_FLUSH_INTERVAL,
+    "SESSION_STATE_COALESCE_WINDOW": SESSION_STATE_COALESCE_WINDOW,
+    "EMBED_ENTROPY_LOGS": EMBED_ENTROPY_LOGS,
+    "USE_MSGSPEC_SCHEMAS": USE_MSGSPEC_SCHEMAS,
+    "DEBUG": DEBUG,
+}
+SETTINGS = MappingProxyType(_CONFIG)
+
+
+# Python 3.10+ ではスロット付きdataclassにする
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS)
+class ConfigSummary:
+    """Immutable summary of the current configuration"""
+    base_dir: str
+    chroma_db_path: str
+    session_dir: str
+    docs_dir: str
+    embedding_model: str
+    max_file_size: int
+    session_cleanup_days: int
+    oscillation_buffer_size: int
+    min_oscillation_samples: int
+    entropy_buffer_size: int
+    log_level: str
+    debug: bool
+    available_documents: Tuple[Tuple[str, str], ...]
+    
+    @functools.lru_cache(maxsize=None)
+    def _cached_dict(self) -> Dict[str, Any]:
+        # asdict の再帰コピーは1回だけ行い、呼び出し側にはコピーを返す
+        return asdict(self)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form of the summary (a fresh copy on every call)"""
+        data = dict(self._cached_dict())
+        data["available_documents"] = dict(self.available_documents)
+        return data
+    
+    def __getitem__(self, key: str) -> Any:
+        """Dict-style access for callers that used the old dict summary"""
+        if key == "available_documents":
+            return dict(self.available_documents)
+        if key.startswith("_") or key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+_CONFIG_SUMMARY = ConfigSummary(
+    base_dir=BASE_DIR_STR,
+    chroma_db_path=CHROMA_DB_PATH,
+    session_dir=SESSION_DIR,
+    docs_dir=DOCS_DIR_STR,
+    embedding_model=EMBEDDING_MODEL,
+    max_file_size=MAX_FILE_SIZE,
+    session_cleanup_days=SESSION_CLEANUP_DAYS,
+    oscillation_buffer_size=OSCILLATION_BUFFER_SIZE,
+    min_oscillation_samples=MIN_OSCILLATION_SAMPLES,
+    entropy_buffer_size=ENTROPY_BUFFER_SIZE,
+    log_level=LOG_LEVEL,
+    debug=DEBUG,
+    available_documents=AVAILABLE_DOCUMENT_ITEMS,
+)
+
+
+def get_config_summary() -> ConfigSummary:
+    """Get a summary of current configuration (use .to_dict() for a dict)"""
+    return _CONFIG_SUMMARY
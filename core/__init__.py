@@ -2,72 +2,24 @@
 Core module for Vector Database MCP Server
 """
 
-from .database import VectorDatabaseManager
-from .exceptions import (
-    VectorDatabaseError,
-    SessionError,
-    DocumentError,
-    ValidationError,
-    CharacterNotFoundError,  # 追加
-)
-from .models import (
-    DataType,
-    BasicEmotion,
-    ConsciousnessLevel,
-    EngineType,
-    CharacterProfileEntry,
-    EngineStateEntry,
-    InternalStateEntry,
-    RelationshipStateEntry,
-    SessionStateEntry,
-    ConversationEntry,
-    SecureEntropyEntry,
-)
-from .utils import (
-    EnhancedJSONEncoder,  # DateTimeEncoder から変更
-    safe_json_dumps,
-    safe_json_loads,
-    filter_metadata,
-    safe_metadata_value,
-    datetime_hook,
-    truncate_text,  # 追加
-    merge_dicts,  # 追加
-    get_nested_value,  # 追加
-    set_nested_value,  # 追加
-    format_timestamp,  # 追加
-    clean_for_json,  # 追加
-)
+from . import exceptions, models, utils
+from .exceptions import *  # noqa: F401,F403
+from .models import *  # noqa: F401,F403
+from .utils import *  # noqa: F401,F403
 
 __all__ = [
-    # Database
+    # Database (loaded lazily, see __getattr__)
     "VectorDatabaseManager",
-    
-    # Exceptions
-    "VectorDatabaseError",
-    "SessionError",
-    "DocumentError",
-    "ValidationError",
-    
-    # Models - Enums
-    "DataType",
-    "BasicEmotion",
-    "ConsciousnessLevel",
-    "EngineType",
-    
-    # Models - Data classes
-    "CharacterProfileEntry",
-    "EngineStateEntry",
-    "InternalStateEntry",
-    "RelationshipStateEntry",
-    "SessionStateEntry",
-    "ConversationEntry",
-    "SecureEntropyEntry",
-    
-    # Utils
-    "EnhancedJSONEncoder",
-    "safe_json_dumps",
-    "safe_json_loads",
-    "filter_metadata",
-    "safe_metadata_value",
-    "datetime_hook",
+    *exceptions.__all__,
+    *models.__all__,
+    *utils.__all__,
 ]
+
+
+def __getattr__(name):
+    """chromadb / sentence-transformers を含む重いモジュールは初回アクセス時に読み込む"""
+    if name == "VectorDatabaseManager":
+        from .database import VectorDatabaseManager
+        globals()[name] = VectorDatabaseManager
+        return VectorDatabaseManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
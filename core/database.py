@@ -2,20 +2,47 @@
 Vector Database Manager - Core implementation
 """
 
+import atexit
+import gzip
+import hashlib
+import math
+import os
+import re
+import threading
+import time
 import uuid
-from collections import defaultdict
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import BinaryIO, Iterator, List, Dict, Any, Optional, Tuple
 
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+# torch はトークナイズ済み入力での直接推論に使用（未導入時は encode を使用）
+try:
+    import torch
+except ImportError:
+    torch = None
+
 from config.settings import (
     CHROMA_DB_PATH,
+    CHROMADB_FLUSH_INTERVAL,
+    CHROMADB_WRITE_BATCH_SIZE,
     EMBEDDING_MODEL,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_WAIT,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_DEVICE,
+    EMBED_ENTROPY_LOGS,
+    ENTROPY_QUALITY_TTL,
     MIN_OSCILLATION_SAMPLES,
+    OSCILLATION_BUFFER_SIZE,
+    OSCILLATION_MAX_SESSIONS,
+    SESSION_STATE_COALESCE_WINDOW,
 )
 from config.logging import get_logger
 
@@ -36,9 +63,12 @@ from .utils import (
     filter_metadata,
     safe_metadata_value,
 )
+from .embedding_batcher import EmbeddingBatcher
+from .write_buffer import BufferedCollection, FlushTimer
 from .exceptions import (
     VectorDatabaseError,
     SessionError,
+    SessionNotFoundError,
     CharacterNotFoundError,
 )
 
@@ -47,10 +77,266 @@ from security.pink_noise import SecureEnhancedPinkNoiseGenerator
 from session.manager import SecureSessionManager
 from document.manager import DocumentManager
 from oscillation.patterns import OscillationPatternData
+from oscillation.metrics import calculate_oscillation_metrics
 
 logger = get_logger(__name__)
 
 
+# テンプレート化されたテキストから数値部分を取り出すパターン
+# 単独の数値トークンのみ対象とし、UUID・セッションID・16進文字列内の数字は置換しない
+_NUMBER_PATTERN = re.compile(r"(?<![\w.-])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w-]|\.\d)")
+
+# 数値射影に使う値の上限（巨大値や inf で正弦波射影が inf/NaN にならないよう制限）
+_NUMERIC_PROJECTION_LIMIT = 1e6
+
+# テンプレート埋め込みに加える数値射影の大きさ（テンプレート埋め込みのノルム比）
+_NUMERIC_PROJECTION_SCALE = 0.05
+
+
+# 埋め込み入力テキストのテンプレート
+_INTERNAL_STATE_TEMPLATE = (
+    "Energy: {energy}\n"
+    "Cognitive Load: {cognitive_load}\n"
+    "Emotional Tone: {emotional_tone}\n"
+    "Relational Distance: {relational_distance}\n"
+    "Paradox Tension: {paradox_tension}\n"
+    "Oscillation Stability: {oscillation_stability}"
+)
+
+_RELATIONSHIP_TEMPLATE = (
+    "Attachment: {attachment}\n"
+    "Current Distance: {current_distance}\n"
+    "Optimal Distance: {optimal_distance}\n"
+    "Paradox Tension: {paradox_tension}\n"
+    "Stability: {stability}\n"
+    "Dependency Risk: {dependency_risk}\n"
+    "Growth Potential: {growth_potential}\n"
+    "Secure Entropy: {secure_entropy}\n"
+    "Entropy Source: {entropy_source}"
+)
+
+_OSCILLATION_PATTERN_TEMPLATE = (
+    "Secure Enhanced Oscillation Pattern:\n"
+    "Amplitude: {amplitude}\n"
+    "Frequency: {frequency}\n"
+    "Damping: {damping} ({damping_type})\n"
+    "Pink Noise: {pink_noise}\n"
+    "Secure Entropy: {secure_entropy}\n"
+    "Entropy Source: {entropy_source}\n"
+    "Stability: {stability}"
+)
+
+_ENTROPY_LOG_TEMPLATE = (
+    "Secure Entropy Log:\n"
+    "Source: {source}\n"
+    "Value: {value}\n"
+    "Normalized: {normalized:.6f}\n"
+    "Quality: {quality:.3f}\n"
+    "Architecture: {architecture}"
+)
+
+
+class _JsonMemo:
+    """1回の書き込み処理内で同一オブジェクトのJSON化を1度に抑えるメモ
+    
+    呼び出し中に変更されないオブジェクトのみを対象とし、処理ごとに生成して使い捨てる。
+    """
+    
+    __slots__ = ("_cache",)
+    
+    def __init__(self):
+        self._cache: Dict[int, str] = {}
+    
+    def __call__(self, obj: Any) -> str:
+        key = id(obj)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._cache[key] = safe_json_dumps(obj)
+        return cached
+
+
+# 直前に変換した datetime とその ISO 文字列（同じオブジェクトの変換結果を再利用）
+_last_isoformat: Tuple[Optional[datetime], str] = (None, "")
+
+
+def _isoformat(timestamp: datetime) -> str:
+    """datetime.isoformat() の結果を同一オブジェクトに対して再利用"""
+    global _last_isoformat
+    cached_timestamp, cached_iso = _last_isoformat
+    if cached_timestamp is timestamp:
+        return cached_iso
+    iso = timestamp.isoformat()
+    _last_isoformat = (timestamp, iso)
+    return iso
+
+
+class _OscillationRing:
+    """事前確保したNumPy配列による固定長リングバッファ（振動バッファ用）
+
+    上限を超えた分は古い順に上書きされる。array() は古い順に並んだ有効範囲を
+    ndarray で返すため、読み出し側で要素ごとの変換ループは不要。
+    """
+    
+    __slots__ = ("_data", "_start", "_count")
+    
+    def __init__(self, capacity: int, dtype: Any = np.float64, values: Any = ()):
+        self._data = np.empty(max(1, capacity), dtype=dtype)
+        self._start = 0
+        self._count = 0
+        if len(values):
+            self.extend(values)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, value: Any) -> None:
+        capacity = len(self._data)
+        self._data[(self._start + self._count) % capacity] = value
+        if self._count < capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % capacity
+    
+    def extend(self, values: Any) -> None:
+        values = np.asarray(values, dtype=self._data.dtype)
+        n = len(values)
+        if n == 0:
+            return
+        capacity = len(self._data)
+        if n >= capacity:
+            self._data[:] = values[-capacity:]
+            self._start, self._count = 0, capacity
+            return
+        
+        # 末尾に書き込み、配列の終端を越える分は先頭へ折り返す
+        end = (self._start + self._count) % capacity
+        first = min(n, capacity - end)
+        self._data[end:end + first] = values[:first]
+        self._data[:n - first] = values[first:]
+        overflow = self._count + n - capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % capacity
+            self._count = capacity
+        else:
+            self._count += n
+    
+    def array(self) -> np.ndarray:
+        """古い順に並んだ有効範囲（折り返していなければコピーなしのビュー）"""
+        capacity = len(self._data)
+        end = self._start + self._count
+        if end <= capacity:
+            return self._data[self._start:end]
+        return np.concatenate((self._data[self._start:], self._data[:end - capacity]))
+    
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        data = self.array()
+        return data if dtype is None else data.astype(dtype, copy=False)
+    
+    def __getitem__(self, index):
+        result = self.array()[index]
+        return result if isinstance(index, slice) else result.item()
+    
+    def __iter__(self):
+        return iter(self.tolist())
+    
+    def tolist(self) -> list:
+        return self.array().tolist()
+    
+    def copy(self) -> np.ndarray:
+        return self.array().copy()
+
+
+# 空文字列になり得る文字列メタデータ項目（filter_metadata と同じく空の場合は格納しない）
+_META_SCHEMAS: Dict[DataType, Tuple[str, ...]] = {
+    DataType.SESSION_STATE: ("character_id", "internal_state_id", "relationship_state_id"),
+    DataType.CHARACTER_PROFILE: ("name", "background", "instruction", "version"),
+    DataType.INTERNAL_STATE: ("emotional_tone", "attention_focus", "character_id", "session_id"),
+    DataType.RELATIONSHIP: ("character_id", "session_id"),
+    DataType.OSCILLATION_PATTERN: ("character_id", "session_id"),
+    DataType.SECURE_ENTROPY: ("source_type", "character_id", "session_id"),
+    DataType.ENGINE_STATE: ("engine_type", "character_id", "session_id"),
+    DataType.MEMORY: ("memory_type", "character_id", "session_id"),
+}
+
+
+def _meta_number(value: Any, default: float) -> Any:
+    """数値メタデータの変換（None は既定値、NaN / Inf は 0.0）"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return safe_metadata_value(value, default)
+    return value if math.isfinite(value) else 0.0
+
+
+def _prune_metadata(data_type: DataType, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """スキーマ上で空になり得る文字列項目のうち、空のものを取り除く"""
+    for key in _META_SCHEMAS[data_type]:
+        if metadata.get(key) == "":
+            del metadata[key]
+    return metadata
+
+
+# セッションエクスポートに含めるデータタイプと出力キー
+_SESSION_EXPORT_SECTIONS: Tuple[Tuple[DataType, str], ...] = (
+    (DataType.CONVERSATION, "conversations"),
+    (DataType.INTERNAL_STATE, "internal_states"),
+    (DataType.RELATIONSHIP, "relationship_states"),
+    (DataType.EMOTION, "emotions"),
+    (DataType.MEMORY, "memories"),
+    (DataType.SECURE_ENTROPY, "secure_entropy_logs"),  # ハードウェアから変更
+)
+
+# エクスポート時に1回の get で取得する件数
+_EXPORT_PAGE_SIZE = 1000
+
+
+# セッション状態レコードのメタデータ項目（保留中レコードへの更新反映に使用）
+_SESSION_STATE_FIELDS = frozenset({
+    "start_time", "last_update", "interaction_count", "internal_state_id",
+    "relationship_state_id", "oscillation_history", "environment_state", "active",
+})
+
+
+def _new_oscillation_buffer(values=(), timestamps=()) -> Dict[str, _OscillationRing]:
+    """上限付きの振動バッファを生成（超過分は古い順に自動で破棄）"""
+    return {
+        "values": _OscillationRing(OSCILLATION_BUFFER_SIZE, np.float64, values),
+        # datetime64[us] は tolist() / item() で datetime に戻る
+        "timestamps": _OscillationRing(OSCILLATION_BUFFER_SIZE, "datetime64[us]", timestamps)
+    }
+
+
+def _select_embedding_device(requested: str = EMBEDDING_DEVICE) -> str:
+    """埋め込みモデルの実行デバイスを決定（auto の場合は CUDA → MPS → CPU の順）"""
+    if requested and requested != "auto":
+        return requested
+    
+    if torch is None:
+        return "cpu"
+    
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def _flush_manager(manager_ref: "weakref.ref") -> bool:
+    """弱参照経由でマネージャーの書き込みバッファをフラッシュ（解放済みならFalse）"""
+    manager = manager_ref()
+    if manager is None:
+        return False
+    manager._flush_all()
+    return True
+
+
 class VectorDatabaseManager:
     """ベクトルデータベース管理システム（v3.1対応版 + セキュアエントロピー統合 + ChromaDB修正版 + ドキュメント統合版 + 振動メトリクス修正版）"""
     
@@ -62,6 +348,12 @@ class VectorDatabaseManager:
         # セキュアエントロピー源の初期化
         logger.info("Initializing Secure Entropy Source...")
         self.entropy_source = SecureEntropySource()
+        self._entropy_quality_cache: Dict[str, Any] = {"ts": 0.0, "value": None, "json": None}
+        self._entropy_quality_ttl = ENTROPY_QUALITY_TTL
+        
+        # レコードID用のUUIDプール（乱数をまとめて取得）
+        self._uuid_pool: List[str] = []
+        self._uuid_pool_pid = os.getpid()
         
         # セキュア強化ピンクノイズジェネレータ
         self.pink_noise_generator = SecureEnhancedPinkNoiseGenerator(self.entropy_source)
@@ -71,8 +363,31 @@ class VectorDatabaseManager:
         self.doc_manager = DocumentManager()
         
         # SentenceTransformerモデル初期化
-        logger.info(f"Loading embedding model: {model_name}")
-        self.embedding_model = SentenceTransformer(model_name)
+        self.embedding_device = _select_embedding_device()
+        logger.info(f"Loading embedding model: {model_name} (device: {self.embedding_device})")
+        self.embedding_model = SentenceTransformer(model_name, device=self.embedding_device)
+        if self.embedding_device.startswith("cuda"):
+            # GPUではFP16で推論（メモリ帯域を半減）
+            self.embedding_model.half()
+        
+        # 埋め込みLRUキャッシュ（同一テキストの再推論を避ける）
+        self._embed_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._embed_cache_max = EMBEDDING_CACHE_SIZE
+        # 埋め込みの同時要求から共有キャッシュを保護する（推論中は保持しない）
+        self._embed_cache_lock = threading.Lock()
+        
+        # 単一テキストの埋め込み要求は同時に来たものをまとめて推論する
+        self._embedding_batcher = EmbeddingBatcher(self._encode_batch, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_WAIT)
+        
+        # 類似検索に使わない行（セッション状態など）に格納するゼロベクトル
+        dimension = self.embedding_model.get_sentence_embedding_dimension() or len(self._embed(""))
+        self._zero_vec = np.zeros(dimension, dtype=np.float32)
+        # エントロピーログは既定でゼロベクトルを格納（True で検索用に埋め込む）
+        self.embed_entropy_logs = EMBED_ENTROPY_LOGS
+        
+        # 数値射影用の正弦波周波数（位置エンコーディングと同じ形式）
+        half = (dimension + 1) // 2
+        self._numeric_freqs = (1.0 / np.power(10000.0, np.arange(half) * 2.0 / dimension)).astype(np.float32)
         
         # ChromaDB初期化
         self.client = chromadb.PersistentClient(
@@ -80,9 +395,26 @@ class VectorDatabaseManager:
             settings=Settings(allow_reset=True)
         )
         
-        # コレクション初期化
+        # コレクション初期化（書き込みはバッファ経由でまとめて行う）
+        self._flush_threshold = CHROMADB_WRITE_BATCH_SIZE
+        self.collections: Dict[DataType, BufferedCollection] = {}
         self._init_collections()
         
+        # 開始直後のセッション状態レコード（直後の更新とまとめて1回で書き込む）
+        self._pending_session_writes: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        # 定期フラッシュのスレッドと取り出し・更新が競合しないよう保護する
+        self._session_write_lock = threading.Lock()
+        self._session_coalesce_window = SESSION_STATE_COALESCE_WINDOW
+        
+        # 独立した読み取りクエリを並行実行するスレッドプール
+        self._query_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chromadb-query")
+        
+        # 定期フラッシュと終了時フラッシュ
+        manager_ref = weakref.ref(self)
+        self._flush_timer = FlushTimer(CHROMADB_FLUSH_INTERVAL, lambda: _flush_manager(manager_ref))
+        self._flush_timer.start()
+        atexit.register(_flush_manager, manager_ref)
+        
         # セキュアセッション管理初期化
         self.session_manager = SecureSessionManager()
         
@@ -90,8 +422,15 @@ class VectorDatabaseManager:
         self.active_character_id = None
         self.active_session_id = None
         
+        # キャラクターごとのセッションID索引（開始・再開順を保持する順序付き集合）
+        self.character_sessions: "defaultdict[str, Dict[str, None]]" = defaultdict(dict)
+        # セッション状態コレクションから索引を補完済みのキャラクター
+        self._seeded_characters: set = set()
+        
         # 振動履歴管理（修正版：より堅牢な管理）
-        self.oscillation_buffer = defaultdict(lambda: {"values": [], "timestamps": []})
+        # セッションごとのバッファはLRUで保持数を制限（未知のIDの参照では生成しない）
+        self.oscillation_buffer: "OrderedDict[str, Dict[str, _OscillationRing]]" = OrderedDict()
+        self._max_tracked_sessions = OSCILLATION_MAX_SESSIONS
         
         logger.info("VectorDatabaseManager v3.1 with Secure Entropy, ChromaDB fixes, Document integration, and Fixed Oscillation Metrics initialized successfully")
         
@@ -105,56 +444,237 @@ class VectorDatabaseManager:
     
     def _init_collections(self):
         """コレクションの初期化（v3.1拡張版）"""
+        # 旧コレクションの未書き込みデータは破棄（リセット時）
+        for buffered in self.collections.values():
+            buffered.discard()
         self.collections = {}
         
-        for data_type in DataType:
-            collection_name = f"agent_{data_type.value}_v31_secure_docs_oscillation_fixed"
+        # コレクションの取得・作成は互いに独立しているため並行して行う
+        with ThreadPoolExecutor(max_workers=min(8, len(DataType))) as executor:
+            results = list(executor.map(self._get_or_create_one, DataType))
+        
+        self.collections = {
+            data_type: BufferedCollection(collection, self._flush_threshold)
+            for data_type, collection in results
+        }
+    
+    def _get_or_create_one(self, data_type: DataType) -> Tuple[DataType, Any]:
+        """データタイプに対応するコレクションを取得（存在しなければ作成）"""
+        collection_name = f"agent_{data_type.value}_v31_secure_docs_oscillation_fixed"
+        # 存在確認と作成は ChromaDB 側で1回の呼び出しで行う
+        collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={"description": f"Collection for {data_type.value} data (v3.1 secure docs oscillation fixed)"}
+        )
+        logger.info(f"Opened collection: {collection_name}")
+        return data_type, collection
+    
+    def _enqueue_add(self, data_type: DataType, embedding: np.ndarray, document: str,
+                     metadata: Dict[str, Any], id_: str):
+        """レコードを書き込みバッファに追加（閾値到達時に一括書き込み）"""
+        self.collections[data_type].add(
+            embeddings=[embedding],
+            documents=[document],
+            metadatas=[metadata],
+            ids=[id_]
+        )
+    
+    def _flush_all(self) -> int:
+        """全コレクションの書き込みバッファをフラッシュ"""
+        self._release_session_writes(force=True)
+        flushed = 0
+        for data_type, buffered in list(self.collections.items()):
             try:
-                self.collections[data_type] = self.client.get_collection(collection_name)
-                logger.info(f"Loaded existing collection: {collection_name}")
-            except:
-                self.collections[data_type] = self.client.create_collection(
-                    name=collection_name,
-                    metadata={"description": f"Collection for {data_type.value} data (v3.1 secure docs oscillation fixed)"}
-                )
-                logger.info(f"Created new collection: {collection_name}")
+                flushed += buffered.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush {data_type.value} writes: {e}")
+        return flushed
     
-    def _generate_embedding(self, text: str) -> List[float]:
-        """テキストの埋め込みベクトル生成"""
-        embedding = self.embedding_model.encode(text)
-        return embedding.tolist()
+    def close(self):
+        """未書き込みデータをフラッシュしてタイマーを停止"""
+        self._flush_timer.stop()
+        self._flush_all()
+        self._query_executor.shutdown(wait=False)
     
-    def _generate_composite_embedding(self, texts: List[str], weights: Optional[List[float]] = None) -> List[float]:
-        """複数テキストの重み付き合成埋め込み生成"""
-        if weights is None:
-            weights = [1.0] * len(texts)
+    def _refill_uuid_pool(self, size: int = 256):
+        """UUID4をまとめて生成してプールを補充（ハイフンなし32桁の16進文字列）"""
+        raw = os.urandom(16 * size)
+        self._uuid_pool.extend(
+            uuid.UUID(bytes=raw[i:i + 16], version=4).hex for i in range(0, 16 * size, 16)
+        )
+    
+    def _next_uuid(self) -> str:
+        """プールからレコードID（UUID4の16進文字列）を1つ取得"""
+        if self._uuid_pool_pid != os.getpid():
+            # fork後の子プロセスで親と同じIDを払い出さないよう破棄
+            self._uuid_pool.clear()
+            self._uuid_pool_pid = os.getpid()
+        try:
+            return self._uuid_pool.pop()
+        except IndexError:
+            self._refill_uuid_pool()
+            return self._uuid_pool.pop()
+    
+    def _get_entropy_quality(self) -> Dict[str, Any]:
+        """エントロピー品質評価を取得（TTL付きキャッシュ）"""
+        cache = self._entropy_quality_cache
+        now = time.monotonic()
+        if cache["value"] is None or now - cache["ts"] > self._entropy_quality_ttl:
+            cache["value"] = self.entropy_source.assess_entropy_quality()
+            cache["json"] = None
+            cache["ts"] = now
+        # 呼び出し側での変更がキャッシュに波及しないようコピーを返す
+        return dict(cache["value"])
+    
+    def _get_entropy_quality_json(self) -> str:
+        """キャッシュ中のエントロピー品質評価のJSON（更新されるまで再シリアライズしない）"""
+        self._get_entropy_quality()
+        cache = self._entropy_quality_cache
+        if cache.get("json") is None:
+            cache["json"] = safe_json_dumps(cache["value"])
+        return cache["json"]
+    
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """テキスト群をまとめてエンコード（float32行列）
+        
+        トークナイズ結果をモデルの forward に直接渡し、encode() の長さソートや
+        進捗表示などのPython側の処理を省く。プーリング・正規化はモデル構成に従う。
+        """
+        model = self.embedding_model
+        if torch is None or not hasattr(model, "tokenize"):
+            embeddings = model.encode(
+                texts,
+                batch_size=EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            return np.asarray(embeddings, dtype=np.float32)
+        
+        chunks = []
+        with torch.inference_mode():
+            for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+                features = model.tokenize(texts[start:start + EMBEDDING_BATCH_SIZE])
+                features = {
+                    name: value.to(model.device) if hasattr(value, "to") else value
+                    for name, value in features.items()
+                }
+                output = model.forward(features)
+                # FP16推論時もfloat32で返す
+                chunks.append(output["sentence_embedding"].float().cpu().numpy())
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+    
+    def _embed(self, text: str) -> np.ndarray:
+        """テキストの埋め込みベクトル生成（float32配列・LRUキャッシュ付き）
         
-        embeddings = [self.embedding_model.encode(text) for text in texts]
-        weighted_embedding = np.zeros_like(embeddings[0])
+        返す配列はキャッシュと共有されるため変更しないこと。
+        """
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        cache = self._embed_cache
+        
+        with self._embed_cache_lock:
+            embedding = cache.get(key)
+            if embedding is not None:
+                cache.move_to_end(key)
+                return embedding
+        
+        embedding = np.ascontiguousarray(self._embedding_batcher.embed(text))
+        with self._embed_cache_lock:
+            cache[key] = embedding
+            while len(cache) > self._embed_cache_max:
+                cache.popitem(last=False)
+        return embedding
+    
+    def _embed_templated(self, text: str) -> np.ndarray:
+        """数値だけが変わる定型テキストの埋め込み生成
         
-        for embedding, weight in zip(embeddings, weights):
-            weighted_embedding += embedding * weight
+        数値を取り除いたテンプレート部分のみをモデルで埋め込み（キャッシュ対象）、
+        数値は正弦波による軽量な射影として加算する。類似検索に使わないログ系の
+        行向けで、数値が変わるたびにモデルを再実行しない。
+        """
+        values = _NUMBER_PATTERN.findall(text)
+        base = self._embed(_NUMBER_PATTERN.sub("#", text))
+        if not values:
+            return base
+        
+        numbers = np.asarray(values, dtype=np.float64)[:, None]
+        numbers = np.clip(np.nan_to_num(numbers), -_NUMERIC_PROJECTION_LIMIT, _NUMERIC_PROJECTION_LIMIT)
+        angles = numbers * self._numeric_freqs[None, :] + np.arange(len(values))[:, None]
+        projection = np.concatenate([np.sin(angles), np.cos(angles)], axis=1).mean(axis=0)[:base.shape[0]]
+        
+        scale = _NUMERIC_PROJECTION_SCALE * np.linalg.norm(base) / (np.linalg.norm(projection) or 1.0)
+        return (base + scale * projection).astype(np.float32)
+    
+    def _embed_many(self, texts: List[str]) -> np.ndarray:
+        """複数テキストの埋め込みベクトル生成（キャッシュ未登録分のみ1回で推論）"""
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+        cache = self._embed_cache
+        
+        # ヒットした行はロック下で取り出しておき、推論中に他スレッドが追い出しても影響を受けない
+        hits = {}
+        missing = {}
+        with self._embed_cache_lock:
+            for key, text in zip(keys, texts):
+                if key in hits or key in missing:
+                    continue
+                embedding = cache.get(key)
+                if embedding is None:
+                    missing[key] = text
+                else:
+                    cache.move_to_end(key)
+                    hits[key] = embedding
+        
+        if missing:
+            encoded = self._encode_batch(list(missing.values()))
+            hits.update((key, np.ascontiguousarray(row)) for key, row in zip(missing, encoded))
+            with self._embed_cache_lock:
+                for key in missing:
+                    cache[key] = hits[key]
+                while len(cache) > self._embed_cache_max:
+                    cache.popitem(last=False)
+        
+        rows = [hits[key] for key in keys]
+        return np.vstack(rows)
+    
+    def _embed_composite(self, texts: List[str], weights: Optional[List[float]] = None) -> np.ndarray:
+        """複数テキストの重み付き合成埋め込み生成（float32配列）"""
+        # 全テキストを1回のフォワードパスでまとめてエンコード
+        emb_matrix = self._encode_batch(texts)
+        
+        if weights is None or (len(set(weights)) == 1 and weights[0] > 0):
+            # 均一な重みは正規化後に平均と一致するため乗算を省略
+            weighted_embedding = emb_matrix.mean(axis=0)
+        else:
+            w = np.asarray(weights, dtype=emb_matrix.dtype)[:, None]
+            weighted_embedding = (emb_matrix * w).sum(axis=0)
         
         # 正規化
-        norm = np.linalg.norm(weighted_embedding)
-        if norm > 0:
-            weighted_embedding /= norm
+        weighted_embedding /= (np.linalg.norm(weighted_embedding) or 1.0)
         
-        return weighted_embedding.tolist()
+        return weighted_embedding
+    
+    def _generate_embedding(self, text: str) -> List[float]:
+        """テキストの埋め込みベクトル生成"""
+        return self._embed(text).tolist()
+    
+    def _generate_composite_embedding(self, texts: List[str], weights: Optional[List[float]] = None) -> List[float]:
+        """複数テキストの重み付き合成埋め込み生成"""
+        return self._embed_composite(texts, weights).tolist()
     
     def start_session(self, character_id: str) -> str:
         """新しいセッションを開始"""
         session_id = self.session_manager.create_session(character_id)
         self.active_session_id = session_id
         self.active_character_id = character_id
+        self.character_sessions[character_id][session_id] = None
+        now = datetime.now()
         
         # セッション状態エントリを作成
         session_state = SessionStateEntry(
-            id=str(uuid.uuid4()),
+            id=self._next_uuid(),
             session_id=session_id,
             character_id=character_id,
-            start_time=datetime.now(),
-            last_update=datetime.now(),
+            start_time=now,
+            last_update=now,
             interaction_count=0,
             internal_state_id="",
             relationship_state_id="",
@@ -172,7 +692,7 @@ class VectorDatabaseManager:
         self._save_session_state(session_state)
         
         # 振動バッファを初期化
-        self._initialize_oscillation_buffer(session_id)
+        self._initialize_oscillation_buffer(session_id, now)
         
         logger.info(f"Started new session: {session_id} for character: {character_id}")
         return session_id
@@ -183,6 +703,8 @@ class VectorDatabaseManager:
         if session_data:
             self.active_session_id = session_id
             self.active_character_id = session_data.get("character_id")
+            if self.active_character_id:
+                self.character_sessions[self.active_character_id][session_id] = None
             
             # セッション状態を更新
             self._update_session_state(session_id, {"active": True, "last_update": datetime.now()})
@@ -194,83 +716,93 @@ class VectorDatabaseManager:
             return True
         return False
     
-    def _initialize_oscillation_buffer(self, session_id: str):
+    def _get_or_create_buffer(self, session_id: str) -> Dict[str, _OscillationRing]:
+        """セッションの振動バッファを取得（なければ生成し、古いセッションから破棄）"""
+        buffers = self.oscillation_buffer
+        buffer = buffers.get(session_id)
+        if buffer is not None:
+            buffers.move_to_end(session_id)
+            return buffer
+        
+        buffer = buffers[session_id] = _new_oscillation_buffer()
+        while len(buffers) > self._max_tracked_sessions:
+            # 振動値は会話・振動パターンとして保存済みのため resume 時に復元できる
+            evicted_id, _ = buffers.popitem(last=False)
+            logger.debug(f"Evicted oscillation buffer for session {evicted_id}")
+        return buffer
+    
+    def _initialize_oscillation_buffer(self, session_id: str, now: Optional[datetime] = None):
         """振動バッファの初期化（新規追加）"""
-        buffer = self.oscillation_buffer[session_id]
+        buffer = self._get_or_create_buffer(session_id)
         
-        # セキュアエントロピーで初期値を生成
-        for _ in range(5):  # 最小限の初期値を生成
-            secure_oscillation = float(self.entropy_source.get_thermal_oscillation(0.3))
-            buffer["values"].append(secure_oscillation)
-            buffer["timestamps"].append(datetime.now())
+        # セキュアエントロピーで初期値を生成（最小限の初期値をまとめて生成）
+        samples = self.entropy_source.get_thermal_oscillation_batch(5, 0.3).tolist()
+        buffer["values"].extend(samples)
+        buffer["timestamps"].extend([now or datetime.now()] * len(samples))
         
         logger.info(f"Initialized oscillation buffer for session {session_id} with {len(buffer['values'])} initial values")
     
+    def _record_oscillation_samples(self, session_id: str, values: List[float], timestamp: datetime):
+        """振動値を軽量コレクションに記録（1値1行、埋め込みは値そのもの）"""
+        timestamp_iso = _isoformat(timestamp)
+        values = [float(value) for value in values]
+        # ChromaDB の get は ID 順で返すため、セッション内で時刻順に並ぶIDにする
+        # （末尾のUUIDは同一時刻の記録同士の重複防止）
+        id_prefix = f"osc-{session_id}-{timestamp.strftime('%Y%m%d%H%M%S%f')}"
+        self.collections[DataType.OSCILLATION_SAMPLE].add(
+            embeddings=[[value] for value in values],
+            documents=None,
+            metadatas=[{"session_id": session_id, "value": value, "timestamp": timestamp_iso} for value in values],
+            ids=[f"{id_prefix}-{i:06d}-{self._next_uuid()}" for i in range(len(values))]
+        )
+    
+    def _restore_from_samples(self, session_id: str) -> Tuple[List[float], List[datetime]]:
+        """軽量コレクションから新しい順に最大でリングバッファ分の振動値を取得（記録がなければ空）"""
+        collection = self.collections[DataType.OSCILLATION_SAMPLE]
+        # IDのみ取得して末尾（最新）のリングバッファ分に絞る
+        # （旧形式のUUIDのIDは "osc-" より前に並ぶため、より古いものとして扱われる）
+        sample_ids = collection.get(where={"session_id": session_id}, include=[])["ids"]
+        if not sample_ids:
+            return [], []
+        if len(sample_ids) > OSCILLATION_BUFFER_SIZE:
+            sample_ids = sorted(sample_ids)[-OSCILLATION_BUFFER_SIZE:]
+        results = collection.get(ids=sample_ids, include=["metadatas"])
+        metadatas = results["metadatas"] or []
+        values = np.fromiter((m["value"] for m in metadatas), dtype=float, count=len(metadatas))
+        timestamps = [datetime.fromisoformat(m["timestamp"]) for m in metadatas]
+        return values.tolist(), timestamps
+    
     def _restore_oscillation_buffer(self, session_id: str):
         """振動バッファをデータベースから復元（新規追加）"""
         try:
-            # データベースから振動パターンを取得
-            oscillation_results = self.collections[DataType.OSCILLATION_PATTERN].get(
-                where={"session_id": session_id},
-                include=["metadatas"],
-                limit=50  # 直近50件
-            )
-            
-            buffer = self.oscillation_buffer[session_id]
-            restored_count = 0
+            buffer = self._get_or_create_buffer(session_id)
             
-            if oscillation_results["metadatas"]:
-                for metadata in oscillation_results["metadatas"]:
-                    try:
-                        pattern_data = safe_json_loads(metadata["pattern_data"])
-                        if "history" in pattern_data and pattern_data["history"]:
-                            for value in pattern_data["history"]:
-                                buffer["values"].append(float(value))
-                                # タイムスタンプも復元
-                                timestamp = datetime.fromisoformat(metadata["timestamp"])
-                                buffer["timestamps"].append(timestamp)
-                                restored_count += 1
-                    except Exception as e:
-                        logger.warning(f"Failed to restore oscillation pattern: {e}")
-                        continue
-            
-            # 会話データからも振動値を復元
-            conversation_results = self.collections[DataType.CONVERSATION].get(
-                where={"session_id": session_id},
-                include=["metadatas"],
-                limit=50
-            )
+            # 軽量サンプルコレクションから一括で復元
+            sample_values, sample_timestamps = self._restore_from_samples(session_id)
+            buffer["values"].extend(sample_values)
+            buffer["timestamps"].extend(sample_timestamps)
+            restored_count = len(sample_values)
             
-            if conversation_results["metadatas"]:
-                for metadata in conversation_results["metadatas"]:
-                    try:
-                        if "oscillation_value" in metadata and metadata["oscillation_value"] is not None:
-                            buffer["values"].append(float(metadata["oscillation_value"]))
-                            timestamp = datetime.fromisoformat(metadata["timestamp"])
-                            buffer["timestamps"].append(timestamp)
-                            restored_count += 1
-                    except Exception as e:
-                        logger.warning(f"Failed to restore conversation oscillation: {e}")
-                        continue
+            # サンプル記録のない旧セッションは振動パターンと会話データから復元
+            if restored_count == 0:
+                restored_count = self._restore_legacy_oscillations(session_id, buffer)
             
             # データが不足している場合は補充
             if len(buffer["values"]) < 5:
                 shortage = 5 - len(buffer["values"])
                 logger.info(f"Insufficient restored data ({len(buffer['values'])}), generating {shortage} supplementary values")
                 
-                for _ in range(shortage):
-                    secure_oscillation = float(self.entropy_source.get_thermal_oscillation(0.3))
-                    buffer["values"].append(secure_oscillation)
-                    buffer["timestamps"].append(datetime.now())
-                    restored_count += 1
+                samples = self.entropy_source.get_thermal_oscillation_batch(shortage, 0.3).tolist()
+                buffer["values"].extend(samples)
+                buffer["timestamps"].extend([datetime.now()] * shortage)
+                restored_count += shortage
             
             # タイムスタンプ順にソート
             if len(buffer["values"]) == len(buffer["timestamps"]):
-                combined = list(zip(buffer["timestamps"], buffer["values"]))
-                combined.sort(key=lambda x: x[0])
-                buffer["timestamps"], buffer["values"] = zip(*combined)
-                buffer["timestamps"] = list(buffer["timestamps"])
-                buffer["values"] = list(buffer["values"])
+                timestamps = np.asarray(buffer["timestamps"], dtype="datetime64[us]")
+                order = np.argsort(timestamps, kind="stable")
+                values = np.asarray(buffer["values"], dtype=np.float64)
+                self.oscillation_buffer[session_id] = _new_oscillation_buffer(values[order], timestamps[order])
             
             logger.info(f"Restored {restored_count} oscillation values for session {session_id}")
             
@@ -279,61 +811,164 @@ class VectorDatabaseManager:
             # フォールバック：最小限の値を生成
             self._initialize_oscillation_buffer(session_id)
     
+    def _restore_legacy_oscillations(self, session_id: str, buffer: Dict[str, Any]) -> int:
+        """振動パターンと会話データから振動値を復元（サンプル記録導入前のセッション用）"""
+        # 振動パターンと会話データを並行して取得（直近50件ずつ）
+        query = {"where": {"session_id": session_id}, "include": ["metadatas"], "limit": 50}
+        pattern_future = self._query_executor.submit(self.collections[DataType.OSCILLATION_PATTERN].get, **query)
+        conversation_future = self._query_executor.submit(self.collections[DataType.CONVERSATION].get, **query)
+        oscillation_results = pattern_future.result()
+        conversation_results = conversation_future.result()
+        
+        restored_count = 0
+        
+        # 振動パターンの履歴を復元（JSONはまとめて解析）
+        pattern_rows = [
+            m for m in (oscillation_results["metadatas"] or [])
+            if m.get("pattern_data") and m.get("timestamp")
+        ]
+        for metadata, pattern_data in zip(pattern_rows, self._parse_pattern_rows(pattern_rows)):
+            try:
+                history = pattern_data.get("history") if isinstance(pattern_data, dict) else None
+                if history:
+                    # タイムスタンプも復元
+                    timestamp = datetime.fromisoformat(metadata["timestamp"])
+                    values = np.asarray(history, dtype=np.float64)
+                    buffer["values"].extend(values)
+                    buffer["timestamps"].extend([timestamp] * len(values))
+                    restored_count += len(values)
+            except Exception as e:
+                logger.warning(f"Failed to restore oscillation pattern: {e}")
+        
+        # 会話データからも振動値を復元
+        for metadata in conversation_results["metadatas"] or []:
+            try:
+                if metadata.get("oscillation_value") is not None:
+                    value = float(metadata["oscillation_value"])
+                    timestamp = datetime.fromisoformat(metadata["timestamp"])
+                    buffer["values"].append(value)
+                    buffer["timestamps"].append(timestamp)
+                    restored_count += 1
+            except Exception as e:
+                logger.warning(f"Failed to restore conversation oscillation: {e}")
+        
+        return restored_count
+    
+    @staticmethod
+    def _parse_pattern_rows(rows: List[Dict[str, Any]]) -> List[Any]:
+        """振動パターンのJSONを一括解析（不正な行が含まれる場合は行単位で解析）"""
+        try:
+            parsed = safe_json_loads("[" + ",".join(m["pattern_data"] for m in rows) + "]", parse_datetimes=False)
+            if len(parsed) != len(rows):
+                raise ValueError("pattern row count mismatch")
+            return parsed
+        except Exception:
+            parsed = []
+            for metadata in rows:
+                try:
+                    parsed.append(safe_json_loads(metadata["pattern_data"], parse_datetimes=False))
+                except Exception as e:
+                    logger.warning(f"Failed to restore oscillation pattern: {e}")
+                    parsed.append(None)
+            return parsed
+    
     def _ensure_oscillation_data(self, session_id: str, min_samples: int = MIN_OSCILLATION_SAMPLES):
         """振動データが不足している場合の自動補充（新規追加）"""
-        buffer = self.oscillation_buffer[session_id]
+        buffer = self._get_or_create_buffer(session_id)
         
         if len(buffer["values"]) < min_samples:
             shortage = min_samples - len(buffer["values"])
             logger.info(f"Supplementing {shortage} oscillation samples for session {session_id}")
             
-            for _ in range(shortage):
-                secure_oscillation = float(self.entropy_source.get_thermal_oscillation(0.3))
-                pink_component = float(self.pink_noise_generator.generate_secure_pink_noise())
-                combined = float(secure_oscillation * 0.7 + pink_component * 0.3)
-                
-                buffer["values"].append(combined)
-                buffer["timestamps"].append(datetime.now())
+            secure_oscillation = self.entropy_source.get_thermal_oscillation_batch(shortage, 0.3)
+            pink_component = self.pink_noise_generator.generate_secure_pink_noise_batch(shortage)
+            combined = secure_oscillation * 0.7 + pink_component * 0.3
+            
+            buffer["values"].extend(combined)
+            buffer["timestamps"].extend([datetime.now()] * shortage)
     
     def _save_session_state(self, session_state: SessionStateEntry):
-        """セッション状態をデータベースに保存（修正版）"""
-        state_text = f"Session: {session_state.session_id}\nCharacter: {session_state.character_id}"
-        embedding = self._generate_embedding(state_text)
+        """セッション状態をデータベースに保存（修正版）
         
-        # メタデータの安全な構築
-        metadata = {
-            "id": str(session_state.id),
+        セッション状態は session_id / character_id の where 条件でのみ取得し、
+        類似検索はしないため埋め込みは生成せずゼロベクトルを格納する。
+        """
+        state_text = "Session: " + str(session_state.session_id) + "\nCharacter: " + str(session_state.character_id)
+        embedding = self._zero_vec
+        
+        # 開始直後は開始時刻と更新時刻が同一なので変換を1回で済ませる
+        start_time_iso = session_state.start_time.isoformat()
+        if session_state.last_update == session_state.start_time:
+            last_update_iso = start_time_iso
+        else:
+            last_update_iso = session_state.last_update.isoformat()
+        
+        # メタデータの構築（型はスキーマで確定しているため個別に変換）
+        metadata = _prune_metadata(DataType.SESSION_STATE, {
+            "id": session_state.id,
             "session_id": str(session_state.session_id),
             "character_id": str(session_state.character_id),
-            "start_time": session_state.start_time.isoformat(),
-            "last_update": session_state.last_update.isoformat(),
+            "start_time": start_time_iso,
+            "last_update": last_update_iso,
             "interaction_count": int(session_state.interaction_count),
             "internal_state_id": str(session_state.internal_state_id),
             "relationship_state_id": str(session_state.relationship_state_id),
             "oscillation_history": safe_json_dumps(session_state.oscillation_history),
             "environment_state": safe_json_dumps(session_state.environment_state),
             "active": bool(session_state.active)
-        }
+        })
         
-        # フィルタリングを適用
-        metadata = filter_metadata(metadata)
+        # 別セッションの保留分は先に書き込み、このレコードは直後の更新を待って保留
+        self._release_session_writes(force=True)
+        record = {"embedding": embedding, "document": state_text, "metadata": metadata, "id": session_state.id}
+        with self._session_write_lock:
+            self._pending_session_writes[session_state.session_id] = (record, time.monotonic())
+    
+    def _release_session_writes(self, force: bool = False):
+        """保留中のセッション状態レコードを書き込みバッファへ送る
         
-        self.collections[DataType.SESSION_STATE].add(
-            embeddings=[embedding],
-            documents=[state_text],
-            metadatas=[metadata],
-            ids=[session_state.id]
-        )
+        Args:
+            force: 待機時間に関係なくすべて送る
+        """
+        if not self._pending_session_writes:
+            return
+        now = time.monotonic()
+        # 取り出しはロック下で行い、取り出したレコードには以降の更新が入らないようにする
+        with self._session_write_lock:
+            released = [
+                self._pending_session_writes.pop(session_id)[0]
+                for session_id, (_, parked_at) in list(self._pending_session_writes.items())
+                if force or now - parked_at >= self._session_coalesce_window
+            ]
+        for record in released:
+            self._enqueue_add(DataType.SESSION_STATE, record["embedding"], record["document"],
+                              record["metadata"], record["id"])
     
     def _update_session_state(self, session_id: str, updates: Dict[str, Any]):
         """セッション状態を更新"""
         # セッション管理システムを更新
         self.session_manager.update_session(session_id, updates)
+        self._apply_session_updates(session_id, updates)
+    
+    def _apply_session_updates(self, session_id: str, updates: Dict[str, Any], validated: bool = False):
+        """未書き込みの開始レコードがあれば同じ行に反映してから書き込む
+        
+        validated=True の場合、updates はメタデータとしてそのまま格納できる値のみ
+        （セッション状態の項目のみ）とみなし、filter_metadata による変換を省く。
+        """
+        # 取得と更新を同じロック下で行い、書き込み済みのレコードへの更新を取りこぼさない
+        with self._session_write_lock:
+            pending = self._pending_session_writes.get(session_id)
+            if pending is not None:
+                if not validated:
+                    updates = filter_metadata({k: v for k, v in updates.items() if k in _SESSION_STATE_FIELDS})
+                pending[0]["metadata"].update(updates)
+        self._release_session_writes()
     
     def _update_oscillation_history(self, pattern: OscillationPatternData):
         """振動履歴を更新（セキュアエントロピー統合版・修正版）"""
         if self.active_session_id:
-            buffer = self.oscillation_buffer[self.active_session_id]
+            buffer = self._get_or_create_buffer(self.active_session_id)
             
             # セキュアエントロピーベースの新しい振動値を生成
             if pattern.secure_entropy_enabled:
@@ -344,20 +979,15 @@ class VectorDatabaseManager:
             else:
                 # パターンの履歴から値を追加
                 if pattern.history:
-                    buffer["values"].extend([float(v) for v in pattern.history])
+                    buffer["values"].extend(pattern.history)
                 else:
                     # フォールバック：基本的な振動値を生成
                     fallback_oscillation = float(self.entropy_source.get_thermal_oscillation(pattern.amplitude))
                     buffer["values"].append(fallback_oscillation)
             
+            # バッファサイズはリングバッファの容量で自動的に制限される
             buffer["timestamps"].append(pattern.timestamp)
             
-            # バッファサイズ制限
-            max_size = 1000
-            if len(buffer["values"]) > max_size:
-                buffer["values"] = buffer["values"][-max_size:]
-                buffer["timestamps"] = buffer["timestamps"][-max_size:]
-            
             logger.debug(f"Updated oscillation history for session {self.active_session_id}: {len(buffer['values'])} values")
     
     def add_character_profile(self, name: str, background: str, instruction: str,
@@ -368,7 +998,7 @@ class VectorDatabaseManager:
                             existential_parameters: Dict[str, float],
                             engine_parameters: Dict[str, Dict[str, Any]]) -> str:
         """完全なキャラクタープロファイルの追加（v3.1対応・修正版）"""
-        profile_id = str(uuid.uuid4())
+        profile_id = self._next_uuid()
         entry = CharacterProfileEntry(
             id=profile_id,
             name=name,
@@ -385,43 +1015,39 @@ class VectorDatabaseManager:
         )
         
         # プロファイルの埋め込み作成（演技指導を重視）
+        dumps = _JsonMemo()
         profile_texts = [
             f"Name: {name}",
             f"Background: {background}",
             f"Instruction: {instruction}",  # 演技指導を含める
-            f"Personality: {safe_json_dumps(personality_traits)}",
-            f"Values: {safe_json_dumps(values)}",
+            f"Personality: {dumps(personality_traits)}",
+            f"Values: {dumps(values)}",
             f"Goals: {', '.join(goals)}",
             f"Fears: {', '.join(fears)}",
-            f"Existential: {safe_json_dumps(existential_parameters)}"
+            f"Existential: {dumps(existential_parameters)}"
         ]
         
         # 演技指導に高い重みを与える
         weights = [1.0, 1.0, 2.0, 1.0, 1.0, 1.0, 1.0, 1.5]
-        embedding = self._generate_composite_embedding(profile_texts, weights)
+        embedding = self._embed_composite(profile_texts, weights)
         
-        # メタデータの安全な構築
-        metadata = filter_metadata({
-            "id": str(profile_id),
+        # メタデータの構築（型はスキーマで確定しているため個別に変換）
+        metadata = _prune_metadata(DataType.CHARACTER_PROFILE, {
+            "id": profile_id,
             "name": str(name),
             "background": str(background),
             "instruction": str(instruction),
-            "personality_traits": safe_json_dumps(personality_traits),
-            "values": safe_json_dumps(values),
-            "goals": safe_json_dumps(goals),
-            "fears": safe_json_dumps(fears),
-            "existential_parameters": safe_json_dumps(existential_parameters),
-            "engine_parameters": safe_json_dumps(engine_parameters),
+            "personality_traits": dumps(personality_traits),
+            "values": dumps(values),
+            "goals": dumps(goals),
+            "fears": dumps(fears),
+            "existential_parameters": dumps(existential_parameters),
+            "engine_parameters": dumps(engine_parameters),
             "timestamp": entry.timestamp.isoformat(),
             "version": str(entry.version)
         })
         
-        self.collections[DataType.CHARACTER_PROFILE].add(
-            embeddings=[embedding],
-            documents=["\n".join(profile_texts)],
-            metadatas=[metadata],
-            ids=[profile_id]
-        )
+        self._enqueue_add(DataType.CHARACTER_PROFILE, embedding, "\n".join(profile_texts), metadata, profile_id)
         
         self.active_character_id = profile_id
         
@@ -433,7 +1059,7 @@ class VectorDatabaseManager:
     
     def add_internal_state(self, state_data: Dict[str, Any]) -> str:
         """統合内部状態の保存（修正版）"""
-        state_id = str(uuid.uuid4())
+        state_id = self._next_uuid()
         entry = InternalStateEntry(
             id=state_id,
             timestamp=datetime.now(),
@@ -459,47 +1085,43 @@ class VectorDatabaseManager:
         )
         
         # 統合状態の埋め込み作成
-        state_summary = f"""
-        Energy: {entry.overall_energy}
-        Cognitive Load: {entry.cognitive_load}
-        Emotional Tone: {entry.emotional_tone}
-        Relational Distance: {entry.relational_distance}
-        Paradox Tension: {entry.paradox_tension}
-        Oscillation Stability: {entry.oscillation_stability}
-        """
-        embedding = self._generate_embedding(state_summary)
+        state_summary = _INTERNAL_STATE_TEMPLATE.format(
+            energy=entry.overall_energy,
+            cognitive_load=entry.cognitive_load,
+            emotional_tone=entry.emotional_tone,
+            relational_distance=entry.relational_distance,
+            paradox_tension=entry.paradox_tension,
+            oscillation_stability=entry.oscillation_stability
+        )
+        embedding = self._embed(state_summary)
         
-        # メタデータの安全な構築
-        metadata = filter_metadata({
-            "id": str(state_id),
+        # メタデータの構築（同一オブジェクトのJSON化は1回のみ）
+        dumps = _JsonMemo()
+        metadata = _prune_metadata(DataType.INTERNAL_STATE, {
+            "id": state_id,
             "timestamp": entry.timestamp.isoformat(),
-            "consciousness_state": safe_json_dumps(entry.consciousness_state),
-            "qualia_state": safe_json_dumps(entry.qualia_state),
-            "emotion_state": safe_json_dumps(entry.emotion_state),
-            "empathy_state": safe_json_dumps(entry.empathy_state),
-            "motivation_state": safe_json_dumps(entry.motivation_state),
-            "curiosity_state": safe_json_dumps(entry.curiosity_state),
-            "conflict_state": safe_json_dumps(entry.conflict_state),
-            "relationship_state": safe_json_dumps(entry.relationship_state),
-            "existential_need_state": safe_json_dumps(entry.existential_need_state),
-            "growth_wish_state": safe_json_dumps(entry.growth_wish_state),
-            "overall_energy": safe_metadata_value(entry.overall_energy, 0.5),
-            "cognitive_load": safe_metadata_value(entry.cognitive_load, 0.3),
+            "consciousness_state": dumps(entry.consciousness_state),
+            "qualia_state": dumps(entry.qualia_state),
+            "emotion_state": dumps(entry.emotion_state),
+            "empathy_state": dumps(entry.empathy_state),
+            "motivation_state": dumps(entry.motivation_state),
+            "curiosity_state": dumps(entry.curiosity_state),
+            "conflict_state": dumps(entry.conflict_state),
+            "relationship_state": dumps(entry.relationship_state),
+            "existential_need_state": dumps(entry.existential_need_state),
+            "growth_wish_state": dumps(entry.growth_wish_state),
+            "overall_energy": _meta_number(entry.overall_energy, 0.5),
+            "cognitive_load": _meta_number(entry.cognitive_load, 0.3),
             "emotional_tone": str(entry.emotional_tone),
-            "attention_focus": safe_json_dumps(entry.attention_focus) if entry.attention_focus else "",
-            "relational_distance": safe_metadata_value(entry.relational_distance, 0.6),
-            "paradox_tension": safe_metadata_value(entry.paradox_tension, 0.5),
-            "oscillation_stability": safe_metadata_value(entry.oscillation_stability, 0.7),
+            "attention_focus": dumps(entry.attention_focus) if entry.attention_focus else "",
+            "relational_distance": _meta_number(entry.relational_distance, 0.6),
+            "paradox_tension": _meta_number(entry.paradox_tension, 0.5),
+            "oscillation_stability": _meta_number(entry.oscillation_stability, 0.7),
             "character_id": str(entry.character_id),
             "session_id": str(entry.session_id)
         })
         
-        self.collections[DataType.INTERNAL_STATE].add(
-            embeddings=[embedding],
-            documents=[state_summary],
-            metadatas=[metadata],
-            ids=[state_id]
-        )
+        self._enqueue_add(DataType.INTERNAL_STATE, embedding, state_summary, metadata, state_id)
         
         # セッション状態を更新
         if self.active_session_id:
@@ -512,9 +1134,13 @@ class VectorDatabaseManager:
                              current_distance: float, paradox_tension: float,
                              oscillation_pattern: Optional[Dict[str, Any]] = None,
                              stability_index: float = 0.7, dependency_risk: float = 0.2,
-                             growth_potential: float = 0.8) -> str:
-        """関係性状態の保存（セキュアエントロピー統合版・修正版）"""
-        state_id = str(uuid.uuid4())
+                             growth_potential: float = 0.8, embed_for_search: bool = False) -> str:
+        """関係性状態の保存（セキュアエントロピー統合版・修正版）
+        
+        embed_for_search が False の場合は類似検索の対象外としてゼロベクトルを格納する
+        （関係性状態は session_id での取得のみに使用）。
+        """
+        state_id = self._next_uuid()
         
         # セキュアエントロピー強化振動パターンの処理
         if oscillation_pattern:
@@ -563,14 +1189,14 @@ class VectorDatabaseManager:
             )
         
         # セキュアエントロピー情報を追加
-        entropy_quality = self.entropy_source.assess_entropy_quality()
+        entropy_quality = self._get_entropy_quality()
         pattern_data.entropy_source_info = entropy_quality
         
         # セキュアエントロピーベースの初期履歴生成
         if pattern_data.secure_entropy_enabled and not pattern_data.history:
-            for _ in range(10):
-                secure_oscillation = float(self.entropy_source.get_thermal_oscillation(pattern_data.amplitude))
-                pattern_data.history.append(secure_oscillation)
+            pattern_data.history.extend(
+                self.entropy_source.get_thermal_oscillation_batch(10, pattern_data.amplitude).tolist()
+            )
         
         entry = RelationshipStateEntry(
             id=state_id,
@@ -588,41 +1214,36 @@ class VectorDatabaseManager:
         )
         
         # 関係性状態の埋め込み作成
-        relationship_text = f"""
-        Attachment: {attachment_level}
-        Current Distance: {current_distance}
-        Optimal Distance: {optimal_distance}
-        Paradox Tension: {paradox_tension}
-        Stability: {stability_index}
-        Dependency Risk: {dependency_risk}
-        Growth Potential: {growth_potential}
-        Secure Entropy: {pattern_data.secure_entropy_enabled}
-        Entropy Source: {entropy_quality.get('entropy_source', 'unknown')}
-        """
-        embedding = self._generate_embedding(relationship_text)
-        
-        # メタデータの安全な構築
-        metadata = filter_metadata({
-            "id": str(state_id),
-            "attachment_level": safe_metadata_value(attachment_level, 0.5),
-            "optimal_distance": safe_metadata_value(optimal_distance, 0.5),
-            "current_distance": safe_metadata_value(current_distance, 0.5),
-            "paradox_tension": safe_metadata_value(paradox_tension, 0.5),
+        relationship_text = _RELATIONSHIP_TEMPLATE.format(
+            attachment=attachment_level,
+            current_distance=current_distance,
+            optimal_distance=optimal_distance,
+            paradox_tension=paradox_tension,
+            stability=stability_index,
+            dependency_risk=dependency_risk,
+            growth_potential=growth_potential,
+            secure_entropy=pattern_data.secure_entropy_enabled,
+            entropy_source=entropy_quality.get('entropy_source', 'unknown')
+        )
+        embedding = self._embed(relationship_text) if embed_for_search else self._zero_vec
+        
+        # メタデータの構築（型はスキーマで確定しているため個別に変換）
+        metadata = _prune_metadata(DataType.RELATIONSHIP, {
+            "id": state_id,
+            "attachment_level": _meta_number(attachment_level, 0.5),
+            "optimal_distance": _meta_number(optimal_distance, 0.5),
+            "current_distance": _meta_number(current_distance, 0.5),
+            "paradox_tension": _meta_number(paradox_tension, 0.5),
             "oscillation_pattern": safe_json_dumps(pattern_data.to_dict()),
-            "stability_index": safe_metadata_value(stability_index, 0.7),
-            "dependency_risk": safe_metadata_value(dependency_risk, 0.2),
-            "growth_potential": safe_metadata_value(growth_potential, 0.8),
+            "stability_index": _meta_number(stability_index, 0.7),
+            "dependency_risk": _meta_number(dependency_risk, 0.2),
+            "growth_potential": _meta_number(growth_potential, 0.8),
             "timestamp": entry.timestamp.isoformat(),
             "character_id": str(entry.character_id),
             "session_id": str(entry.session_id)
         })
         
-        self.collections[DataType.RELATIONSHIP].add(
-            embeddings=[embedding],
-            documents=[relationship_text],
-            metadatas=[metadata],
-            ids=[state_id]
-        )
+        self._enqueue_add(DataType.RELATIONSHIP, embedding, relationship_text, metadata, state_id)
         
         # セッション状態を更新
         if self.active_session_id:
@@ -636,7 +1257,7 @@ class VectorDatabaseManager:
     
     def add_oscillation_pattern(self, pattern_data: Dict[str, Any]) -> str:
         """振動パターンの保存（セキュアエントロピー統合版・修正版）"""
-        pattern_id = str(uuid.uuid4())
+        pattern_id = self._next_uuid()
         
         pattern = OscillationPatternData(
             amplitude=pattern_data.get("amplitude", 0.3),
@@ -659,46 +1280,42 @@ class VectorDatabaseManager:
         )
         
         # セキュアエントロピー情報を追加
-        pattern.entropy_source_info = self.entropy_source.assess_entropy_quality()
+        pattern.entropy_source_info = self._get_entropy_quality()
         
         # セキュアエントロピーベースの履歴生成
         if pattern.secure_entropy_enabled:
-            enhanced_history = []
-            for _ in range(20):  # より長い履歴
-                secure_oscillation = float(self.entropy_source.get_thermal_oscillation(pattern.amplitude))
-                pink_component = float(self.pink_noise_generator.generate_secure_pink_noise())
-                combined = float(secure_oscillation * 0.6 + pink_component * 0.4)
-                enhanced_history.append(combined)
-            pattern.history = enhanced_history
+            # より長い履歴をまとめて生成
+            secure_oscillation = self.entropy_source.get_thermal_oscillation_batch(20, pattern.amplitude)
+            pink_component = self.pink_noise_generator.generate_secure_pink_noise_batch(20)
+            pattern.history = (secure_oscillation * 0.6 + pink_component * 0.4).tolist()
         
         # 振動パターンの埋め込み作成
-        pattern_text = f"""
-        Secure Enhanced Oscillation Pattern:
-        Amplitude: {pattern.amplitude}
-        Frequency: {pattern.frequency}
-        Damping: {pattern.damping_coefficient} ({pattern.damping_type})
-        Pink Noise: {pattern.pink_noise_intensity if pattern.pink_noise_enabled else 0}
-        Secure Entropy: {pattern.secure_entropy_enabled}
-        Entropy Source: {pattern.entropy_source_info.get('entropy_source', 'unknown')}
-        Stability: {1.0 / (1.0 + np.std(pattern.history) if pattern.history else 1.0)}
-        """
-        embedding = self._generate_embedding(pattern_text)
+        pattern_text = _OSCILLATION_PATTERN_TEMPLATE.format(
+            amplitude=pattern.amplitude,
+            frequency=pattern.frequency,
+            damping=pattern.damping_coefficient,
+            damping_type=pattern.damping_type,
+            pink_noise=pattern.pink_noise_intensity if pattern.pink_noise_enabled else 0,
+            secure_entropy=pattern.secure_entropy_enabled,
+            entropy_source=pattern.entropy_source_info.get('entropy_source', 'unknown'),
+            stability=1.0 / (1.0 + pattern.std())
+        )
+        embedding = self._embed(pattern_text)
         
-        # メタデータの安全な構築
-        metadata = filter_metadata({
-            "id": str(pattern_id),
+        # メタデータの構築（型はスキーマで確定しているため個別に変換）
+        metadata = _prune_metadata(DataType.OSCILLATION_PATTERN, {
+            "id": pattern_id,
             "pattern_data": safe_json_dumps(pattern.to_dict()),
             "timestamp": pattern.timestamp.isoformat(),
             "character_id": str(self.active_character_id or ""),
             "session_id": str(self.active_session_id or "")
         })
         
-        self.collections[DataType.OSCILLATION_PATTERN].add(
-            embeddings=[embedding],
-            documents=[pattern_text],
-            metadatas=[metadata],
-            ids=[pattern_id]
-        )
+        self._enqueue_add(DataType.OSCILLATION_PATTERN, embedding, pattern_text, metadata, pattern_id)
+        
+        # 復元用の軽量サンプルも記録
+        if self.active_session_id:
+            self._record_oscillation_samples(self.active_session_id, pattern.history, pattern.timestamp)
         
         # 振動履歴を更新
         self._update_oscillation_history(pattern)
@@ -707,10 +1324,13 @@ class VectorDatabaseManager:
         return pattern_id
     
     def add_secure_entropy_log(self, entropy_value: int, normalized_value: float, 
-                              source_type: str) -> str:
-        """セキュアエントロピーログの保存（修正版）"""
-        entropy_id = str(uuid.uuid4())
-        quality_metrics = self.entropy_source.assess_entropy_quality()
+                              source_type: str, now: Optional[datetime] = None) -> str:
+        """セキュアエントロピーログの保存（修正版）
+        
+        now を指定した場合はそのタイムスタンプで記録する（会話追加時は会話と同じ時刻）。
+        """
+        entropy_id = self._next_uuid()
+        quality_metrics = self._get_entropy_quality()
         
         entry = SecureEntropyEntry(
             id=entropy_id,
@@ -718,40 +1338,34 @@ class VectorDatabaseManager:
             normalized_value=normalized_value,
             source_type=source_type,
             quality_metrics=quality_metrics,
-            timestamp=datetime.now(),
+            timestamp=now or datetime.now(),
             character_id=self.active_character_id or "",
             session_id=self.active_session_id or ""
         )
         
-        # エントロピーログの埋め込み作成
-        entropy_text = f"""
-        Secure Entropy Log:
-        Source: {source_type}
-        Value: {entropy_value}
-        Normalized: {normalized_value:.6f}
-        Quality: {quality_metrics.get('success_rate', 0.0):.3f}
-        Architecture: {quality_metrics.get('architecture', 'unknown')}
-        """
-        embedding = self._generate_embedding(entropy_text)
+        # エントロピーログのテキスト（意味検索の対象外のため通常は埋め込みを生成しない）
+        entropy_text = _ENTROPY_LOG_TEMPLATE.format(
+            source=source_type,
+            value=entropy_value,
+            normalized=normalized_value,
+            quality=quality_metrics.get('success_rate', 0.0),
+            architecture=quality_metrics.get('architecture', 'unknown')
+        )
+        embedding = self._embed_templated(entropy_text) if self.embed_entropy_logs else self._zero_vec
         
-        # メタデータの安全な構築
-        metadata = filter_metadata({
-            "id": str(entropy_id),
+        # メタデータの構築（型はスキーマで確定しているため個別に変換）
+        metadata = _prune_metadata(DataType.SECURE_ENTROPY, {
+            "id": entropy_id,
             "entropy_value": int(entropy_value),
-            "normalized_value": safe_metadata_value(normalized_value, 0.5),
+            "normalized_value": _meta_number(normalized_value, 0.5),
             "source_type": str(source_type),
-            "quality_metrics": safe_json_dumps(quality_metrics),
-            "timestamp": entry.timestamp.isoformat(),
+            "quality_metrics": self._get_entropy_quality_json(),
+            "timestamp": _isoformat(entry.timestamp),
             "character_id": str(entry.character_id),
             "session_id": str(entry.session_id)
         })
         
-        self.collections[DataType.SECURE_ENTROPY].add(
-            embeddings=[embedding],
-            documents=[entropy_text],
-            metadatas=[metadata],
-            ids=[entropy_id]
-        )
+        self._enqueue_add(DataType.SECURE_ENTROPY, embedding, entropy_text, metadata, entropy_id)
         
         logger.info(f"Added secure entropy log: {entropy_id} (source: {source_type})")
         return entropy_id
@@ -760,29 +1374,22 @@ class VectorDatabaseManager:
         """セキュアエントロピーシステムの状態取得（新規追加）"""
         quality = self.entropy_source.assess_entropy_quality()
         
-        # 最近のエントロピー履歴
-        recent_entropy = []
-        for _ in range(10):
-            entropy_val = self.entropy_source.get_secure_entropy(4)
-            normalized_val = self.entropy_source.get_normalized_entropy()
-            recent_entropy.append({
-                "raw_value": int(entropy_val),
-                "normalized": float(normalized_val)
-            })
-        
-        # 統計計算
-        normalized_values = [e["normalized"] for e in recent_entropy]
-        mean_entropy = float(np.mean(normalized_values))
-        std_entropy = float(np.std(normalized_values))
+        # 最近のエントロピー履歴（まとめて取得して一括で統計計算）
+        raw_values = self.entropy_source.get_secure_entropy_batch(10, 4)
+        normalized_values = self.entropy_source.get_normalized_entropy_batch(10)
+        recent_entropy = [
+            {"raw_value": raw, "normalized": normalized}
+            for raw, normalized in zip(raw_values.tolist(), normalized_values.tolist())
+        ]
         
         return {
             "entropy_source_quality": quality,
             "recent_entropy_samples": recent_entropy,
             "entropy_statistics": {
-                "mean": float(mean_entropy),
-                "std": float(std_entropy),
-                "min": float(np.min(normalized_values)),
-                "max": float(np.max(normalized_values))
+                "mean": float(normalized_values.mean()),
+                "std": float(normalized_values.std()),
+                "min": float(normalized_values.min()),
+                "max": float(normalized_values.max())
             },
             "pink_noise_generator_status": {
                 "octaves": self.pink_noise_generator.octaves,
@@ -807,7 +1414,6 @@ class VectorDatabaseManager:
     
     def get_session_state(self, session_id: Optional[str] = None) -> Dict[str, Any]:
         """セッションの現在の状態を取得（新規追加）"""
-        from oscillation.metrics import calculate_oscillation_metrics
         
         sid = session_id or self.active_session_id
         if not sid:
@@ -834,30 +1440,30 @@ class VectorDatabaseManager:
         }
         
         try:
-            # 最新の内部状態を取得
-            internal_results = self.collections[DataType.INTERNAL_STATE].get(
-                where={"session_id": sid},
-                include=["metadatas"],
-                limit=1
+            # 内部状態・関係性状態・最近の会話を並行して取得
+            queries = [
+                (DataType.INTERNAL_STATE, 1),
+                (DataType.RELATIONSHIP, 1),
+                (DataType.CONVERSATION, 5),
+            ]
+            internal_results, relationship_results, conversation_results = self._query_executor.map(
+                lambda query: self.collections[query[0]].get(
+                    where={"session_id": sid},
+                    include=["metadatas"],
+                    limit=query[1]
+                ),
+                queries
             )
+            
+            # 最新の内部状態
             if internal_results["metadatas"]:
                 state["internal_state"] = internal_results["metadatas"][0]
             
-            # 最新の関係性状態を取得
-            relationship_results = self.collections[DataType.RELATIONSHIP].get(
-                where={"session_id": sid},
-                include=["metadatas"],
-                limit=1
-            )
+            # 最新の関係性状態
             if relationship_results["metadatas"]:
                 state["relationship_state"] = relationship_results["metadatas"][0]
             
-            # 最近の会話を取得
-            conversation_results = self.collections[DataType.CONVERSATION].get(
-                where={"session_id": sid},
-                include=["metadatas"],
-                limit=5
-            )
+            # 最近の会話
             state["recent_conversations"] = conversation_results["metadatas"]
             
             return state
@@ -867,7 +1473,6 @@ class VectorDatabaseManager:
     
     def calculate_oscillation_metrics(self, session_id: Optional[str] = None) -> Dict[str, Any]:
         """振動メトリクスを計算（外部モジュールに委譲）"""
-        from oscillation.metrics import calculate_oscillation_metrics
         
         sid = session_id or self.active_session_id
         if not sid:
@@ -879,13 +1484,8 @@ class VectorDatabaseManager:
         if sid not in self.oscillation_buffer:
             return {"error": "No oscillation data"}
         
-        # NumPy配列の可能性があるのでリストに変換
-        values = self.oscillation_buffer[sid]["values"]
-        if isinstance(values, np.ndarray):
-            values = values.tolist()
-        else:
-            # 各要素も確実にfloat型に変換
-            values = [float(v) for v in values]
+        # リングバッファの有効範囲を一括でfloatのリストに変換
+        values = np.asarray(self._get_or_create_buffer(sid)["values"], dtype=np.float64).tolist()
         
         # 外部モジュールに計算を委譲
         return calculate_oscillation_metrics(values, self.entropy_source)
@@ -897,7 +1497,55 @@ class VectorDatabaseManager:
                         oscillation_value: Optional[float] = None,
                         relational_distance: Optional[float] = None) -> str:
         """会話データの追加（v3.1拡張版 + セキュアエントロピー統合・修正版）"""
-        conversation_id = str(uuid.uuid4())
+        entry, combined_text, metadata = self._prepare_conversation(
+            user_input, ai_response, context, consciousness_level,
+            emotional_state, oscillation_value, relational_distance
+        )
+        embedding = self._embed(combined_text)
+        
+        self._enqueue_add(DataType.CONVERSATION, embedding, combined_text, metadata, entry.id)
+        self._finish_conversation(entry)
+        
+        logger.info(f"Added conversation with secure entropy: {entry.id}")
+        return entry.id
+    
+    def add_conversation_many(self, conversations: List[Dict[str, Any]]) -> List[str]:
+        """複数の会話データをまとめて追加（埋め込みは1回の推論、書き込みは1回の add）
+        
+        Args:
+            conversations: add_conversation の引数を表す辞書のリスト
+            
+        Returns:
+            追加した会話IDのリスト
+        """
+        if not conversations:
+            return []
+        
+        prepared = [self._prepare_conversation(**conversation) for conversation in conversations]
+        embeddings = self._embed_many([combined_text for _, combined_text, _ in prepared])
+        
+        self.collections[DataType.CONVERSATION].add(
+            embeddings=list(embeddings),
+            documents=[combined_text for _, combined_text, _ in prepared],
+            metadatas=[metadata for _, _, metadata in prepared],
+            ids=[entry.id for entry, _, _ in prepared]
+        )
+        
+        for entry, _, _ in prepared:
+            self._finish_conversation(entry)
+        
+        logger.info(f"Added {len(prepared)} conversations with secure entropy")
+        return [entry.id for entry, _, _ in prepared]
+    
+    def _prepare_conversation(self, user_input: str, ai_response: str,
+                              context: Dict[str, Any] = None,
+                              consciousness_level: Optional[int] = None,
+                              emotional_state: Optional[Dict[str, float]] = None,
+                              oscillation_value: Optional[float] = None,
+                              relational_distance: Optional[float] = None
+                              ) -> Tuple[ConversationEntry, str, Dict[str, Any]]:
+        """会話エントリ・埋め込み対象テキスト・メタデータを構築"""
+        conversation_id = self._next_uuid()
         
         # セキュアエントロピーベースの振動値生成（指定されていない場合）
         if oscillation_value is None:
@@ -922,73 +1570,64 @@ class VectorDatabaseManager:
         )
         
         # 埋め込み対象テキスト作成
-        combined_text = f"User: {user_input}\nAI: {ai_response}"
+        parts = [f"User: {user_input}", f"AI: {ai_response}"]
         if consciousness_level:
-            combined_text += f"\nConsciousness Level: {consciousness_level}"
+            parts.append(f"Consciousness Level: {consciousness_level}")
+        emotional_state_json = safe_json_dumps(emotional_state) if emotional_state is not None else None
         if emotional_state:
-            combined_text += f"\nEmotions: {safe_json_dumps(emotional_state)}"
+            parts.append(f"Emotions: {emotional_state_json}")
         if oscillation_value is not None:
-            combined_text += f"\nOscillation: {oscillation_value}"
+            parts.append(f"Oscillation: {oscillation_value}")
         if relational_distance is not None:
-            combined_text += f"\nDistance: {relational_distance}"
-        
-        embedding = self._generate_embedding(combined_text)
+            parts.append(f"Distance: {relational_distance}")
+        combined_text = "\n".join(parts)
         
-        # メタデータの安全な構築（修正版）
+        # メタデータの安全な構築（オプション項目も1つの辞書リテラルで組み立てる）
+        character_id = entry.character_id
+        session_id = entry.session_id
         metadata = {
-            "id": str(conversation_id),
+            "id": conversation_id,
             "user_input": str(user_input),
             "ai_response": str(ai_response),
-            "timestamp": entry.timestamp.isoformat(),
+            "timestamp": _isoformat(entry.timestamp),
             "context": safe_json_dumps(context or {}),
-            "oscillation_value": safe_metadata_value(oscillation_value, 0.0),
-            "relational_distance": safe_metadata_value(relational_distance, 0.6)
+            "oscillation_value": _meta_number(oscillation_value, 0.0),
+            "relational_distance": _meta_number(relational_distance, 0.6),
+            "consciousness_level": int(consciousness_level) if consciousness_level is not None else None,
+            "emotional_state": emotional_state_json,
+            "character_id": str(character_id) if character_id is not None else None,
+            "session_id": str(session_id) if session_id is not None else None
         }
         
-        # オプション値の条件付き追加
-        if consciousness_level is not None:
-            metadata["consciousness_level"] = int(consciousness_level)
-        
-        if emotional_state is not None:
-            metadata["emotional_state"] = safe_json_dumps(emotional_state)
+        # 未指定（None）の項目と空文字列の項目を1回の走査でまとめて除外
+        metadata = {key: value for key, value in metadata.items() if value is not None and value != ""}
         
-        if entry.character_id is not None:
-            metadata["character_id"] = str(entry.character_id)
-        
-        if entry.session_id is not None:
-            metadata["session_id"] = str(entry.session_id)
-        
-        # フィルタリングを適用
-        metadata = filter_metadata(metadata)
-        
-        self.collections[DataType.CONVERSATION].add(
-            embeddings=[embedding],
-            documents=[combined_text],
-            metadatas=[metadata],
-            ids=[conversation_id]
-        )
+        return entry, combined_text, metadata
+    
+    def _finish_conversation(self, entry: ConversationEntry):
+        """会話追加後の振動バッファ・セッション・エントロピーログの更新"""
+        oscillation_value = entry.oscillation_value
         
         # 振動バッファに直接追加
         if self.active_session_id and oscillation_value is not None:
-            buffer = self.oscillation_buffer[self.active_session_id]
+            buffer = self._get_or_create_buffer(self.active_session_id)
             buffer["values"].append(float(oscillation_value))
             buffer["timestamps"].append(entry.timestamp)
+            self._record_oscillation_samples(self.active_session_id, [oscillation_value], entry.timestamp)
         
-        # セッションの相互作用カウントを更新
+        # セッションの相互作用カウントを更新（セッション管理側で直接加算）
         if self.active_session_id:
-            current_session = self.session_manager.load_session(self.active_session_id)
-            if current_session:
-                self._update_session_state(self.active_session_id, {
-                    "interaction_count": current_session.get("interaction_count", 0) + 1
-                })
+            try:
+                count = self.session_manager.increment_interaction_count(self.active_session_id)
+            except SessionNotFoundError:
+                pass
+            else:
+                self._apply_session_updates(self.active_session_id, {"interaction_count": count}, validated=True)
         
         # セキュアエントロピーログの記録
         entropy_val = self.entropy_source.get_secure_entropy(4)
         normalized_val = self.entropy_source.get_normalized_entropy()
-        self.add_secure_entropy_log(entropy_val, normalized_val, self.entropy_source.entropy_source)
-        
-        logger.info(f"Added conversation with secure entropy: {conversation_id}")
-        return conversation_id
+        self.add_secure_entropy_log(entropy_val, normalized_val, self.entropy_source.entropy_source, entry.timestamp)
     
     def search_by_instruction(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """演技指導に基づく検索（新規追加）"""
@@ -998,6 +1637,7 @@ class VectorDatabaseManager:
         results = self.collections[DataType.CHARACTER_PROFILE].query(
             query_embeddings=[query_embedding],
             n_results=top_k,
+            # 埋め込みベクトルは結果で使わないため取得しない（転送量の削減）
             include=["documents", "metadatas", "distances"]
         )
         
@@ -1018,7 +1658,6 @@ class VectorDatabaseManager:
     def get_character_evolution(self, character_id: Optional[str] = None, 
                               time_window: Optional[int] = None) -> Dict[str, Any]:
         """キャラクターの時間的進化を分析（新規追加）"""
-        from oscillation.metrics import calculate_oscillation_metrics
         
         char_id = character_id or self.active_character_id
         if not char_id:
@@ -1042,25 +1681,14 @@ class VectorDatabaseManager:
                 cutoff_time = datetime.min
             
             # 振動パターンの分析（修正版）
-            session_ids = []
-            # キャラクターに関連する全セッションを取得
-            session_results = self.collections[DataType.SESSION_STATE].get(
-                where={"character_id": char_id},
-                include=["metadatas"]
-            )
-            
-            for metadata in session_results["metadatas"]:
-                session_ids.append(metadata["session_id"])
+            session_ids = self._get_character_session_ids(char_id)
             
             # 振動パターンデータを統合
-            all_oscillation_values = []
-            for sid in session_ids:
-                if sid in self.oscillation_buffer:
-                    values = self.oscillation_buffer[sid]["values"]
-                    # NumPy配列の場合はリストに変換
-                    if isinstance(values, np.ndarray):
-                        values = values.tolist()
-                    all_oscillation_values.extend([float(v) for v in values])
+            oscillation_arrays = [
+                np.asarray(self._get_or_create_buffer(sid)["values"], dtype=np.float64)
+                for sid in session_ids if sid in self.oscillation_buffer
+            ]
+            all_oscillation_values = np.concatenate(oscillation_arrays).tolist() if oscillation_arrays else []
             
             if all_oscillation_values:
                 try:
@@ -1085,8 +1713,36 @@ class VectorDatabaseManager:
             logger.error(f"Error analyzing character evolution: {e}")
             return {"error": str(e)}
     
-    def export_session_data(self, session_id: Optional[str] = None) -> Dict[str, Any]:
-        """セッションデータのエクスポート（新規追加）"""
+    def _get_character_session_ids(self, character_id: str) -> List[str]:
+        """キャラクターのセッションID一覧を取得
+        
+        初回はセッション状態コレクションから過去の実行分を含めて索引を補完し、
+        以降はこのプロセスで開始・再開したセッションとあわせて索引から引く。
+        """
+        if character_id not in self._seeded_characters:
+            self._release_session_writes(force=True)
+            session_results = self.collections[DataType.SESSION_STATE].get(
+                where={"character_id": character_id},
+                include=["metadatas"]
+            )
+            known = self.character_sessions.get(character_id, {})
+            seeded = dict.fromkeys(metadata["session_id"] for metadata in session_results["metadatas"])
+            seeded.update(known)
+            self.character_sessions[character_id] = seeded
+            self._seeded_characters.add(character_id)
+        return list(self.character_sessions.get(character_id, ()))
+    
+    def export_session_data(self, session_id: Optional[str] = None,
+                            out: Optional[BinaryIO] = None) -> Dict[str, Any]:
+        """セッションデータのエクスポート（新規追加）
+        
+        Args:
+            session_id: 対象セッションID（省略時はアクティブセッション）
+            out: 指定した場合はJSONを逐次書き込み、全件をメモリに保持しない
+            
+        Returns:
+            エクスポートデータ（out 指定時はデータタイプごとの件数の要約）
+        """
         sid = session_id or self.active_session_id
         if not sid:
             return {"error": "No session specified"}
@@ -1094,48 +1750,87 @@ class VectorDatabaseManager:
         # 振動バッファのデータを安全に変換
         buffer_data = self.oscillation_buffer.get(sid, {"values": [], "timestamps": []})
         safe_buffer = {
-            "values": [float(v) for v in buffer_data["values"]],
+            "values": np.asarray(buffer_data["values"], dtype=np.float64).tolist(),
             "timestamps": [t.isoformat() if isinstance(t, datetime) else str(t) for t in buffer_data["timestamps"]]
         }
         
-        export_data = {
-            "session_id": sid,
-            "export_time": datetime.now().isoformat(),
-            "session_state": self.get_session_state(sid),
-            "conversations": [],
-            "internal_states": [],
-            "relationship_states": [],
-            "emotions": [],
-            "memories": [],
-            "secure_entropy_logs": [],  # ハードウェアから変更
-            "oscillation_buffer": safe_buffer  # 振動バッファもエクスポート
-        }
+        export_time = datetime.now().isoformat()
         
         try:
+            if out is not None:
+                header = {
+                    "session_id": sid,
+                    "export_time": export_time,
+                    "session_state": self.get_session_state(sid),
+                    "oscillation_buffer": safe_buffer  # 振動バッファもエクスポート
+                }
+                counts = self._write_session_export(out, sid, header)
+                return {"session_id": sid, "export_time": export_time, "exported": counts}
+            
+            export_data = {
+                "session_id": sid,
+                "export_time": export_time,
+                "session_state": self.get_session_state(sid)
+            }
+            
             # 各データタイプからセッション関連データを取得
-            for data_type, key in [
-                (DataType.CONVERSATION, "conversations"),
-                (DataType.INTERNAL_STATE, "internal_states"),
-                (DataType.RELATIONSHIP, "relationship_states"),
-                (DataType.EMOTION, "emotions"),
-                (DataType.MEMORY, "memories"),
-                (DataType.SECURE_ENTROPY, "secure_entropy_logs")
-            ]:
-                results = self.collections[data_type].get(
-                    where={"session_id": sid},
-                    include=["metadatas"]
-                )
-                export_data[key] = results["metadatas"]
+            for data_type, key in _SESSION_EXPORT_SECTIONS:
+                export_data[key] = [
+                    metadata for page in self._iter_session_metadata(data_type, sid) for metadata in page
+                ]
             
+            export_data["oscillation_buffer"] = safe_buffer  # 振動バッファもエクスポート
             return export_data
             
         except Exception as e:
             logger.error(f"Error exporting session data: {e}")
             return {"error": str(e)}
     
+    def _iter_session_metadata(self, data_type: DataType, session_id: str,
+                               page_size: int = _EXPORT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """セッションに属するメタデータをページ単位で取得"""
+        collection = self.collections[data_type]
+        offset = 0
+        while True:
+            page = collection.get(
+                where={"session_id": session_id},
+                include=["metadatas"],
+                limit=page_size,
+                offset=offset
+            )["metadatas"] or []
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += page_size
+    
+    def _write_session_export(self, out: BinaryIO, session_id: str,
+                              header: Dict[str, Any]) -> Dict[str, int]:
+        """エクスポートJSONをページごとに書き込む（データタイプごとの件数を返す）"""
+        def dumps(obj: Any) -> bytes:
+            return safe_json_dumps(obj).encode("utf-8")
+        
+        out.write(b"{\n")
+        for key, value in header.items():
+            out.write(dumps(key) + b": " + dumps(value) + b",\n")
+        
+        counts = {}
+        for index, (data_type, key) in enumerate(_SESSION_EXPORT_SECTIONS):
+            out.write(dumps(key) + b": [")
+            count = 0
+            for page in self._iter_session_metadata(data_type, session_id):
+                for metadata in page:
+                    out.write((b",\n" if count else b"\n") + dumps(metadata))
+                    count += 1
+            out.write(b"\n]" if count else b"]")
+            out.write(b",\n" if index < len(_SESSION_EXPORT_SECTIONS) - 1 else b"\n")
+            counts[key] = count
+        out.write(b"}\n")
+        return counts
+    
     def add_engine_state(self, engine_type: EngineType, state_data: Dict[str, Any]) -> str:
         """エンジン状態の追加（修正版）"""
-        state_id = str(uuid.uuid4())
+        state_id = self._next_uuid()
         entry = EngineStateEntry(
             id=state_id,
             engine_type=engine_type,
@@ -1146,25 +1841,21 @@ class VectorDatabaseManager:
         )
         
         # 状態の埋め込み作成
-        state_text = f"Engine: {engine_type.value}\nState: {safe_json_dumps(state_data)}"
-        embedding = self._generate_embedding(state_text)
+        state_json = safe_json_dumps(state_data)
+        state_text = f"Engine: {engine_type.value}\nState: {state_json}"
+        embedding = self._embed_templated(state_text)
         
-        # メタデータの安全な構築
-        metadata = filter_metadata({
-            "id": str(state_id),
+        # メタデータの構築（型はスキーマで確定しているため個別に変換）
+        metadata = _prune_metadata(DataType.ENGINE_STATE, {
+            "id": state_id,
             "engine_type": str(engine_type.value),
-            "state_data": safe_json_dumps(state_data),
+            "state_data": state_json,
             "timestamp": entry.timestamp.isoformat(),
             "character_id": str(entry.character_id),
             "session_id": str(entry.session_id or "")
         })
         
-        self.collections[DataType.ENGINE_STATE].add(
-            embeddings=[embedding],
-            documents=[state_text],
-            metadatas=[metadata],
-            ids=[state_id]
-        )
+        self._enqueue_add(DataType.ENGINE_STATE, embedding, state_text, metadata, state_id)
         
         logger.info(f"Added engine state: {engine_type.value} (ID: {state_id})")
         return state_id
@@ -1173,20 +1864,20 @@ class VectorDatabaseManager:
                   associated_engines: List[str] = None,
                   emotional_context: Optional[Dict[str, float]] = None) -> str:
         """記憶データの追加（拡張版・修正版）"""
-        memory_id = str(uuid.uuid4())
+        memory_id = self._next_uuid()
         
         # 埋め込み作成
         memory_text = content
         if associated_engines:
             memory_text += f"\nEngines: {', '.join(associated_engines)}"
         
-        embedding = self._generate_embedding(memory_text)
+        embedding = self._embed(memory_text)
         
         # メタデータの安全な構築
         metadata = {
-            "id": str(memory_id),
+            "id": memory_id,
             "memory_type": str(memory_type),
-            "relevance_score": safe_metadata_value(relevance_score, 0.5),
+            "relevance_score": _meta_number(relevance_score, 0.5),
             "timestamp": datetime.now().isoformat(),
             "access_count": 0,
             "associated_engines": safe_json_dumps(associated_engines or []),
@@ -1198,22 +1889,39 @@ class VectorDatabaseManager:
         if emotional_context is not None:
             metadata["emotional_context"] = safe_json_dumps(emotional_context)
         
-        # フィルタリングを適用
-        metadata = filter_metadata(metadata)
+        metadata = _prune_metadata(DataType.MEMORY, metadata)
         
-        self.collections[DataType.MEMORY].add(
-            embeddings=[embedding],
-            documents=[content],
-            metadatas=[metadata],
-            ids=[memory_id]
-        )
+        self._enqueue_add(DataType.MEMORY, embedding, content, metadata, memory_id)
         
         logger.info(f"Added memory: {memory_id} ({memory_type})")
         return memory_id
     
+    def _backup_session(self, session_id: str, backup_dir: str, timestamp: str) -> str:
+        """セッションデータをgzip圧縮したJSONとしてバックアップ"""
+        backup_file = os.path.join(backup_dir, f"backup_{session_id}_{timestamp}.json.gz")
+        # 書き込み途中のファイルが正規のバックアップに見えないよう一時ファイルに書き出す
+        temp_file = f"{backup_file}.tmp"
+        
+        # 作成時点からセキュアな権限にする
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            # 全件をメモリに載せずファイルへ直接書き出す（速度優先の圧縮レベル）
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1) as f:
+                result = self.export_session_data(session_id, out=f)
+            if "error" in result:
+                raise VectorDatabaseError(f"Session export failed: {result['error']}")
+            # 書き込みが完了した場合のみ正式な名前に置き換える
+            os.replace(temp_file, backup_file)
+        except BaseException:
+            try:
+                os.unlink(temp_file)
+            except OSError:
+                pass
+            raise
+        return backup_file
+    
     def reset_database(self):
         """データベースのリセット（警告付き）"""
-        import os
         from pathlib import Path
         
         logger.warning("Resetting database...")
@@ -1222,28 +1930,41 @@ class VectorDatabaseManager:
         backup_dir = "./session_backups"
         try:
             Path(backup_dir).mkdir(mode=0o700, exist_ok=True)  # セキュアなディレクトリ作成
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            
+            session_ids = [
+                session_id for session_id in self.session_manager.active_sessions
+                if self.session_manager._validate_session_id(session_id)
+            ]
             
-            for session_id in self.session_manager.active_sessions:
-                if self.session_manager._validate_session_id(session_id):
-                    export_data = self.export_session_data(session_id)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    backup_filename = f"backup_{session_id}_{timestamp}.json"
-                    backup_file = os.path.join(backup_dir, backup_filename)
-                    
-                    with open(backup_file, 'w', encoding='utf-8') as f:
-                        f.write(safe_json_dumps(export_data, ensure_ascii=False, indent=2))
-                    
-                    # セキュアな権限設定
-                    os.chmod(backup_file, 0o600)
+            # セッションごとのバックアップは並行して書き出す
+            if session_ids:
+                workers = min(8, os.cpu_count() or 1, len(session_ids))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="session-backup") as executor:
+                    futures = [
+                        executor.submit(self._backup_session, session_id, backup_dir, timestamp)
+                        for session_id in session_ids
+                    ]
+                    for future in futures:
+                        try:
+                            future.result()
+                        except Exception as e:
+                            logger.error(f"Backup failed: {e}")
         except Exception as e:
             logger.error(f"Backup failed: {e}")
         
-        # データベースリセット
+        # データベースリセット（未書き込みデータは破棄）
+        with self._session_write_lock:
+            self._pending_session_writes.clear()
+        for buffered in self.collections.values():
+            buffered.discard()
         self.client.reset()
         self._init_collections()
         
         # セッション関連データをクリア
         self.oscillation_buffer.clear()
+        self.character_sessions.clear()
+        self._seeded_characters.clear()
         self.session_manager.active_sessions.clear()
         self.session_manager.session_cache.clear()
         
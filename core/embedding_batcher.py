@@ -0,0 +1,106 @@
+"""
+Micro-batching for embedding generation
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+from config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingBatcher:
+    """単一テキストの埋め込み要求をまとめて1回の推論で処理するバッチャー
+
+    submit() は要求をキューに積んで Future を返す。バックグラウンドスレッドが
+    キューから最大 max_batch 件を取り出し、encode_fn を1回だけ呼び出して各 Future に
+    対応する行を設定する。待機中の要求がすべて揃った時点で即座に推論するため、
+    単独の呼び出し元には max_wait の遅延は発生しない。
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch: int = 32, max_wait: float = 0.005, idle_timeout: float = 30.0):
+        """
+        Args:
+            encode_fn: テキストのリストを (n, dim) 行列に変換する関数
+            max_batch: 1回の推論でまとめる最大件数
+            max_wait: 後続の要求を待つ最大時間（秒）
+            idle_timeout: 要求がない場合にスレッドを終了するまでの時間（秒）
+        """
+        self._encode_fn = encode_fn
+        self._max_batch = max(1, max_batch)
+        self._max_wait = max_wait
+        self._idle_timeout = idle_timeout
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._thread = None
+
+    def submit(self, text: str) -> Future:
+        """埋め込み要求を登録"""
+        future: Future = Future()
+        with self._lock:
+            self._pending += 1
+        self._queue.put((text, future))
+        self._ensure_worker()
+        return future
+
+    def embed(self, text: str) -> np.ndarray:
+        """埋め込み要求を登録し、結果を待って返す"""
+        return self.submit(text).result()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self._idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        # アイドル時はスレッドを終了（次の submit で再起動）
+                        self._thread = None
+                        return
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch:
+                # 待機中の要求がすべて揃っていれば待たずに推論する
+                with self._lock:
+                    if len(batch) >= self._pending:
+                        break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._process(batch)
+
+    def _process(self, batch: list) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = self._encode_fn(texts)
+        except Exception as e:
+            logger.error("Batched embedding failed: %s", e)
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for row, (_, future) in enumerate(batch):
+                future.set_result(embeddings[row])
+        finally:
+            with self._lock:
+                self._pending -= len(batch)
@@ -2,6 +2,23 @@
 Custom exceptions for Vector Database MCP Server
 """
 
+__all__ = [
+    "VectorDatabaseError",
+    "SessionError",
+    "DocumentError",
+    "ValidationError",
+    "EntropyError",
+    "OscillationError",
+    "DatabaseConnectionError",
+    "CharacterNotFoundError",
+    "SessionNotFoundError",
+    "InvalidSessionError",
+    "DocumentNotFoundError",
+    "DocumentAccessError",
+    "SecurityError",
+    "PathTraversalError",
+]
+
 
 class VectorDatabaseError(Exception):
     """Base exception for vector database errors"""
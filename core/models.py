@@ -2,11 +2,29 @@
 Data models and enumerations for Vector Database MCP Server
 """
 
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Dict, List, Optional, Any
 
+__all__ = [
+    # Enumerations
+    "DataType",
+    "BasicEmotion",
+    "ConsciousnessLevel",
+    "EngineType",
+    # Data classes
+    "CharacterProfileEntry",
+    "EngineStateEntry",
+    "InternalStateEntry",
+    "RelationshipStateEntry",
+    "SessionStateEntry",
+    "ConversationEntry",
+    "SecureEntropyEntry",
+    "MemoryEntry",
+]
+
 
 # ========================================================
 # Enumerations
@@ -33,6 +51,7 @@ class DataType(Enum):
     SESSION_STATE = "session_state"
     INTERNAL_STATE = "internal_state"
     SECURE_ENTROPY = "secure_entropy"
+    OSCILLATION_SAMPLE = "oscillation_sample"  # 振動値のみを保持する軽量コレクション
 
 
 class BasicEmotion(Enum):
@@ -73,7 +92,11 @@ class EngineType(Enum):
 # Data Classes
 # ========================================================
 
-@dataclass
+# Python 3.10+ ではスロット付きdataclassにしてインスタンスの__dict__を省略
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class CharacterProfileEntry:
     """完全なキャラクタープロファイル（v3.1拡張版）"""
     id: str
@@ -90,7 +113,7 @@ class CharacterProfileEntry:
     version: str = "3.1"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class EngineStateEntry:
     """エンジン状態エントリ（拡張版）"""
     id: str
@@ -101,7 +124,7 @@ class EngineStateEntry:
     session_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class InternalStateEntry:
     """統合内部状態エントリ（新規追加）"""
     id: str
@@ -127,7 +150,7 @@ class InternalStateEntry:
     session_id: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class RelationshipStateEntry:
     """関係性状態エントリ（新規追加）"""
     id: str
@@ -144,7 +167,7 @@ class RelationshipStateEntry:
     session_id: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class SessionStateEntry:
     """セッション状態エントリ（新規追加）"""
     id: str
@@ -160,7 +183,7 @@ class SessionStateEntry:
     active: bool
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ConversationEntry:
     """会話エントリ（v3.1拡張版）"""
     id: str
@@ -178,7 +201,7 @@ class ConversationEntry:
     relational_distance: Optional[float] = None  # 新規追加
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class SecureEntropyEntry:
     """セキュアエントロピーエントリ（新規追加）"""
     id: str
@@ -191,7 +214,7 @@ class SecureEntropyEntry:
     session_id: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MemoryEntry:
     """記憶エントリ"""
     id: str
@@ -0,0 +1,90 @@
+"""
+msgspec.Struct versions of the hot-path entries
+
+ConversationEntry / MemoryEntry / InternalStateEntry の msgspec 版。
+C 実装の __init__ とエンコーダーにより、生成からシリアライズまでを高速化する。
+フィールドを書き換えるコードは core.models の dataclass 版を使用すること。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config.settings import USE_MSGSPEC_SCHEMAS
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+__all__ = [
+    "HAS_MSGSPEC",
+    "MSGSPEC_ENABLED",
+    "ConversationEntry",
+    "MemoryEntry",
+    "InternalStateEntry",
+]
+
+HAS_MSGSPEC = msgspec is not None
+
+# 設定で有効化され、かつ msgspec が利用可能な場合のみ使用する
+MSGSPEC_ENABLED = HAS_MSGSPEC and USE_MSGSPEC_SCHEMAS
+
+
+if MSGSPEC_ENABLED:
+
+    class ConversationEntry(msgspec.Struct, frozen=True):
+        """会話エントリ（msgspec版）"""
+        id: str
+        user_input: str
+        ai_response: str
+        timestamp: datetime
+        context: Dict[str, Any]
+        sentiment: Optional[float] = None
+        importance: Optional[float] = None
+        consciousness_level: Optional[int] = None
+        emotional_state: Optional[Dict[str, float]] = None
+        character_id: Optional[str] = None
+        session_id: Optional[str] = None
+        oscillation_value: Optional[float] = None
+        relational_distance: Optional[float] = None
+
+    class MemoryEntry(msgspec.Struct, frozen=True):
+        """記憶エントリ（msgspec版）"""
+        id: str
+        content: str
+        memory_type: str
+        relevance_score: float
+        timestamp: datetime
+        access_count: int = 0
+        associated_engines: List[str] = msgspec.field(default_factory=list)
+        emotional_context: Optional[Dict[str, float]] = None
+        character_id: Optional[str] = None
+        session_id: Optional[str] = None
+
+    class InternalStateEntry(msgspec.Struct, frozen=True):
+        """内部状態エントリ（msgspec版）"""
+        id: str
+        timestamp: datetime
+        consciousness_state: Dict[str, Any]
+        qualia_state: Dict[str, Any]
+        emotion_state: Dict[str, Any]
+        empathy_state: Dict[str, Any]
+        motivation_state: Dict[str, Any]
+        curiosity_state: Dict[str, Any]
+        conflict_state: Dict[str, Any]
+        relationship_state: Dict[str, Any]
+        existential_need_state: Dict[str, Any]
+        growth_wish_state: Dict[str, Any]
+        overall_energy: float
+        cognitive_load: float
+        emotional_tone: str
+        attention_focus: Optional[Dict[str, Any]]
+        relational_distance: float
+        paradox_tension: float
+        oscillation_stability: float
+        character_id: str
+        session_id: str
+
+else:
+    # 無効時・msgspec 未インストール時は dataclass 版をそのまま公開
+    from .models import ConversationEntry, InternalStateEntry, MemoryEntry  # noqa: F401
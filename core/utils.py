@@ -3,16 +3,65 @@ Utility functions for Vector Database MCP Server
 """
 
 import json
+import math
+import re
+import sys
+import time
 import numpy as np
 from datetime import datetime
 from typing import Dict, Any, Optional, Union, List
 from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+
+# orjson が利用可能な場合は高速なシリアライズに使用
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+# msgspec.Struct 版エントリ（core.schemas_fast）の直接エンコードに使用
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+__all__ = [
+    "convert_numpy_types",
+    "EnhancedJSONEncoder",
+    "DateTimeEncoder",
+    "safe_json_dumps",
+    "safe_json_loads",
+    "clean_for_json",
+    "datetime_hook",
+    "filter_metadata",
+    "safe_metadata_value",
+    "truncate_text",
+    "merge_dicts",
+    "get_nested_value",
+    "set_nested_value",
+    "format_timestamp",
+]
 
 
 # ========================================================
 # NumPy型変換
 # ========================================================
 
+def _convert_scalar_list(obj: List[Any]) -> Optional[List[Any]]:
+    """同一型のNumPy数値スカラーだけからなるリストを一括変換（該当しない場合はNone）"""
+    first_type = type(obj[0])
+    if not issubclass(first_type, (np.number, np.bool_)):
+        return None
+    for item in obj:
+        if type(item) is not first_type:
+            return None
+    # 要素ごとの変換の代わりに配列化してC側でまとめて変換
+    return np.array(obj, dtype=first_type).tolist()
+
+
 def convert_numpy_types(obj: Any) -> Any:
     """
     NumPy型を再帰的にPython標準型に変換
@@ -34,6 +83,9 @@ def convert_numpy_types(obj: Any) -> Any:
     elif isinstance(obj, dict):
         return {k: convert_numpy_types(v) for k, v in obj.items()}
     elif isinstance(obj, list):
+        converted = _convert_scalar_list(obj) if obj else None
+        if converted is not None:
+            return converted
         return [convert_numpy_types(v) for v in obj]
     elif isinstance(obj, tuple):
         return tuple(convert_numpy_types(v) for v in obj)
@@ -52,11 +104,15 @@ class EnhancedJSONEncoder(json.JSONEncoder):
         if isinstance(obj, datetime):
             return obj.isoformat()
         
+        # NumPy array処理（ndarray も item() を持つためスカラーより先に判定）
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        
         # NumPy scalar処理
         if hasattr(obj, 'item'):
             return obj.item()
         
-        # NumPy array処理
+        # その他の配列類
         if hasattr(obj, 'tolist'):
             return obj.tolist()
         
@@ -73,16 +129,140 @@ class EnhancedJSONEncoder(json.JSONEncoder):
             return obj.decode('utf-8', errors='ignore')
         
         # その他のオブジェクトは文字列化
-        try:
-            return str(obj)
-        except:
-            return super().default(obj)
+        return str(obj)
+
+
+# 旧名（DateTimeEncoder）との互換エイリアス
+DateTimeEncoder = EnhancedJSONEncoder
+
+
+_json_encoder_default = EnhancedJSONEncoder().default
+
+
+def _orjson_default(obj: Any) -> Any:
+    """
+    orjson 用の既定変換（EnhancedJSONEncoder と同じ規則）
+
+    datetime・連続配列・NumPy スカラーは orjson が直接処理するため、
+    ここに到達しやすい型を先に判定し、それ以外はエンコーダーに委譲する
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, set):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', errors='ignore')
+    return _json_encoder_default(obj)
+
+# msgspec.Struct 用エンコーダー（非対応型は orjson と同じ規則で変換）
+_msgspec_encode = (
+    msgspec.json.Encoder(enc_hook=_orjson_default, decimal_format='number').encode
+    if msgspec is not None else None
+)
+_MsgspecStruct = msgspec.Struct if msgspec is not None else None
+
+# orjson で処理できる json.dumps パラメータ
+_ORJSON_COMPATIBLE_KWARGS = {"ensure_ascii", "indent", "sort_keys", "check_circular"}
+
+# 追加パラメータなしで呼ばれた場合の orjson オプション（呼び出しごとの解釈を省く）
+_ORJSON_DEFAULT_OPTION = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson is not None else None
+)
+
+# 空コンテナのJSON表現（状態フィールドの既定値で頻出するため定数で返す）
+# ※ ndarray などは真偽値評価できないため、型の判定を先に行う
+_EMPTY_JSON = {dict: "{}", list: "[]", tuple: "[]"}
+
+
+def _orjson_options(kwargs: Dict[str, Any]) -> Optional[int]:
+    """
+    json.dumps パラメータを orjson オプションに変換
+    
+    Args:
+        kwargs: json.dumps に渡されたパラメータ
+        
+    Returns:
+        orjson オプション（orjson で表現できない場合はNone）
+    """
+    if orjson is None or not _ORJSON_COMPATIBLE_KWARGS.issuperset(kwargs):
+        return None
+    if kwargs.get("ensure_ascii", False):
+        return None
+    
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    indent = kwargs.get("indent")
+    if indent == 2:
+        option |= orjson.OPT_INDENT_2
+    elif indent is not None:
+        return None
+    
+    if kwargs.get("sort_keys", False):
+        option |= orjson.OPT_SORT_KEYS
+    
+    return option
+
+
+# orjson で標準jsonと同じ値として出力される型（中身を調べる必要がないもの）
+_JSON_PLAIN_TYPES = frozenset({str, int, bool, type(None)})
+
+# orjson の再帰上限（これより深い構造は標準jsonの循環参照検出に任せる）
+_ORJSON_MAX_DEPTH = 254
+
+
+def _orjson_compatible(obj: Any) -> bool:
+    """
+    orjson の出力が標準jsonと同じ値になるかを判定
+    
+    orjson は NaN/Inf を null に、Enum を値に変換し、float32 を短い表現で出力するため、
+    これらを含む場合は標準jsonで処理する（NaN の往復や str(Enum) 表現を維持）。
+    """
+    stack = [(obj, 0)]
+    while stack:
+        item, depth = stack.pop()
+        item_type = type(item)
+        if item_type in _JSON_PLAIN_TYPES:
+            continue
+        if depth > _ORJSON_MAX_DEPTH:
+            return False
+        if item_type is float:
+            if not math.isfinite(item):
+                return False
+        elif item_type is dict:
+            stack.extend((value, depth + 1) for value in item.values())
+        elif item_type is list or item_type is tuple:
+            stack.extend((value, depth + 1) for value in item)
+        elif isinstance(item, Enum):
+            return False
+        elif isinstance(item, np.ndarray):
+            if item.dtype.kind == 'f' and (item.dtype != np.float64 or not np.isfinite(item).all()):
+                return False
+            if item.dtype.kind == 'O':
+                stack.extend((value, depth + 1) for value in item.ravel().tolist())
+        elif isinstance(item, np.floating):
+            if item_type is not np.float64 or not math.isfinite(item):
+                return False
+        elif isinstance(item, float):
+            if not math.isfinite(item):
+                return False
+        elif isinstance(item, dict):
+            stack.extend((value, depth + 1) for value in item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend((value, depth + 1) for value in item)
+    return True
 
 
 def safe_json_dumps(obj: Any, **kwargs) -> str:
     """
     安全なJSON シリアライゼーション（NumPy対応版）
     
+    orjson が利用可能で、パラメータが orjson で表現できる場合は高速パスを使用
+    msgspec.Struct インスタンスは msgspec で直接エンコード
+    
+    高速パスの出力は区切り文字の空白を含まないコンパクト形式で、指数表記の
+    浮動小数点数は表記が異なる（例: 1e-07 -> 1e-7）が、読み込み後の値は同じ。
+    NaN/Inf・Enum・float32 を含む場合は標準jsonで処理し、値の表現を維持する。
+    
     Args:
         obj: JSON化するオブジェクト
         **kwargs: json.dumps に渡す追加パラメータ
@@ -90,6 +270,22 @@ def safe_json_dumps(obj: Any, **kwargs) -> str:
     Returns:
         JSON文字列
     """
+    if type(obj) in _EMPTY_JSON and not obj:
+        return _EMPTY_JSON[type(obj)]
+    
+    # msgspec.Struct はエンコーダースタックを経由せずC実装で直接エンコード
+    if (_MsgspecStruct is not None and not kwargs and isinstance(obj, _MsgspecStruct)
+            and _orjson_compatible(msgspec.structs.astuple(obj))):
+        return _msgspec_encode(obj).decode('utf-8')
+    
+    option = _orjson_options(kwargs) if kwargs else _ORJSON_DEFAULT_OPTION
+    if option is not None and _orjson_compatible(obj):
+        try:
+            return orjson.dumps(obj, default=_orjson_default, option=option).decode('utf-8')
+        except (orjson.JSONEncodeError, TypeError):
+            # 64bit超の整数など orjson 非対応の値は標準jsonで処理
+            pass
+    
     # デフォルトでensure_ascii=Falseを設定（マルチバイト対応）
     if 'ensure_ascii' not in kwargs:
         kwargs['ensure_ascii'] = False
@@ -103,9 +299,8 @@ def safe_json_dumps(obj: Any, **kwargs) -> str:
         kwargs['check_circular'] = True
     
     try:
-        # NumPy型を事前に変換
-        converted_obj = convert_numpy_types(obj)
-        return json.dumps(converted_obj, **kwargs)
+        # NumPy型はエンコーダーの default で変換（事前の全体変換は行わない）
+        return json.dumps(obj, **kwargs)
     except Exception as e:
         # フォールバック：基本的な型のみを含むデータに変換
         cleaned_obj = clean_for_json(obj)
@@ -150,6 +345,9 @@ def clean_for_json(obj: Any, max_depth: int = 10, current_depth: int = 0) -> Any
     
     # リスト・タプル
     if isinstance(obj, (list, tuple)):
+        converted = _convert_scalar_list(obj) if obj else None
+        if converted is not None:
+            return converted
         return [clean_for_json(item, max_depth, current_depth + 1) for item in obj]
     
     # 辞書
@@ -160,10 +358,21 @@ def clean_for_json(obj: Any, max_depth: int = 10, current_depth: int = 0) -> Any
         }
     
     # その他は文字列化
-    try:
-        return str(obj)
-    except:
-        return None
+    return str(obj)
+
+
+# ISO 8601 日時（YYYY-MM-DDTHH:MM:SS）で始まる文字列
+_ISO_DATETIME_PREFIX = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}')
+
+
+# 取り得る値が少ない分類項目（読み込み時に文字列をインターンする）
+_INTERN_KEYS = frozenset({"memory_type", "emotional_tone", "source_type", "engine_type"})
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime:
+    """ISO 文字列を datetime に変換（同じタイムスタンプ文字列は変換結果を再利用）"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
 
 
 def datetime_hook(obj: Dict[str, Any]) -> Dict[str, Any]:
@@ -179,34 +388,75 @@ def datetime_hook(obj: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(obj, dict):
         return obj
     
+    match_iso = _ISO_DATETIME_PREFIX.match
     for key, value in obj.items():
-        if isinstance(value, str):
-            try:
-                # ISO 形式の文字列を datetime に変換を試行
-                if 'T' in value and ('.' in value or '+' in value or 'Z' in value):
-                    # より厳密な検証
-                    if len(value) >= 19 and value.count('T') == 1:
-                        obj[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-            except (ValueError, AttributeError, TypeError):
-                # 変換失敗は無視して元の値を保持
-                pass
+        if type(value) is str and key in _INTERN_KEYS:
+            # 種類の少ない分類値は同じ文字列オブジェクトを共有する
+            obj[key] = sys.intern(value)
+        # 日時の形で始まらない文字列は1回の照合で除外
+        elif isinstance(value, str) and len(value) >= 19 and match_iso(value):
+            # 秒以降に小数部またはタイムゾーンを含むものだけを変換対象とする
+            tail = value[19:]
+            if '.' in tail or '+' in tail or 'Z' in tail:
+                try:
+                    obj[key] = _parse_iso(value)
+                except ValueError:
+                    # 変換失敗は無視して元の値を保持
+                    pass
     return obj
 
 
-def safe_json_loads(s: str, **kwargs) -> Any:
+def safe_json_loads(s: Union[str, bytes], parse_datetimes: bool = True, **kwargs) -> Any:
     """
     datetime 対応の安全な JSON デシリアライゼーション
     
     Args:
-        s: JSON文字列
+        s: JSON文字列（bytes も可）
+        parse_datetimes: ISO 文字列を datetime に変換するか（False の場合は orjson を優先）
         **kwargs: json.loads に渡す追加パラメータ
         
     Returns:
         Pythonオブジェクト
     """
+    if not parse_datetimes:
+        if not kwargs:
+            return _loads(s)
+        return json.loads(s, **kwargs)
+    if orjson is not None and not kwargs:
+        try:
+            data = orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # NaN リテラルや64bit超の整数など orjson 非対応の入力は標準jsonで処理
+            pass
+        else:
+            return _rehydrate_datetimes(data)
     return json.loads(s, object_hook=datetime_hook, **kwargs)
 
 
+def _rehydrate_datetimes(data: Any) -> Any:
+    """
+    解析済みJSONの各辞書に datetime_hook を適用（object_hook と同じ結果を1回の走査で得る）
+    
+    Args:
+        data: 解析済みのJSONデータ
+        
+    Returns:
+        datetime 変換後のデータ（辞書・リストはその場で更新）
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if type(node) is dict:
+            datetime_hook(node)
+            children = node.values()
+        elif type(node) is list:
+            children = node
+        else:
+            continue
+        stack.extend(child for child in children if type(child) is dict or type(child) is list)
+    return data
+
+
 # ========================================================
 # ChromaDB Metadata Processing
 # ========================================================
@@ -221,27 +471,62 @@ def filter_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         フィルタリング済みメタデータ
     """
-    filtered = {}
-    
-    for key, value in metadata.items():
-        # キーを文字列に変換
-        key = str(key)
-        
-        # None値は除外
-        if value is None:
-            continue
-        
-        # NumPy型を事前に変換
+    # None の除外・値の変換・変換後の None 除外を1つの内包表記で処理
+    return {
+        str(key): coerced
+        for key, value in metadata.items() if value is not None
+        for coerced in (_coerce_metadata_value(value),) if coerced is not None
+    }
+
+
+# convert_numpy_types が値をそのまま返す型（事前変換を省略できる）
+_PLAIN_METADATA_TYPES = frozenset({bool, int, float, str, datetime})
+
+
+def _coerce_metadata_value(value: Any) -> Any:
+    """NumPy型を変換したうえで ChromaDB 用の値に変換"""
+    if type(value) not in _PLAIN_METADATA_TYPES:
         value = convert_numpy_types(value)
-        
-        # 値の型を適切に変換
-        filtered_value = safe_metadata_value(value)
-        
-        # 変換後もNoneでなければ追加
-        if filtered_value is not None:
-            filtered[key] = filtered_value
-    
-    return filtered
+    return safe_metadata_value(value)
+
+
+def _metadata_identity(value: Any, default_value: Any) -> Any:
+    return value
+
+
+def _metadata_float(value: float, default_value: Any) -> float:
+    # NaN や Inf は 0.0 に置き換え
+    return float(value) if math.isfinite(value) else 0.0
+
+
+def _metadata_str(value: str, default_value: Any) -> Any:
+    # 空文字列を避ける
+    return value if value else default_value
+
+
+def _metadata_json(value: Any, default_value: Any) -> str:
+    try:
+        return safe_json_dumps(value)
+    except Exception:
+        return str(value)
+
+
+def _metadata_datetime(value: datetime, default_value: Any) -> str:
+    return value.isoformat()
+
+
+# 型そのもの（サブクラスを除く）から変換関数への対応表
+_METADATA_CONVERTERS = {
+    bool: _metadata_identity,
+    int: _metadata_identity,
+    float: _metadata_float,
+    np.float64: _metadata_float,
+    str: _metadata_str,
+    list: _metadata_json,
+    tuple: _metadata_json,
+    dict: _metadata_json,
+    datetime: _metadata_datetime,
+}
 
 
 def safe_metadata_value(value: Any, default_value: Any = None) -> Any:
@@ -258,6 +543,11 @@ def safe_metadata_value(value: Any, default_value: Any = None) -> Any:
     if value is None:
         return default_value
     
+    # よく使う型は型そのものから変換関数を引く
+    converter = _METADATA_CONVERTERS.get(type(value))
+    if converter is not None:
+        return converter(value, default_value)
+    
     # ブール値
     if isinstance(value, bool):
         return bool(value)
@@ -282,14 +572,14 @@ def safe_metadata_value(value: Any, default_value: Any = None) -> Any:
     if isinstance(value, (list, tuple)):
         try:
             return safe_json_dumps(value)
-        except:
+        except Exception:
             return str(value)
     
     # 辞書 -> JSON文字列に変換
     if isinstance(value, dict):
         try:
             return safe_json_dumps(value)
-        except:
+        except Exception:
             return str(value)
     
     # datetime -> ISO文字列
@@ -297,10 +587,7 @@ def safe_metadata_value(value: Any, default_value: Any = None) -> Any:
         return value.isoformat()
     
     # その他の型は文字列に変換
-    try:
-        return str(value)
-    except:
-        return default_value
+    return str(value)
 
 
 # ========================================================
@@ -324,6 +611,10 @@ def truncate_text(text: str, max_length: int = 1000, suffix: str = "...") -> str
     return text[:max_length - len(suffix)] + suffix
 
 
+# 値が存在しないことを表す番兵（None を値として持つキーと区別する）
+_MISSING = object()
+
+
 def merge_dicts(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> Dict[str, Any]:
     """
     2つの辞書を深くマージする
@@ -336,14 +627,37 @@ def merge_dicts(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> Dict[str, Any]:
         マージされた辞書
     """
     result = dict1.copy()
+    if not dict2:
+        return result
+    # 入れ子の辞書同士が重なるキーがなければ update（C実装）で一括上書きする
     for key, value in dict2.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = merge_dicts(result[key], value)
-        else:
-            result[key] = value
+        if isinstance(value, dict) and isinstance(dict1.get(key), dict):
+            break
+    else:
+        result.update(dict2)
+        return result
+    
+    # 再帰呼び出しの代わりに (マージ先, マージ元) の組をスタックで処理
+    stack = [(result, dict2)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            current = target.get(key, _MISSING)
+            if isinstance(current, dict) and isinstance(value, dict):
+                # 元の辞書は変更せず、コピーしたものにマージする
+                merged = target[key] = current.copy()
+                stack.append((merged, value))
+            else:
+                target[key] = value
     return result
 
 
+@lru_cache(maxsize=1024)
+def _split_path(path: str) -> tuple:
+    """ドット区切りのパスを分割（同じパスの分割結果を再利用）"""
+    return tuple(path.split('.'))
+
+
 def get_nested_value(data: Dict[str, Any], path: str, default: Any = None) -> Any:
     """
     ネストされた辞書から値を取得
@@ -356,13 +670,13 @@ def get_nested_value(data: Dict[str, Any], path: str, default: Any = None) -> An
     Returns:
         取得した値またはデフォルト値
     """
-    keys = path.split('.')
     value = data
     
-    for key in keys:
-        if isinstance(value, dict) and key in value:
-            value = value[key]
-        else:
+    for key in _split_path(path):
+        if type(value) is not dict and not isinstance(value, dict):
+            return default
+        value = value.get(key, _MISSING)
+        if value is _MISSING:
             return default
     
     return value
@@ -377,18 +691,26 @@ def set_nested_value(data: Dict[str, Any], path: str, value: Any) -> None:
         path: ドット区切りのパス (e.g., "a.b.c")
         value: 設定する値
     """
-    keys = path.split('.')
+    keys = _split_path(path)
     current = data
     
     for key in keys[:-1]:
-        if key not in current:
-            current[key] = {}
-        current = current[key]
+        child = current.get(key, _MISSING)
+        if child is _MISSING:
+            child = current[key] = {}
+        current = child
     
     current[keys[-1]] = value
 
 
-def format_timestamp(dt: Optional[datetime] = None, format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
+# format_timestamp の既定フォーマット（秒単位のため同じ秒の結果を再利用できる）
+_DEFAULT_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 直近に整形した現在時刻 (秒, 文字列)（1つのタプルで差し替えてスレッド間で整合を保つ）
+_last_timestamp = (None, "")
+
+
+def format_timestamp(dt: Optional[datetime] = None, format_str: str = _DEFAULT_TIMESTAMP_FORMAT) -> str:
     """
     タイムスタンプをフォーマット
     
@@ -399,6 +721,16 @@ def format_timestamp(dt: Optional[datetime] = None, format_str: str = "%Y-%m-%d
     Returns:
         フォーマットされた文字列
     """
+    global _last_timestamp
     if dt is None:
-        dt = datetime.now()
+        if format_str != _DEFAULT_TIMESTAMP_FORMAT:
+            return datetime.now().strftime(format_str)
+        # 同じ秒のうちは前回の文字列を返す
+        second = int(time.time())
+        cached_second, cached = _last_timestamp
+        if second == cached_second:
+            return cached
+        formatted = datetime.fromtimestamp(second).strftime(format_str)
+        _last_timestamp = (second, formatted)
+        return formatted
     return dt.strftime(format_str)
@@ -0,0 +1,173 @@
+"""
+Write-behind buffering for ChromaDB collections
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 書き込みに失敗したバッチを保持する上限（古いものから破棄）
+_QUARANTINE_MAX_BATCHES = 16
+
+
+class BufferedCollection:
+    """単一行の add をまとめて一括書き込みするコレクションラッパー
+
+    add() は内部バッファに蓄積し、閾値に達した時点または flush() 呼び出し時に
+    まとめて ``collection.add`` を実行する。add 以外の属性アクセス（get / query /
+    count など）は先にバッファをフラッシュしてから元のコレクションに委譲するため、
+    読み取り側からは常に最新のデータが見える。
+
+    add に失敗したバッチはバッファから隔離リスト（上限付き）へ移し、以降の書き込みや
+    読み取りが同じエラーで失敗し続けないようにする。
+    """
+
+    def __init__(self, collection: Any, flush_threshold: int = 128):
+        """
+        Args:
+            collection: ラップするChromaDBコレクション
+            flush_threshold: 自動フラッシュするバッファ件数
+        """
+        self._collection = collection
+        self._flush_threshold = max(1, flush_threshold)
+        self._lock = threading.RLock()
+        self._embeddings: List[Any] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._ids: List[str] = []
+        self._quarantine: "deque[Dict[str, Any]]" = deque(maxlen=_QUARANTINE_MAX_BATCHES)
+
+    @property
+    def collection(self) -> Any:
+        """ラップしているコレクション"""
+        return self._collection
+
+    @property
+    def pending(self) -> int:
+        """未書き込みの件数"""
+        return len(self._ids)
+
+    @property
+    def quarantined(self) -> List[Dict[str, Any]]:
+        """書き込みに失敗して隔離したバッチ（新しいものが末尾）"""
+        with self._lock:
+            return list(self._quarantine)
+
+    def add(self, embeddings: List[Any], documents: Optional[List[Optional[str]]],
+            metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
+        """レコードをバッファに追加（閾値到達時は一括書き込み）"""
+        with self._lock:
+            self._embeddings.extend(embeddings)
+            self._documents.extend(documents if documents is not None else [None] * len(ids))
+            self._metadatas.extend(metadatas)
+            self._ids.extend(ids)
+
+            if len(self._ids) >= self._flush_threshold:
+                self.flush()
+
+    def flush(self) -> int:
+        """バッファ内のレコードを1回の add で書き込む
+
+        add が失敗した場合はバッチを隔離リストへ移してから例外を送出する。
+
+        Returns:
+            書き込んだ件数
+        """
+        with self._lock:
+            if not self._ids:
+                return 0
+
+            embeddings, documents = self._embeddings, self._documents
+            metadatas, ids = self._metadatas, self._ids
+            self._embeddings, self._documents = [], []
+            self._metadatas, self._ids = [], []
+
+            # ndarrayの埋め込みは1つの行列にまとめてから一括でリスト化する
+            # （ChromaDB 0.4系はリストのリストのみ受け付ける）
+            if isinstance(embeddings[0], np.ndarray):
+                embeddings = np.vstack(embeddings).tolist()
+
+            # ドキュメントを持たないコレクション（軽量な数値ログ）はNoneで渡す
+            if documents[0] is None:
+                documents = None
+
+            try:
+                self._collection.add(
+                    embeddings=embeddings,
+                    documents=documents,
+                    metadatas=metadatas,
+                    ids=ids
+                )
+            except Exception as e:
+                # 失敗したバッチを残すと以降の書き込み・読み取りがすべて同じエラーになるため隔離する
+                logger.error("Batched add of %d records failed, quarantined: %s", len(ids), e)
+                logger.debug("Quarantined ids: %s", ids)
+                self._quarantine.append({
+                    "embeddings": embeddings,
+                    "documents": documents,
+                    "metadatas": metadatas,
+                    "ids": ids,
+                    "error": str(e),
+                })
+                raise
+            return len(ids)
+
+    def discard(self) -> None:
+        """未書き込みのレコードを破棄"""
+        with self._lock:
+            self._embeddings, self._documents = [], []
+            self._metadatas, self._ids = [], []
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        # add 以外の操作は書き込み済みの状態で実行する
+        # （書き込みの失敗はログに記録済みのため、読み取りは失敗させない）
+        try:
+            self.flush()
+        except Exception:
+            pass
+        return getattr(self._collection, name)
+
+    def __repr__(self) -> str:
+        return f"BufferedCollection({self._collection!r}, pending={self.pending})"
+
+
+class FlushTimer:
+    """一定間隔でコールバックを呼び出すデーモンタイマー"""
+
+    def __init__(self, interval: float, callback):
+        """
+        Args:
+            interval: 呼び出し間隔（秒）
+            callback: 呼び出す関数。例外はログに記録して継続する
+        """
+        self.interval = interval
+        self._callback = callback
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """タイマーを開始"""
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="chromadb-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """タイマーを停止"""
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                if self._callback() is False:
+                    break
+            except Exception as e:
+                logger.error("Periodic flush failed: %s", e)
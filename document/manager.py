@@ -2,15 +2,20 @@
 Document management module
 """
 
+import os
+import stat
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 from config.settings import DOCS_DIR, AVAILABLE_DOCUMENTS, MAX_FILE_SIZE
 from config.logging import get_logger
 from core.exceptions import DocumentError, DocumentNotFoundError, DocumentAccessError
 from security.validators import validate_path
-from .search import DocumentSearcher
+from .search import DocumentSearcher, _line_starts
 
 logger = get_logger(__name__)
 
@@ -31,6 +36,12 @@ class DocumentManager:
         # ドキュメント情報のキャッシュ
         self.doc_cache: Dict[str, Dict[str, Any]] = {}
         self.doc_metadata: Dict[str, Dict[str, Any]] = {}
+        # doc_cache の更新・走査を保護（search_all_documents は複数スレッドで読み込む）
+        self._cache_lock = threading.Lock()
+        
+        # 許可ディレクトリの解決済みパス（ドキュメント側はシンボリックリンクの
+        # 差し替えに備えて読み込みのたびに解決する）
+        self._resolved_docs_dir = self.docs_dir.resolve()
         
         # 検索機能
         self.searcher = DocumentSearcher()
@@ -43,25 +54,29 @@ class DocumentManager:
         for doc_key, filename in self.available_docs.items():
             doc_path = self.docs_dir / filename
             
-            if doc_path.exists() and doc_path.is_file():
-                try:
-                    stat_info = doc_path.stat()
-                    self.doc_metadata[doc_key] = {
-                        "filename": filename,
-                        "path": str(doc_path),
-                        "size": stat_info.st_size,
-                        "modified": datetime.fromtimestamp(stat_info.st_mtime),
-                        "accessible": True
-                    }
-                    logger.info(f"Document found: {doc_key} -> {filename}")
-                except Exception as e:
-                    logger.warning(f"Error accessing document {filename}: {e}")
-                    self.doc_metadata[doc_key] = {
-                        "filename": filename,
-                        "path": str(doc_path),
-                        "accessible": False,
-                        "error": str(e)
-                    }
+            try:
+                stat_info = os.stat(doc_path)
+            except OSError:
+                stat_info = None
+            except Exception as e:
+                logger.warning(f"Error accessing document {filename}: {e}")
+                self.doc_metadata[doc_key] = {
+                    "filename": filename,
+                    "path": str(doc_path),
+                    "accessible": False,
+                    "error": str(e)
+                }
+                continue
+            
+            if stat_info is not None and stat.S_ISREG(stat_info.st_mode):
+                self.doc_metadata[doc_key] = {
+                    "filename": filename,
+                    "path": str(doc_path),
+                    "size": stat_info.st_size,
+                    "modified": datetime.fromtimestamp(stat_info.st_mtime),
+                    "accessible": True
+                }
+                logger.info(f"Document found: {doc_key} -> {filename}")
             else:
                 logger.warning(f"Document not found: {filename}")
                 self.doc_metadata[doc_key] = {
@@ -71,35 +86,49 @@ class DocumentManager:
                     "error": "File not found"
                 }
     
-    def _validate_document_access(self, doc_key: str) -> bool:
+    def _resolve_document_path(self, doc_key: str) -> Optional[Path]:
         """
-        ドキュメントアクセスの安全な検証
+        ドキュメントの解決済みパスを取得（パストラバーサル検証込み）
+        
+        シンボリックリンクが後から許可ディレクトリ外に差し替えられても
+        検出できるよう、結果はキャッシュせず呼び出しごとに解決・検証する。
         
         Args:
             doc_key: ドキュメントキー
             
         Returns:
-            アクセス可能な場合True
+            許可ディレクトリ内の解決済みパス（アクセス不可の場合None）
         """
-        if doc_key not in self.available_docs:
-            return False
-        
-        doc_path = self.docs_dir / self.available_docs[doc_key]
+        filename = self.available_docs.get(doc_key)
+        if filename is None:
+            return None
         
         # パストラバーサル攻撃防止
         try:
-            resolved_path = doc_path.resolve()
-            resolved_docs_dir = self.docs_dir.resolve()
-            
-            # パスが許可されたディレクトリ内にあることを確認
-            if not str(resolved_path).startswith(str(resolved_docs_dir)):
-                logger.error(f"Path traversal attack detected: {resolved_path}")
-                return False
-            
-            return resolved_path.exists() and resolved_path.is_file()
+            resolved_path = (self.docs_dir / filename).resolve()
         except Exception as e:
             logger.error(f"Path validation error: {e}")
-            return False
+            return None
+        
+        # パスが許可されたディレクトリ内にあることを確認
+        if not str(resolved_path).startswith(str(self._resolved_docs_dir)):
+            logger.error(f"Path traversal attack detected: {resolved_path}")
+            return None
+        
+        return resolved_path
+    
+    def _validate_document_access(self, doc_key: str) -> bool:
+        """
+        ドキュメントアクセスの安全な検証
+        
+        Args:
+            doc_key: ドキュメントキー
+            
+        Returns:
+            アクセス可能な場合True
+        """
+        resolved_path = self._resolve_document_path(doc_key)
+        return resolved_path is not None and resolved_path.is_file()
     
     def read_document(self, doc_key: str) -> str:
         """
@@ -116,42 +145,54 @@ class DocumentManager:
             DocumentAccessError: アクセスエラーの場合
             DocumentError: その他のエラー
         """
-        if not self._validate_document_access(doc_key):
+        return self._load_document(doc_key)["content"]
+    
+    def _load_document(self, doc_key: str) -> Dict[str, Any]:
+        """ドキュメントを読み込み、doc_cache のエントリを返す（例外は read_document と同じ）"""
+        doc_path = self._resolve_document_path(doc_key)
+        if doc_path is None:
+            raise DocumentNotFoundError(f"Document not accessible: {doc_key}")
+        
+        # 存在確認・キャッシュ検証・キャッシュ登録を1回の stat で賄う
+        try:
+            st = os.stat(doc_path)
+        except OSError:
+            with self._cache_lock:
+                self.doc_cache.pop(doc_key, None)
+            raise DocumentNotFoundError(f"Document not accessible: {doc_key}")
+        if not stat.S_ISREG(st.st_mode):
             raise DocumentNotFoundError(f"Document not accessible: {doc_key}")
         
         # キャッシュチェック
-        if doc_key in self.doc_cache:
-            cache_entry = self.doc_cache[doc_key]
-            doc_path = self.docs_dir / self.available_docs[doc_key]
-            
-            try:
-                current_mtime = doc_path.stat().st_mtime
-                if cache_entry["mtime"] == current_mtime:
-                    logger.debug(f"Returning cached content for: {doc_key}")
-                    return cache_entry["content"]
-            except Exception:
-                # キャッシュ無効化
-                del self.doc_cache[doc_key]
+        cache_entry = self.doc_cache.get(doc_key)
+        if cache_entry is not None and cache_entry["mtime"] == st.st_mtime:
+            logger.debug(f"Returning cached content for: {doc_key}")
+            return cache_entry
         
         # ファイル読み込み
-        doc_path = self.docs_dir / self.available_docs[doc_key]
-        
         try:
-            with open(doc_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # ファイルサイズ制限（10MB）は読み込み前に stat の結果で判定
+            if st.st_size > MAX_FILE_SIZE:
+                raise DocumentError(f"Document too large: {st.st_size} bytes")
             
-            # ファイルサイズ制限（10MB）
-            if len(content) > MAX_FILE_SIZE:
-                raise DocumentError(f"Document too large: {len(content)} bytes")
+            # バイナリで一括読み込みしてから1回だけデコード
+            with open(doc_path, 'rb') as f:
+                content = f.read().decode('utf-8')
+            
+            # テキストモードと同じく改行を \n に統一
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
             
             # キャッシュに保存
-            self.doc_cache[doc_key] = {
+            cache_entry = {
                 "content": content,
-                "mtime": doc_path.stat().st_mtime
+                "mtime": st.st_mtime
             }
+            with self._cache_lock:
+                self.doc_cache[doc_key] = cache_entry
             
             logger.info(f"Document loaded: {doc_key} ({len(content)} characters)")
-            return content
+            return cache_entry
             
         except Exception as e:
             logger.error(f"Failed to read document {doc_key}: {e}")
@@ -168,7 +209,11 @@ class DocumentManager:
         Returns:
             抽出されたセクション
         """
-        return self.searcher.extract_section(content, section_name)
+        cached = self._cached_document(content)
+        if cached is None:
+            return self.searcher.extract_section(content, section_name)
+        lines, _ = self._line_index(cached[1])
+        return self.searcher.extract_section(content, section_name, lines)
     
     def search_in_document(self, content: str, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """
@@ -182,7 +227,42 @@ class DocumentManager:
         Returns:
             検索結果のリスト
         """
-        return self.searcher.search_in_document(content, query, max_results)
+        cached = self._cached_document(content)
+        if cached is None:
+            return self.searcher.search_in_document(content, query, max_results)
+        return self._search_cached(cached[0], cached[1], query, max_results)
+    
+    def _cached_document(self, content: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """キャッシュ済みドキュメントのコンテンツなら (doc_key, キャッシュエントリ) を返す"""
+        with self._cache_lock:
+            for doc_key, cache_entry in self.doc_cache.items():
+                if cache_entry["content"] is content:
+                    return doc_key, cache_entry
+        return None
+    
+    @staticmethod
+    def _line_index(cache_entry: Dict[str, Any]) -> Tuple[List[str], array]:
+        """
+        キャッシュエントリの行リストと各行の先頭位置を取得
+        
+        初回の要求時に一度だけ分割し、同じ mtime のエントリでは以後再利用する。
+        """
+        lines = cache_entry.get("lines")
+        if lines is None:
+            lines = cache_entry["content"].split('\n')
+            cache_entry["line_starts"] = array('q', _line_starts(lines))
+            cache_entry["lines"] = lines
+        return lines, cache_entry["line_starts"]
+    
+    def _search_cached(self, doc_key: str, cache_entry: Dict[str, Any],
+                       query: str, max_results: int) -> List[Dict[str, Any]]:
+        """キャッシュ済みドキュメントを識別子・行情報付きで検索"""
+        lines, line_starts = self._line_index(cache_entry)
+        return self.searcher.search_in_document(
+            cache_entry["content"], query, max_results,
+            content_id=(doc_key, cache_entry["mtime"]),
+            lines=lines, line_starts=line_starts
+        )
     
     def search_all_documents(self, query: str, max_results_per_doc: int = 5) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -195,16 +275,29 @@ class DocumentManager:
         Returns:
             ドキュメントごとの検索結果
         """
-        documents = {}
+        doc_keys = list(self.available_docs)
         
-        for doc_key in self.available_docs:
+        def search_document(doc_key: str) -> List[Dict[str, Any]]:
             try:
-                content = self.read_document(doc_key)
-                documents[doc_key] = content
+                cache_entry = self._load_document(doc_key)
             except Exception as e:
                 logger.warning(f"Failed to read document {doc_key} for search: {e}")
+                return []
+            return self._search_cached(doc_key, cache_entry, query, max_results_per_doc)
+        
+        if len(doc_keys) > 1:
+            # 読み込み（I/O）と検索をドキュメント単位で並列化
+            workers = min(8, os.cpu_count() or 1, len(doc_keys))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="document-search") as executor:
+                all_matches = list(executor.map(search_document, doc_keys))
+        else:
+            all_matches = [search_document(doc_key) for doc_key in doc_keys]
         
-        return self.searcher.search_multiple_documents(documents, query, max_results_per_doc)
+        return {
+            doc_key: matches
+            for doc_key, matches in zip(doc_keys, all_matches)
+            if matches
+        }
     
     def get_document_info(self, doc_key: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -241,8 +334,9 @@ class DocumentManager:
         Returns:
             見出しのリスト
         """
-        content = self.read_document(doc_key)
-        return self.searcher.find_headers(content)
+        cache_entry = self._load_document(doc_key)
+        lines, _ = self._line_index(cache_entry)
+        return self.searcher.find_headers(cache_entry["content"], lines)
     
     def get_table_of_contents(self, doc_key: str) -> str:
         """
@@ -254,8 +348,9 @@ class DocumentManager:
         Returns:
             目次
         """
-        content = self.read_document(doc_key)
-        return self.searcher.get_table_of_contents(content)
+        cache_entry = self._load_document(doc_key)
+        lines, _ = self._line_index(cache_entry)
+        return self.searcher.get_table_of_contents(cache_entry["content"], lines)
     
     def add_document(self, doc_key: str, filename: str) -> bool:
         """
@@ -298,8 +393,8 @@ class DocumentManager:
         del self.available_docs[doc_key]
         
         # キャッシュから削除
-        if doc_key in self.doc_cache:
-            del self.doc_cache[doc_key]
+        with self._cache_lock:
+            self.doc_cache.pop(doc_key, None)
         
         if doc_key in self.doc_metadata:
             del self.doc_metadata[doc_key]
@@ -308,7 +403,8 @@ class DocumentManager:
     
     def clear_cache(self):
         """ドキュメントキャッシュをクリア"""
-        self.doc_cache.clear()
+        with self._cache_lock:
+            self.doc_cache.clear()
         self.searcher.clear_cache()
         logger.info("Document cache cleared")
     
@@ -2,25 +2,177 @@
 Document search functionality
 """
 
+import hashlib
 import re
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import accumulate
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
 
 from config.logging import get_logger
 
+# Aho-Corasick が利用可能な場合は文書全体を1パスで走査する
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = get_logger(__name__)
 
+# 見出しパターン（モジュール読み込み時に一度だけコンパイル）
+_MARKDOWN_HEADER_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+_COMMENT_HEADER_RE = re.compile(r'^//\s+(.+)$')
+# extract_section のセクション開始行（# 〜 #### または //）
+_SECTION_HEADER_RE = re.compile(r'^(#{1,4}|//)\s+(.+)$')
+# extract_section のセクション終了判定に使うマークダウン見出し
+_SECTION_END_RE = re.compile(r'^(#{1,4})\s')
+# get_word_frequency の単語
+_WORD_RE = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=128)
+def _keyword_automaton(keyword: str):
+    """キーワードの Aho-Corasick オートマトンを構築（同じキーワードは再利用）"""
+    automaton = ahocorasick.Automaton()
+    automaton.add_word(keyword, len(keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=128)
+def _highlight_pattern(query: str) -> "re.Pattern":
+    """ハイライト用パターンをコンパイル（同じクエリは再利用）"""
+    return re.compile(re.escape(query), re.IGNORECASE)
+
+
+def _is_word_char(char: str) -> bool:
+    """正規表現の \\w と同じ判定"""
+    return char.isalnum() or char == '_'
+
+
+def _line_starts(lines: Sequence[str]) -> List[int]:
+    """各行の先頭位置（改行1文字分を加算）"""
+    return [0, *accumulate(len(line) + 1 for line in lines[:-1])]
+
+
+def _iter_regex_matches(lines: Sequence[str], regex) -> Iterator[Tuple[int, List[Tuple[int, int]]]]:
+    """行ごとに正規表現で検索し、(行番号, マッチ範囲のリスト) を返す"""
+    for i, line in enumerate(lines):
+        if regex.search(line):
+            yield i, [match.span() for match in regex.finditer(line)]
+
+
+def _iter_substring_matches(haystack: str, line_starts: Sequence[int],
+                            keyword: str) -> Iterator[Tuple[int, List[Tuple[int, int]]]]:
+    """
+    str.find で文書全体を走査し、(行番号, マッチ範囲のリスト) を返す
+    
+    キーワードは改行を含まないため、マッチが行をまたぐことはない。
+    見つかった位置の直後から次を探すことで finditer と同じく重なりを除く。
+    """
+    find = haystack.find
+    length = len(keyword)
+    current_line = -1
+    spans: List[Tuple[int, int]] = []
+    start = find(keyword)
+    while start != -1:
+        line_index = bisect_right(line_starts, start) - 1
+        if line_index != current_line:
+            if spans:
+                yield current_line, spans
+            current_line = line_index
+            spans = []
+        line_start = line_starts[line_index]
+        spans.append((start - line_start, start - line_start + length))
+        start = find(keyword, start + length)
+    if spans:
+        yield current_line, spans
+
+
+def _iter_automaton_matches(content: str, line_starts: Sequence[int], query: str,
+                            case_sensitive: bool,
+                            whole_word: bool) -> Iterator[Tuple[int, List[Tuple[int, int]]]]:
+    """
+    文書全体を Aho-Corasick で1回だけ走査し、(行番号, マッチ範囲のリスト) を返す
+    
+    行番号は改行位置の二分探索で求める。正規表現の finditer と同様に、
+    同じ行の重なり合うマッチは先に見つかったものだけを採用する。
+    """
+    haystack = content if case_sensitive else content.lower()
+    keyword = query if case_sensitive else query.lower()
+    
+    current_line = -1
+    spans: List[Tuple[int, int]] = []
+    last_end = 0
+    for end_index, length in _keyword_automaton(keyword).iter(haystack):
+        start = end_index - length + 1
+        end = end_index + 1
+        if whole_word and (
+            (start > 0 and _is_word_char(content[start - 1])) or
+            (end < len(content) and _is_word_char(content[end]))
+        ):
+            continue
+        line_index = bisect_right(line_starts, start) - 1
+        if line_index != current_line:
+            if spans:
+                yield current_line, spans
+            current_line = line_index
+            spans = []
+            last_end = 0
+        line_start = line_starts[line_index]
+        if start - line_start < last_end:
+            continue
+        spans.append((start - line_start, end - line_start))
+        last_end = end - line_start
+    if spans:
+        yield current_line, spans
+
+
+def _materialize_match(content: str, cached: tuple) -> Dict[str, Any]:
+    """
+    キャッシュ形式のマッチから検索結果を生成
+    
+    キャッシュには文脈文字列の代わりに文脈範囲の文字位置だけを保持し、
+    結果を返すときにコンテンツから文脈を組み立てる。
+    """
+    line_index, matched_line, match_positions, context_start, context_end, first_line = cached
+    context_lines = [
+        f"{'>>> ' if j == line_index else '    '}{line}"
+        for j, line in enumerate(content[context_start:context_end].split('\n'), first_line)
+    ]
+    return {
+        "line_number": line_index + 1,
+        "matched_line": matched_line,
+        "context": "\n".join(context_lines),
+        "match_positions": match_positions,
+        "score": len(match_positions)  # シンプルなスコアリング
+    }
+
 
 class DocumentSearcher:
     """ドキュメント検索機能"""
     
-    def __init__(self):
-        """初期化"""
-        self.search_cache: Dict[str, List[Dict[str, Any]]] = {}
+    def __init__(self, search_cache_max: int = 256):
+        """
+        初期化
+        
+        Args:
+            search_cache_max: 検索キャッシュに保持する最大件数（LRUで破棄）
+        """
+        self.search_cache: "OrderedDict[Tuple[Any, str, bool, bool], List[tuple]]" = OrderedDict()
+        self.search_cache_max = search_cache_max
+        # LRU の参照順更新・破棄を複数スレッドから安全に行うためのロック
+        self._cache_lock = threading.Lock()
     
     def search_in_document(self, content: str, query: str, 
                           max_results: int = 10,
                           case_sensitive: bool = False,
-                          whole_word: bool = False) -> List[Dict[str, Any]]:
+                          whole_word: bool = False,
+                          content_id: Optional[Any] = None,
+                          lines: Optional[Sequence[str]] = None,
+                          line_starts: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
         """
         ドキュメント内でキーワード検索
         
@@ -30,120 +182,157 @@ class DocumentSearcher:
             max_results: 最大結果数
             case_sensitive: 大文字小文字を区別するか
             whole_word: 単語全体を検索するか
+            content_id: コンテンツを識別するハッシュ可能な値（例: (doc_key, mtime)）。
+                省略時はコンテンツのダイジェストを使用
+            lines: content を改行で分割した行のリスト（キャッシュ済みの場合）
+            line_starts: 各行の先頭の文字位置（キャッシュ済みの場合）
             
         Returns:
             検索結果のリスト
         """
-        # キャッシュキーを生成
-        cache_key = f"{hash(content)}:{query}:{case_sensitive}:{whole_word}"
-        if cache_key in self.search_cache:
+        # キャッシュキーを生成（識別子があればコンテンツ全体をハッシュしない）
+        if content_id is None:
+            content_id = hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+        cache_key = (content_id, query, case_sensitive, whole_word)
+        with self._cache_lock:
+            cached_matches = self.search_cache.get(cache_key)
+            if cached_matches is not None:
+                self.search_cache.move_to_end(cache_key)
+        if cached_matches is not None:
             logger.debug(f"Using cached search results for: {query}")
-            return self.search_cache[cache_key][:max_results]
+            return [_materialize_match(content, cached) for cached in cached_matches[:max_results]]
         
-        lines = content.split('\n')
+        if lines is None:
+            lines = content.split('\n')
+        if line_starts is None:
+            line_starts = _line_starts(lines)
         matches = []
         
-        # 検索パターンを構築
-        if whole_word:
-            pattern = r'\b' + re.escape(query) + r'\b'
+        if not whole_word and query and '\n' not in query and (
+            case_sensitive or (query.isascii() and content.isascii())
+        ):
+            # 単純な部分文字列検索は正規表現を使わず str.find（C実装）で処理
+            # ASCII のみなら小文字化で正規表現の IGNORECASE と同じ結果になる
+            if case_sensitive:
+                line_matches = _iter_substring_matches(content, line_starts, query)
+            else:
+                line_matches = _iter_substring_matches(content.lower(), line_starts, query.lower())
+        elif self._can_use_automaton(content, query, case_sensitive, whole_word):
+            line_matches = _iter_automaton_matches(content, line_starts, query, case_sensitive, whole_word)
         else:
-            pattern = re.escape(query)
-        
-        flags = 0 if case_sensitive else re.IGNORECASE
-        regex = re.compile(pattern, flags)
+            # 検索パターンを構築
+            if whole_word:
+                pattern = r'\b' + re.escape(query) + r'\b'
+            else:
+                pattern = re.escape(query)
+            
+            flags = 0 if case_sensitive else re.IGNORECASE
+            line_matches = _iter_regex_matches(lines, re.compile(pattern, flags))
         
-        for i, line in enumerate(lines):
-            if regex.search(line):
-                # 前後の文脈も含めて表示
-                context_start = max(0, i - 2)
-                context_end = min(len(lines), i + 3)
-                
-                context_lines = []
-                for j in range(context_start, context_end):
-                    prefix = ">>> " if j == i else "    "
-                    context_lines.append(f"{prefix}{lines[j]}")
-                
-                # マッチ位置を特定
-                match_positions = []
-                for match in regex.finditer(line):
-                    match_positions.append({
-                        "start": match.start(),
-                        "end": match.end(),
-                        "text": match.group()
-                    })
-                
-                match_info = {
-                    "line_number": i + 1,
-                    "matched_line": line.strip(),
-                    "context": "\n".join(context_lines),
-                    "match_positions": match_positions,
-                    "score": len(match_positions)  # シンプルなスコアリング
-                }
-                
-                matches.append(match_info)
-                
-                if len(matches) >= max_results * 2:  # キャッシュ用に多めに取得
-                    break
+        for i, spans in line_matches:
+            line = lines[i]
+            # 前後の文脈（前後2行）の範囲を文字位置で保持
+            context_start = max(0, i - 2)
+            context_last = min(len(lines), i + 3) - 1
+            
+            # マッチ位置を特定
+            match_positions = [
+                {"start": start, "end": end, "text": line[start:end]}
+                for start, end in spans
+            ]
+            
+            matches.append((
+                i,
+                line.strip(),
+                match_positions,
+                line_starts[context_start],
+                line_starts[context_last] + len(lines[context_last]),
+                context_start,
+            ))
+            
+            if len(matches) >= max_results * 2:  # キャッシュ用に多めに取得
+                break
         
         # スコアでソート（マッチ数が多い順）
-        matches.sort(key=lambda x: x["score"], reverse=True)
+        matches.sort(key=lambda x: len(x[2]), reverse=True)
         
-        # キャッシュに保存
-        self.search_cache[cache_key] = matches
+        # キャッシュに保存（上限を超えたら最も古いものから破棄）
+        with self._cache_lock:
+            self.search_cache[cache_key] = matches
+            while len(self.search_cache) > self.search_cache_max:
+                self.search_cache.popitem(last=False)
         
         logger.debug(f"Search for '{query}' found {len(matches)} matches")
-        return matches[:max_results]
+        return [_materialize_match(content, cached) for cached in matches[:max_results]]
     
-    def extract_section(self, content: str, section_name: str) -> str:
+    @staticmethod
+    def _can_use_automaton(content: str, query: str, case_sensitive: bool,
+                           whole_word: bool = False) -> bool:
+        """Aho-Corasick で正規表現と同じ結果が得られるか"""
+        if ahocorasick is None or not query or '\n' in query:
+            return False
+        # 前後の文字判定が \b と一致するのは、先頭・末尾が単語文字のクエリのみ
+        # （"C++" や "-x" などは正規表現で処理する）
+        if whole_word and not (_is_word_char(query[0]) and _is_word_char(query[-1])):
+            return False
+        # 小文字化で文字数が変わる文字を含む場合はマッチ位置がずれるため使用しない
+        return case_sensitive or (query.isascii() and content.isascii()) or (
+            len(content.lower()) == len(content) and len(query.lower()) == len(query)
+        )
+    
+    def extract_section(self, content: str, section_name: str,
+                        lines: Optional[Sequence[str]] = None) -> str:
         """
         ドキュメントから特定のセクションを抽出
         
         Args:
             content: ドキュメントコンテンツ
             section_name: セクション名
+            lines: content を改行で分割した行のリスト（キャッシュ済みの場合）
             
         Returns:
             抽出されたセクション
         """
-        lines = content.split('\n')
+        if lines is None:
+            lines = content.split('\n')
         in_section = False
         section_content = []
         section_level = 0
         
-        # セクション名のパターンマッチング
-        section_patterns = [
-            rf'^# {re.escape(section_name)}$',
-            rf'^## {re.escape(section_name)}$',
-            rf'^### {re.escape(section_name)}$',
-            rf'^#### {re.escape(section_name)}$',
-            rf'^// {re.escape(section_name)}$',
-            rf'^{re.escape(section_name)}$'
-        ]
+        # 見出しタイトルは大文字小文字を区別せずに比較
+        section_title = section_name.casefold()
+        comment_header = f"// {section_name}"
         
         for line in lines:
             line_stripped = line.strip()
             
-            # セクション開始の検出
+            # セクション開始の検出（各行を1つのパターンで一度だけ照合）
             if not in_section:
-                for i, pattern in enumerate(section_patterns):
-                    if re.match(pattern, line_stripped, re.IGNORECASE):
-                        in_section = True
-                        section_level = i + 1
-                        section_content.append(line)
-                        break
+                header_match = _SECTION_HEADER_RE.match(line_stripped)
+                if header_match and header_match.group(2).strip().casefold() == section_title:
+                    marker = header_match.group(1)
+                    # # 〜 #### はレベル1〜4、// はレベル5
+                    section_level = 5 if marker == '//' else len(marker)
+                elif line_stripped.casefold() == section_title:
+                    # 見出し記号のないセクション名だけの行
+                    section_level = 6
+                else:
+                    continue
+                in_section = True
+                section_content.append(line)
                 continue
             
             # セクション終了の検出
             if in_section:
                 # 同レベル以上の見出しで終了
                 if section_level <= 4:  # マークダウン見出し
-                    header_match = re.match(r'^(#{1,4})\s', line_stripped)
+                    header_match = _SECTION_END_RE.match(line_stripped)
                     if header_match:
                         current_level = len(header_match.group(1))
                         if current_level <= section_level:
                             break
                 elif section_level == 5:  # // コメント形式
-                    if line_stripped.startswith('//') and line_stripped != f"// {section_name}":
+                    if line_stripped.startswith('//') and line_stripped != comment_header:
                         break
                 
                 section_content.append(line)
@@ -152,30 +341,27 @@ class DocumentSearcher:
         logger.debug(f"Extracted section '{section_name}': {len(result)} characters")
         return result
     
-    def find_headers(self, content: str) -> List[Dict[str, Any]]:
+    def find_headers(self, content: str,
+                     lines: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
         """
         ドキュメント内のすべての見出しを検索
         
         Args:
             content: ドキュメントコンテンツ
+            lines: content を改行で分割した行のリスト（キャッシュ済みの場合）
             
         Returns:
             見出しのリスト
         """
-        lines = content.split('\n')
+        if lines is None:
+            lines = content.split('\n')
         headers = []
         
-        # マークダウン見出しパターン
-        markdown_pattern = re.compile(r'^(#{1,6})\s+(.+)$')
-        
-        # コメント見出しパターン
-        comment_pattern = re.compile(r'^//\s+(.+)$')
-        
         for i, line in enumerate(lines):
             line_stripped = line.strip()
             
             # マークダウン見出し
-            match = markdown_pattern.match(line_stripped)
+            match = _MARKDOWN_HEADER_RE.match(line_stripped)
             if match:
                 level = len(match.group(1))
                 title = match.group(2).strip()
@@ -189,7 +375,7 @@ class DocumentSearcher:
                 continue
             
             # コメント見出し
-            match = comment_pattern.match(line_stripped)
+            match = _COMMENT_HEADER_RE.match(line_stripped)
             if match:
                 title = match.group(1).strip()
                 # 大文字で始まる場合のみ見出しとして扱う
@@ -204,17 +390,19 @@ class DocumentSearcher:
         
         return headers
     
-    def get_table_of_contents(self, content: str) -> str:
+    def get_table_of_contents(self, content: str,
+                              lines: Optional[Sequence[str]] = None) -> str:
         """
         ドキュメントの目次を生成
         
         Args:
             content: ドキュメントコンテンツ
+            lines: content を改行で分割した行のリスト（キャッシュ済みの場合）
             
         Returns:
             目次の文字列
         """
-        headers = self.find_headers(content)
+        headers = self.find_headers(content, lines)
         toc_lines = ["# Table of Contents\n"]
         
         for header in headers:
@@ -227,7 +415,8 @@ class DocumentSearcher:
     
     def search_multiple_documents(self, documents: Dict[str, str], 
                                 query: str,
-                                max_results_per_doc: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+                                max_results_per_doc: int = 5,
+                                content_ids: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         複数のドキュメントを検索
         
@@ -235,14 +424,17 @@ class DocumentSearcher:
             documents: ドキュメント名とコンテンツの辞書
             query: 検索クエリ
             max_results_per_doc: ドキュメントごとの最大結果数
+            content_ids: ドキュメント名とコンテンツ識別子の辞書（キャッシュキーに使用）
             
         Returns:
             ドキュメントごとの検索結果
         """
         results = {}
+        content_ids = content_ids or {}
         
         for doc_name, content in documents.items():
-            matches = self.search_in_document(content, query, max_results_per_doc)
+            matches = self.search_in_document(content, query, max_results_per_doc,
+                                              content_id=content_ids.get(doc_name))
             if matches:
                 results[doc_name] = matches
         
@@ -263,12 +455,12 @@ class DocumentSearcher:
         Returns:
             ハイライトされたテキスト
         """
-        pattern = re.compile(re.escape(query), re.IGNORECASE)
-        
-        def replace_func(match):
-            return f"{highlight_start}{match.group()}{highlight_end}"
-        
-        return pattern.sub(replace_func, text)
+        # コールバック関数の代わりに置換テンプレート（\g<0>）で置換
+        # マーカー中のバックスラッシュはテンプレートとして解釈されないようエスケープ
+        template = (
+            highlight_start.replace('\\', '\\\\') + r'\g<0>' + highlight_end.replace('\\', '\\\\')
+        )
+        return _highlight_pattern(query).sub(template, text)
     
     def get_word_frequency(self, content: str, 
                           min_length: int = 3,
@@ -284,21 +476,18 @@ class DocumentSearcher:
         Returns:
             (単語, 頻度)のタプルのリスト
         """
-        # 単語を抽出
-        words = re.findall(r'\b\w+\b', content.lower())
-        
-        # 頻度をカウント
-        word_count = {}
-        for word in words:
-            if len(word) >= min_length:
-                word_count[word] = word_count.get(word, 0) + 1
-        
-        # 頻度順にソート
-        sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
+        # 単語の中間リストを作らずに抽出しながら Counter（C実装）で集計
+        words = (
+            match.group()
+            for match in _WORD_RE.finditer(content.lower())
+            if match.end() - match.start() >= min_length
+        )
         
-        return sorted_words[:top_n]
+        # 頻度順（同数は出現順）の上位N件
+        return Counter(words).most_common(top_n)
     
     def clear_cache(self):
         """検索キャッシュをクリア"""
-        self.search_cache.clear()
+        with self._cache_lock:
+            self.search_cache.clear()
         logger.debug("Search cache cleared")
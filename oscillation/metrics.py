@@ -2,11 +2,17 @@
 Oscillation metrics calculation
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 
 from config.logging import get_logger
 
+# numba が利用可能な場合はスカラー統計をJITコンパイルして使用
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = get_logger(__name__)
 
 
@@ -23,6 +29,109 @@ def _ensure_python_types(value: Any) -> Any:
     return value
 
 
+# 一定値の系列では丸め誤差だけの相関になるため、これ以下の分母は無相関として扱う
+_MIN_CORRELATION_DENOMINATOR = 1e-24
+
+
+def _scalar_stats_loop(values: np.ndarray) -> Tuple[float, float, float, float, float, float, float]:
+    """スカラー統計を一括計算するループ版（numba で JIT コンパイルする本体）
+
+    Returns:
+        (mean, variance, min, max, volatility, trend, lag-1 自己相関)
+    """
+    n = values.shape[0]
+    total = 0.0
+    lo = values[0]
+    hi = values[0]
+    for i in range(n):
+        v = values[i]
+        total += v
+        if v < lo:
+            lo = v
+        if v > hi:
+            hi = v
+    mean = total / n
+    
+    # 分散・差分・線形回帰・ラグ1自己相関に必要な和を1パスで集計
+    x_mean = (n - 1) / 2.0
+    sq = 0.0
+    xy = 0.0
+    xx = 0.0
+    diff_total = 0.0
+    diff_sq = 0.0
+    head_total = 0.0
+    tail_total = 0.0
+    for i in range(n):
+        d = values[i] - mean
+        sq += d * d
+        dx = i - x_mean
+        xy += dx * d
+        xx += dx * dx
+        if i > 0:
+            step = values[i] - values[i - 1]
+            diff_total += step
+            diff_sq += step * step
+            tail_total += values[i]
+        if i < n - 1:
+            head_total += values[i]
+    variance = sq / n
+    trend = xy / xx if xx > 0.0 else 0.0
+    
+    volatility = 0.0
+    lag1 = 0.0
+    if n > 1:
+        m = n - 1
+        diff_mean = diff_total / m
+        diff_var = diff_sq / m - diff_mean * diff_mean
+        volatility = np.sqrt(diff_var) if diff_var > 0.0 else 0.0
+        
+        # np.corrcoef(values[:-1], values[1:]) と同じ定義
+        head_mean = head_total / m
+        tail_mean = tail_total / m
+        cov = 0.0
+        head_sq = 0.0
+        tail_sq = 0.0
+        for i in range(m):
+            a = values[i] - head_mean
+            b = values[i + 1] - tail_mean
+            cov += a * b
+            head_sq += a * a
+            tail_sq += b * b
+        denominator = np.sqrt(head_sq * tail_sq)
+        if denominator > _MIN_CORRELATION_DENOMINATOR:
+            lag1 = cov / denominator
+    
+    return mean, variance, lo, hi, volatility, trend, lag1
+
+
+def _scalar_stats_numpy(values: np.ndarray) -> Tuple[float, float, float, float, float, float, float]:
+    """_scalar_stats_loop と同じ統計をNumPyのベクトル演算で計算（numba 非導入時）"""
+    n = len(values)
+    mean = values.mean()
+    centered = values - mean
+    x = np.arange(n) - (n - 1) / 2.0
+    xx = float(np.dot(x, x))
+    trend = float(np.dot(x, centered)) / xx if xx > 0.0 else 0.0
+    
+    volatility = 0.0
+    lag1 = 0.0
+    if n > 1:
+        volatility = float(np.diff(values).std())
+        head = values[:-1] - values[:-1].mean()
+        tail = values[1:] - values[1:].mean()
+        denominator = np.sqrt(np.dot(head, head) * np.dot(tail, tail))
+        if denominator > _MIN_CORRELATION_DENOMINATOR:
+            lag1 = float(np.dot(head, tail) / denominator)
+    
+    return (float(mean), float(np.dot(centered, centered) / n), float(values.min()),
+            float(values.max()), volatility, trend, lag1)
+
+
+_scalar_stats = (
+    njit(cache=True, fastmath=True)(_scalar_stats_loop) if njit is not None else _scalar_stats_numpy
+)
+
+
 def calculate_basic_metrics(values: List[float]) -> Dict[str, Any]:
     """
     基本的な統計メトリクスを計算
@@ -335,12 +444,8 @@ def calculate_oscillation_metrics(values: List[float], entropy_source: Optional[
     Returns:
         総合メトリクス
     """
-    # 入力値の型確認と変換
-    if isinstance(values, np.ndarray):
-        values = values.tolist()
-    
-    # 各値をfloatに変換
-    values = [float(v) for v in values]
+    # 入力値をfloat64配列に一括変換
+    values = np.ascontiguousarray(values, dtype=np.float64)
     
     # データレベルの判定
     data_count = len(values)
@@ -363,20 +468,30 @@ def calculate_oscillation_metrics(values: List[float], entropy_source: Optional[
         metrics["error"] = "Insufficient data"
         return metrics
     
-    # 基本統計
-    basic = calculate_basic_metrics(values)
-    metrics.update(basic)
-    
-    # 安定性メトリクス
-    stability = calculate_stability_metrics(values)
-    metrics.update(stability)
+    # 基本統計・安定性・ラグ1自己相関を1回の走査で計算
+    mean, variance, lo, hi, volatility, trend, lag1 = _scalar_stats(values)
+    metrics.update({
+        "mean": float(mean),
+        "std": float(np.sqrt(variance)),
+        "variance": float(variance),
+        "min": float(lo),
+        "max": float(hi),
+        "range": float(hi - lo),
+        "count": data_count,
+        "stability": float(1.0 / (1.0 + variance * 10.0)),
+        "volatility": float(volatility),
+        "trend": float(trend)
+    })
     
     # データが十分な場合は追加メトリクス
     if data_count >= 5:
-        # 自己相関
-        autocorr = calculate_autocorrelation(values)
-        metrics["first_order_autocorr"] = autocorr["first_order"]
-        metrics["entropy_randomness_score"] = autocorr["randomness_score"]
+        # 自己相関（calculate_autocorrelation と同じく max_lag + 1 件未満では未計算扱い）
+        if data_count >= 11:
+            metrics["first_order_autocorr"] = float(lag1)
+            metrics["entropy_randomness_score"] = 1.0 - abs(float(lag1))
+        else:
+            metrics["first_order_autocorr"] = 0.0
+            metrics["entropy_randomness_score"] = 0.5
         
         if data_count >= 10:
             # スペクトル解析
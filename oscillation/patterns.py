@@ -2,11 +2,36 @@
 Oscillation pattern data structures
 """
 
+import math
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 
+class _HistoryList(list):
+    """変更のたびに版数を進めるリスト（履歴の統計量キャッシュの無効化用）"""
+    # 復元（copy / pickle）時は __init__ を経ずに要素が追加されるためクラス属性で初期化
+    version = 0
+
+
+def _tracked(name: str):
+    """list の変更メソッドを版数の更新付きで包む"""
+    method = getattr(list, name)
+    
+    def mutate(self, *args):
+        self.version += 1
+        return method(self, *args)
+    
+    mutate.__name__ = name
+    return mutate
+
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+              "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(_HistoryList, _name, _tracked(_name))
+del _name
+
+
 @dataclass
 class OscillationPatternData:
     """振動パターンデータ（セキュアエントロピー統合版）"""
@@ -30,6 +55,44 @@ class OscillationPatternData:
     history: List[float] = field(default_factory=list)
     timestamp: datetime = field(default_factory=datetime.now)
     
+    def __post_init__(self):
+        # 履歴の件数・平均・偏差平方和（Welford法で逐次更新）
+        # dataclass のフィールドではないため to_dict / asdict には含まれない
+        self._stats = (0, 0.0, 0.0)
+        self._stats_source: Optional[List[float]] = None
+        self._stats_version = -1
+    
+    def __setattr__(self, name: str, value: Any):
+        # 履歴は変更を検知できるリストとして保持する（代入されたリストも包み直す）
+        if name == "history" and type(value) is not _HistoryList:
+            value = _HistoryList(value)
+        super().__setattr__(name, value)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # コピー・pickle 後の履歴は版数が引き継がれないため、統計量は再計算させる
+        state = self.__dict__.copy()
+        state["_stats_source"] = None
+        return state
+    
+    def _sync_stats(self):
+        """履歴が add_to_history 以外で変更されていれば統計量を再計算"""
+        history = self.history
+        if self._stats_source is history and self._stats_version == history.version:
+            return
+        
+        n = len(history)
+        mean = math.fsum(history) / n if n else 0.0
+        m2 = math.fsum((float(v) - mean) ** 2 for v in history)
+        self._stats = (n, mean, m2)
+        self._stats_source = history
+        self._stats_version = history.version
+    
+    def std(self) -> float:
+        """履歴の標準偏差（母標準偏差、np.std と同じ定義）"""
+        self._sync_stats()
+        n, _, m2 = self._stats
+        return float(math.sqrt(m2 / n)) if n else 0.0
+    
     def to_dict(self) -> Dict[str, Any]:
         """辞書形式に変換（datetime を ISO 文字列に変換）"""
         data = asdict(self)
@@ -71,10 +134,29 @@ class OscillationPatternData:
     def add_to_history(self, value: float, max_history: int = 1000):
         """履歴に値を追加"""
         # 値を確実にfloatに変換
-        self.history.append(float(value))
-        # 履歴サイズ制限
+        value = float(value)
+        self._sync_stats()
+        n, mean, m2 = self._stats
+        
+        # 統計量を逐次更新
+        n += 1
+        delta = value - mean
+        mean += delta / n
+        m2 += delta * (value - mean)
+        self.history.append(value)
+        
+        # 履歴サイズ制限（切り捨てた値は統計量から除外）
         if len(self.history) > max_history:
+            for dropped in self.history[:-max_history]:
+                n -= 1
+                delta = dropped - mean
+                mean -= delta / n
+                m2 -= delta * (dropped - mean)
             self.history = self.history[-max_history:]
+        
+        self._stats = (n, mean, max(m2, 0.0))
+        self._stats_source = self.history
+        self._stats_version = self.history.version
     
     def get_recent_history(self, count: int = 10) -> List[float]:
         """最近の履歴を取得"""
@@ -88,10 +170,8 @@ class OscillationPatternData:
         if not self.history or len(self.history) < 2:
             return 1.0
         
-        import numpy as np
-        # NumPy配列に変換して計算
-        history_array = np.array(self.history)
-        variance = float(np.var(history_array))
+        # 逐次更新している分散を使用
+        variance = self.std() ** 2
         # 安定性をfloatとして返す
         return float(1.0 / (1.0 + variance * 10.0))
     
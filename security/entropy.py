@@ -9,10 +9,21 @@ import secrets
 import time
 from typing import Dict, Any
 
+import numpy as np
+
 from config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# 64bit乱数の上位53bitを[0, 1)の倍精度浮動小数点に変換する係数
+_UNIT_SCALE = 2.0 ** -53
+
+# バイト数ごとの符号なし整数型（リトルエンディアン）
+_UINT_DTYPES = {1: np.dtype("<u1"), 2: np.dtype("<u2"), 4: np.dtype("<u4"), 8: np.dtype("<u8")}
+
+# 熱振動の3成分の重み
+_THERMAL_WEIGHTS = np.array([0.5, 0.3, 0.2])
+
 
 class SecureEntropySource:
     """セキュアエントロピー取得クラス（secrets模듈ベース）"""
@@ -218,6 +229,67 @@ class SecureEntropySource:
         
         return oscillation * base_amplitude
     
+    def get_normalized_entropy_batch(self, n: int) -> np.ndarray:
+        """正規化されたエントロピー値をまとめて取得（0.0-1.0）
+        
+        Args:
+            n: 取得する値の数
+            
+        Returns:
+            [0, 1) の一様乱数配列
+        """
+        if n <= 0:
+            return np.empty(0)
+        
+        try:
+            raw = np.frombuffer(os.urandom(n * 8), dtype=np.uint64)
+            self.quality_metrics["successful_calls"] += 1
+            self.quality_metrics["total_entropy_bits"] += n * 64
+            return (raw >> np.uint64(11)) * _UNIT_SCALE
+        except Exception as e:
+            logger.warning(f"Batch entropy generation failed: {e}. Using per-value fallback.")
+            self.quality_metrics["failed_calls"] += 1
+            return np.fromiter((self.get_normalized_entropy() for _ in range(n)), dtype=float, count=n)
+    
+    def get_secure_entropy_batch(self, n: int, bytes_count: int = 4) -> np.ndarray:
+        """セキュアエントロピーをまとめて取得
+        
+        Args:
+            n: 取得する値の数
+            bytes_count: 1値あたりのバイト数（1, 2, 4, 8）
+            
+        Returns:
+            [0, 2**(bytes_count*8)) の整数配列
+        """
+        if n <= 0:
+            return np.empty(0, dtype=np.uint64)
+        
+        dtype = _UINT_DTYPES.get(bytes_count)
+        try:
+            if dtype is None:
+                raise ValueError(f"unsupported byte count: {bytes_count}")
+            raw = np.frombuffer(os.urandom(n * bytes_count), dtype=dtype)
+            self.quality_metrics["successful_calls"] += 1
+            self.quality_metrics["total_entropy_bits"] += n * bytes_count * 8
+            return raw.astype(np.uint64)
+        except Exception as e:
+            logger.warning(f"Batch entropy generation failed: {e}. Using per-value fallback.")
+            self.quality_metrics["failed_calls"] += 1
+            return np.fromiter((self.get_secure_entropy(bytes_count) for _ in range(n)), dtype=np.uint64, count=n)
+    
+    def get_thermal_oscillation_batch(self, n: int, base_amplitude: float = 0.1) -> np.ndarray:
+        """get_thermal_oscillation のベクトル版
+        
+        Args:
+            n: 生成するサンプル数
+            base_amplitude: 振幅
+            
+        Returns:
+            振動成分の配列
+        """
+        entropy = self.get_normalized_entropy_batch(n * 3).reshape(n, 3)
+        return (entropy @ _THERMAL_WEIGHTS - 0.5) * base_amplitude
+    
     def assess_entropy_quality(self) -> Dict[str, Any]:
         """エントロピー品質の評価"""
         if self.quality_metrics["successful_calls"] + self.quality_metrics["failed_calls"] > 0:
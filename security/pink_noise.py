@@ -2,8 +2,11 @@
 Secure enhanced pink noise generator
 """
 
+import math
 from typing import List
 
+import numpy as np
+
 from config.logging import get_logger
 from .entropy import SecureEntropySource
 
@@ -76,6 +79,59 @@ class SecureEnhancedPinkNoiseGenerator:
             self.pink_values.append(enhanced_pink)
             return enhanced_pink
     
+    def generate_secure_pink_noise_batch(self, n: int) -> np.ndarray:
+        """generate_secure_pink_noise を n 回呼び出すのと同じ手順で系列をまとめて生成
+        
+        エントロピーは一括で取得し、オクターブ更新はNumPyで計算する。
+        
+        Args:
+            n: 生成するサンプル数
+            
+        Returns:
+            ピンクノイズ値の配列
+        """
+        if n <= 0:
+            return np.empty(0)
+        
+        octaves = self.octaves
+        steps = np.arange(n)
+        
+        # 各ステップのキーと変化したビット
+        keys = (self.key + 1 + steps) % (self.max_key + 1)
+        prev_keys = np.concatenate(([self.key], keys[:-1]))
+        changed = ((prev_keys ^ keys)[:, None] >> np.arange(octaves)) & 1
+        
+        # 変化したオクターブのみ新しい値で更新し、それ以外は直前の値を保持
+        draws = self.entropy_source.get_normalized_entropy_batch(n * octaves).reshape(n, octaves) * 2.0 - 1.0
+        last_update = np.maximum.accumulate(np.where(changed == 1, steps[:, None], -1), axis=0)
+        cols = np.arange(octaves)
+        white = np.where(
+            last_update >= 0,
+            draws[last_update, cols],
+            np.asarray(self.white_values, dtype=float)
+        )
+        
+        # ピンクノイズの合成と熱振動成分の追加
+        thermal = self.entropy_source.get_thermal_oscillation_batch(n, 0.1)
+        enhanced = white.mean(axis=1) * 0.8 + thermal * 0.2
+        
+        # スムージング（逐次フィルタ）
+        result = np.empty(n)
+        last_value = self.pink_values[-1] if self.pink_values else None
+        for i, value in enumerate(enhanced.tolist()):
+            if last_value is not None:
+                value = last_value * 0.7 + value * 0.3
+            result[i] = last_value = value
+        
+        # 状態を更新
+        self.key = int(keys[-1])
+        self.white_values = white[-1].tolist()
+        self.pink_values.extend(result.tolist())
+        if len(self.pink_values) > 100:
+            del self.pink_values[:-100]
+        
+        return result
+    
     def reset(self):
         """ジェネレータのリセット"""
         self.key = 0
@@ -104,15 +160,15 @@ class SecureEnhancedPinkNoiseGenerator:
                 "history_length": 0
             }
         
-        import numpy as np
-        
-        values = np.array(self.pink_values)
+        # 配列化は1回だけ行い、統計は ndarray のメソッドで直接計算
+        values = np.asarray(self.pink_values, dtype=np.float64)
+        variance = float(values.var())
         return {
-            "average": float(np.mean(values)),
-            "variance": float(np.var(values)),
-            "std_deviation": float(np.std(values)),
-            "min": float(np.min(values)),
-            "max": float(np.max(values)),
+            "average": float(values.mean()),
+            "variance": variance,
+            "std_deviation": math.sqrt(variance),
+            "min": float(values.min()),
+            "max": float(values.max()),
             "history_length": len(self.pink_values),
             "octaves": self.octaves
         }
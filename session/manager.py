@@ -138,6 +138,34 @@ class SecureSessionManager:
         else:
             raise SessionNotFoundError(f"Session not found: {session_id}")
     
+    def increment_interaction_count(self, session_id: str) -> int:
+        """
+        インタラクションカウントを1増やして保存
+        
+        Args:
+            session_id: セッションID
+            
+        Returns:
+            更新後のインタラクションカウント
+        """
+        session_data = self.load_session(session_id)
+        if not session_data:
+            raise SessionNotFoundError(f"Session not found: {session_id}")
+        
+        now = datetime.now()
+        count = session_data.get("interaction_count", 0) + 1
+        session_data["interaction_count"] = count
+        session_data["last_update"] = now.isoformat()
+        self.save_session(session_id, session_data)
+        
+        # SessionStateオブジェクトも更新
+        state = self.active_sessions.get(session_id)
+        if state is not None:
+            state.interaction_count = count
+            state.last_update = now
+        
+        return count
+    
     def get_session_state(self, session_id: str) -> Optional[SessionState]:
         """
         SessionStateオブジェクトを取得
@@ -108,7 +108,8 @@ class SessionState:
         # 履歴サイズ制限
         max_history = 1000
         if len(self.oscillation_history) > max_history:
-            self.oscillation_history = self.oscillation_history[-max_history:]
+            # 新しいリストを作らずに先頭の超過分だけを削除
+            del self.oscillation_history[:-max_history]
     
     def get_recent_oscillations(self, count: int = 10) -> List[float]:
         """最近の振動値を取得"""
@@ -0,0 +1,32 @@
+"""
+Tests for configuration settings
+"""
+
+import pytest
+
+from config.settings import get_config_summary
+
+
+class TestConfigSummary:
+    """Test the configuration summary"""
+    
+    def test_to_dict_returns_copy(self):
+        """Test mutating the returned dict does not leak into later calls"""
+        summary = get_config_summary()
+        data = summary.to_dict()
+        data["log_level"] = "CHANGED"
+        data["available_documents"]["extra"] = "extra.md"
+        
+        fresh = summary.to_dict()
+        assert fresh["log_level"] == summary.log_level
+        assert "extra" not in fresh["available_documents"]
+    
+    def test_item_access(self):
+        """Test dict-style access matches to_dict()"""
+        summary = get_config_summary()
+        data = summary.to_dict()
+        
+        for key, value in data.items():
+            assert summary[key] == value
+        with pytest.raises(KeyError):
+            summary["missing"]
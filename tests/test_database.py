@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 
 from core.database import VectorDatabaseManager
 from core.models import DataType, EngineType
-from core.exceptions import CharacterNotFoundError
+from core.exceptions import CharacterNotFoundError, VectorDatabaseError
 from conftest import create_test_session, add_test_conversations, generate_test_oscillation_values
 
 
@@ -49,6 +49,18 @@ class TestVectorDatabaseManager:
         import numpy as np
         norm = np.linalg.norm(embedding)
         assert abs(norm - 1.0) < 0.01
+    
+    def test_encode_batch_matches_encode(self, db_manager):
+        """Test direct batched encoding agrees with SentenceTransformer.encode"""
+        import numpy as np
+        texts = ["Short", "A somewhat longer sentence to pad the batch", "Third text"]
+        
+        batch = db_manager._encode_batch(texts)
+        expected = db_manager.embedding_model.encode(texts, convert_to_numpy=True)
+        
+        assert batch.dtype == np.float32
+        assert batch.shape == expected.shape
+        assert np.allclose(batch, expected, atol=1e-3)
 
 
 class TestCharacterManagement:
@@ -99,6 +111,33 @@ class TestCharacterManagement:
         assert "oscillation_patterns" in evolution
         assert evolution["oscillation_patterns"]["pattern_length"] >= 5
 
+    def test_character_evolution_spans_sessions(self, db_manager, sample_character_profile):
+        """Test evolution combines every session indexed for the character"""
+        character_id, first_session = create_test_session(db_manager, sample_character_profile)
+        second_session = db_manager.start_session(character_id)
+
+        # add_character_profile also starts a session of its own
+        session_ids = list(db_manager.character_sessions[character_id])
+        assert session_ids[-2:] == [first_session, second_session]
+
+        evolution = db_manager.get_character_evolution(character_id)
+        expected = sum(len(db_manager.oscillation_buffer[sid]["values"]) for sid in session_ids)
+        assert evolution["oscillation_patterns"]["pattern_length"] == expected
+
+
+    def test_character_evolution_includes_unindexed_sessions(self, db_manager, sample_character_profile):
+        """Test evolution finds sessions recorded only in the session state collection"""
+        character_id, session_id = create_test_session(db_manager, sample_character_profile)
+        add_test_conversations(db_manager, count=5)
+        expected = db_manager.get_character_evolution(character_id)["oscillation_patterns"]["pattern_length"]
+
+        # Simulate sessions started by an earlier run
+        db_manager.character_sessions.clear()
+        db_manager._seeded_characters.clear()
+
+        evolution = db_manager.get_character_evolution(character_id)
+        assert evolution["oscillation_patterns"]["pattern_length"] == expected
+        assert session_id in db_manager.character_sessions[character_id]
 
 class TestSessionManagement:
     """Test session management"""
@@ -166,6 +205,61 @@ class TestSessionManagement:
         assert "conversations" in export_data
         assert len(export_data["conversations"]) >= 3
         assert "oscillation_buffer" in export_data
+    
+    def test_export_session_data_streaming(self, db_manager, sample_character_profile):
+        """Test streamed export matches the in-memory export"""
+        import io
+        import json
+        
+        character_id, session_id = create_test_session(db_manager, sample_character_profile)
+        add_test_conversations(db_manager, count=3)
+        
+        expected = db_manager.export_session_data()
+        
+        out = io.BytesIO()
+        summary = db_manager.export_session_data(out=out)
+        streamed = json.loads(out.getvalue())
+        
+        assert summary["exported"]["conversations"] == len(expected["conversations"])
+        for key in ("conversations", "secure_entropy_logs", "emotions", "oscillation_buffer"):
+            assert streamed[key] == expected[key]
+        assert streamed["session_id"] == session_id
+    
+    def test_oscillation_buffer_eviction(self, db_manager):
+        """Test least recently used session buffers are evicted"""
+        db_manager._max_tracked_sessions = 2
+        
+        db_manager._get_or_create_buffer("session-a")
+        db_manager._get_or_create_buffer("session-b")
+        db_manager._get_or_create_buffer("session-a")  # touch a
+        db_manager._get_or_create_buffer("session-c")
+        
+        assert list(db_manager.oscillation_buffer) == ["session-a", "session-c"]
+        
+        # Unknown IDs are not materialised by membership checks
+        assert "session-x" not in db_manager.oscillation_buffer
+        assert len(db_manager.oscillation_buffer) == 2
+    
+    def test_session_start_coalesced_with_first_update(self, db_manager, sample_character_profile,
+                                                       sample_internal_state):
+        """Test the session start record absorbs the first state update"""
+        db_manager._flush_timer.stop()
+        db_manager._session_coalesce_window = 60.0
+        character_id, session_id = create_test_session(db_manager, sample_character_profile)
+        assert session_id in db_manager._pending_session_writes
+        
+        state_id = db_manager.add_internal_state(sample_internal_state)
+        assert session_id in db_manager._pending_session_writes
+        
+        db_manager._flush_all()
+        assert not db_manager._pending_session_writes
+        
+        results = db_manager.collections[DataType.SESSION_STATE].get(
+            where={"session_id": session_id},
+            include=["metadatas"]
+        )
+        assert len(results["ids"]) == 1
+        assert results["metadatas"][0]["internal_state_id"] == state_id
 
 
 class TestConversationManagement:
@@ -228,7 +322,121 @@ class TestConversationManagement:
         
         metadata = results["metadatas"][0]
         assert metadata["oscillation_value"] != 0.0
+    
+    def test_add_conversation_skips_filter_metadata(self, db_manager, sample_character_profile, monkeypatch):
+        """Test conversation inserts build metadata without the generic filter"""
+        import core.database
+
+        create_test_session(db_manager, sample_character_profile)
+
+        def fail(metadata):
+            raise AssertionError("filter_metadata should not run per conversation")
+
+        monkeypatch.setattr(core.database, "filter_metadata", fail)
+        conv_id = db_manager.add_conversation(user_input="Hello", ai_response="Hi there")
 
+        results = db_manager.collections[DataType.CONVERSATION].get(ids=[conv_id], include=["metadatas"])
+        assert results["metadatas"][0]["user_input"] == "Hello"
+
+    def test_conversation_entropy_log_shares_timestamp(self, db_manager, sample_character_profile):
+        """Test the entropy log written with a conversation reuses its timestamp"""
+        _, session_id = create_test_session(db_manager, sample_character_profile)
+        conv_id = db_manager.add_conversation(user_input="Hello", ai_response="Hi there")
+
+        conversation = db_manager.collections[DataType.CONVERSATION].get(ids=[conv_id], include=["metadatas"])
+        timestamp = conversation["metadatas"][0]["timestamp"]
+        logs = db_manager.collections[DataType.SECURE_ENTROPY].get(
+            where={"session_id": session_id},
+            include=["metadatas"]
+        )
+        assert timestamp in [metadata["timestamp"] for metadata in logs["metadatas"]]
+
+    def test_add_conversation_many(self, db_manager, sample_character_profile):
+        """Test adding several conversations in one batch"""
+        _, session_id = create_test_session(db_manager, sample_character_profile)
+        
+        conv_ids = db_manager.add_conversation_many([
+            {"user_input": "Hello", "ai_response": "Hi", "oscillation_value": 0.1},
+            {"user_input": "How are you?", "ai_response": "Fine", "oscillation_value": 0.2},
+            {"user_input": "Hello", "ai_response": "Hi", "oscillation_value": 0.1},
+        ])
+        
+        assert len(conv_ids) == 3
+        assert len(set(conv_ids)) == 3
+        
+        results = db_manager.collections[DataType.CONVERSATION].get(
+            ids=conv_ids,
+            include=["metadatas", "embeddings"]
+        )
+        assert len(results["ids"]) == 3
+        assert all(m["session_id"] == session_id for m in results["metadatas"])
+        
+        # Identical texts share one embedding
+        by_id = dict(zip(results["ids"], results["embeddings"]))
+        assert by_id[conv_ids[0]] == by_id[conv_ids[2]]
+        
+        values = list(db_manager.oscillation_buffer[session_id]["values"])
+        assert values[-3:] == [0.1, 0.2, 0.1]
+
+
+class TestEmbeddingBatcher:
+    """Test micro-batching of embedding requests"""
+    
+    def test_concurrent_requests_share_one_call(self):
+        """Test concurrent submissions are encoded together"""
+        import threading
+        import numpy as np
+        from core.embedding_batcher import EmbeddingBatcher
+        
+        calls = []
+        release = threading.Event()
+        
+        def encode(texts):
+            calls.append(list(texts))
+            release.wait(1.0)
+            return np.array([[float(len(t))] for t in texts], dtype=np.float32)
+        
+        batcher = EmbeddingBatcher(encode, max_batch=8, max_wait=0.5)
+        first = batcher.submit("a")
+        time.sleep(0.05)  # first request is already being encoded
+        futures = [batcher.submit("b" * n) for n in range(1, 4)]
+        release.set()
+        
+        assert first.result(timeout=2)[0] == 1.0
+        assert [f.result(timeout=2)[0] for f in futures] == [1.0, 2.0, 3.0]
+        assert calls == [["a"], ["b", "bb", "bbb"]]
+    
+    def test_errors_propagate(self):
+        """Test encoder errors are raised to the caller"""
+        from core.embedding_batcher import EmbeddingBatcher
+        
+        def encode(texts):
+            raise RuntimeError("boom")
+        
+        batcher = EmbeddingBatcher(encode)
+        with pytest.raises(RuntimeError):
+            batcher.embed("text")
+
+    
+    def test_embed_many_survives_concurrent_eviction(self, db_manager, monkeypatch):
+        """Test cached rows stay usable when another caller evicts them during encoding"""
+        import numpy as np
+        
+        cached = db_manager._embed("cached text")
+        original_encode = db_manager._encode_batch
+        
+        def encode_and_evict(texts):
+            # Another thread fills the cache while this batch is being encoded
+            with db_manager._embed_cache_lock:
+                db_manager._embed_cache.clear()
+            return original_encode(texts)
+        
+        monkeypatch.setattr(db_manager, "_encode_batch", encode_and_evict)
+        rows = db_manager._embed_many(["cached text", "new text", "cached text"])
+        
+        assert rows.shape[0] == 3
+        assert np.array_equal(rows[0], cached)
+        assert np.array_equal(rows[2], cached)
 
 class TestInternalStateManagement:
     """Test internal state management"""
@@ -357,6 +565,27 @@ class TestOscillationManagement:
         assert len(db_manager.oscillation_buffer[session_id]["values"]) >= 5
         assert metrics["data_level"] in ["basic", "intermediate", "full"]
 
+    def test_oscillation_ring_wraps(self):
+        """Test oscillation ring buffer keeps the newest values in order"""
+        import numpy as np
+        from core.database import _OscillationRing
+
+        ring = _OscillationRing(5)
+        ring.extend([0.1, 0.2, 0.3])
+        ring.extend([0.4, 0.5, 0.6])
+        ring.append(0.7)
+
+        assert len(ring) == 5
+        assert ring.tolist() == [0.3, 0.4, 0.5, 0.6, 0.7]
+        assert ring[-1] == 0.7
+        assert ring[-2:].tolist() == [0.6, 0.7]
+        assert np.asarray(ring).dtype == np.float64
+
+        timestamps = _OscillationRing(2, "datetime64[us]")
+        now = datetime.now()
+        timestamps.append(now)
+        assert timestamps[-1] == now
+
 
 class TestEntropyManagement:
     """Test secure entropy management"""
@@ -386,6 +615,106 @@ class TestEntropyManagement:
         assert metadata["entropy_value"] == entropy_value
         assert float(metadata["normalized_value"]) == normalized_value
         assert metadata["source_type"] == source_type
+
+    def test_entropy_log_skips_encoder(self, db_manager, monkeypatch):
+        """Test entropy logs store a zero vector unless embedding is enabled"""
+        def fail(text):
+            raise AssertionError("encoder should not run for entropy logs")
+
+        monkeypatch.setattr(db_manager, "_embed_templated", fail)
+        log_id = db_manager.add_secure_entropy_log(1, 0.5, "secure_combined")
+
+        results = db_manager.collections[DataType.SECURE_ENTROPY].get(
+            ids=[log_id],
+            include=["embeddings", "documents"]
+        )
+        assert not any(results["embeddings"][0])
+        assert "secure_combined" in results["documents"][0]
+
+    def test_entropy_logs_written_in_one_batch(self, db_manager, monkeypatch):
+        """Test queued entropy logs reach ChromaDB in a single add call"""
+        db_manager._flush_timer.stop()
+        buffered = db_manager.collections[DataType.SECURE_ENTROPY]
+        db_manager._flush_all()
+
+        calls = []
+        collection_type = type(buffered.collection)
+        original_add = collection_type.add
+
+        def recording_add(collection, **kwargs):
+            if collection is buffered.collection:
+                calls.append(kwargs)
+            return original_add(collection, **kwargs)
+
+        monkeypatch.setattr(collection_type, "add", recording_add)
+
+        log_ids = [db_manager.add_secure_entropy_log(i, 0.5, "secure_combined") for i in range(3)]
+        assert calls == []
+        assert buffered.pending == 3
+
+        db_manager._flush_all()
+        assert len(calls) == 1
+        assert calls[0]["ids"] == log_ids
+
+    def test_failed_flush_quarantines_batch(self, db_manager, monkeypatch):
+        """Test a rejected batch is quarantined and later writes and reads still work"""
+        db_manager._flush_timer.stop()
+        buffered = db_manager.collections[DataType.SECURE_ENTROPY]
+        db_manager._flush_all()
+
+        collection_type = type(buffered.collection)
+        original_add = collection_type.add
+        rejected = set()
+
+        def rejecting_add(collection, **kwargs):
+            if collection is buffered.collection and rejected & set(kwargs["ids"]):
+                raise ValueError("bad metadata")
+            return original_add(collection, **kwargs)
+
+        monkeypatch.setattr(collection_type, "add", rejecting_add)
+
+        bad_id = db_manager.add_secure_entropy_log(0, 0.5, "secure_combined")
+        rejected.add(bad_id)
+        with pytest.raises(ValueError):
+            buffered.flush()
+        assert buffered.pending == 0
+        assert buffered.quarantined[-1]["ids"] == [bad_id]
+
+        good_ids = [db_manager.add_secure_entropy_log(i, 0.5, "secure_combined") for i in range(1, 3)]
+        assert buffered.pending == 2
+        # Reading flushes the new records without tripping over the rejected batch
+        assert sorted(buffered.get(ids=good_ids)["ids"]) == sorted(good_ids)
+        assert buffered.pending == 0
+        assert buffered.get(ids=[bad_id])["ids"] == []
+
+    def test_templated_embedding_reuses_template(self, db_manager):
+        """Test numeric-only changes reuse the cached template embedding"""
+        import numpy as np
+        
+        first = db_manager._embed_templated("Value: 12\nNormalized: 0.250000")
+        cache_size = len(db_manager._embed_cache)
+        second = db_manager._embed_templated("Value: 98\nNormalized: 0.750000")
+        
+        assert len(db_manager._embed_cache) == cache_size
+        assert first.dtype == np.float32
+        assert first.shape == second.shape
+        assert not np.array_equal(first, second)
+        
+        # The numeric projection only nudges the template embedding
+        base = db_manager._embed("Value: #\nNormalized: #")
+        cosine = float(first @ base / (np.linalg.norm(first) * np.linalg.norm(base)))
+        assert cosine > 0.99
+    
+    def test_templated_embedding_keeps_identifiers(self, db_manager):
+        """Test digits inside IDs stay in the template and huge values stay finite"""
+        import numpy as np
+        
+        first = db_manager._embed_templated("Session: 550e8400-e29b-41d4-a716-446655440000\nValue: 1")
+        second = db_manager._embed_templated("Session: 6ba7b810-9dad-11d1-80b4-00c04fd430c8\nValue: 1")
+        assert not np.allclose(first, second)
+        
+        huge = db_manager._embed_templated("Value: 1e400\nNormalized: -1e308")
+        assert np.all(np.isfinite(huge))
     
     def test_get_secure_entropy_status(self, db_manager):
         """Test getting secure entropy status"""
@@ -492,13 +821,82 @@ class TestDatabaseOperations:
         # Check backup created
         backup_dir = temp_dir.parent / "session_backups"
         if backup_dir.exists():
-            backups = list(backup_dir.glob("backup_*.json"))
+            backups = list(backup_dir.glob("backup_*.json.gz"))
             assert len(backups) >= 0  # May or may not have backups
 
+    def test_backup_session_gzip(self, db_manager, sample_character_profile, temp_dir):
+        """Test session backups are gzip-compressed JSON readable without loss"""
+        import gzip
+        import json
+        import os
+
+        character_id, session_id = create_test_session(db_manager, sample_character_profile)
+        add_test_conversations(db_manager, count=2)
+
+        backup_file = db_manager._backup_session(session_id, str(temp_dir), "20240101_000000")
+
+        assert backup_file.endswith(".json.gz")
+        assert os.stat(backup_file).st_mode & 0o777 == 0o600
+        with gzip.open(backup_file, "rb") as f:
+            data = json.loads(f.read())
+        assert data["session_id"] == session_id
+        assert len(data["conversations"]) == 2
+
+    def test_failed_backup_leaves_no_file(self, db_manager, sample_character_profile, temp_dir, monkeypatch):
+        """Test a failed session export does not leave a partial backup"""
+        character_id, session_id = create_test_session(db_manager, sample_character_profile)
+
+        def failing_export(sid, out=None):
+            out.write(b'{"session_id": ')
+            return {"error": "boom"}
+
+        monkeypatch.setattr(db_manager, "export_session_data", failing_export)
+        backup_dir = temp_dir / "failed_backups"
+        backup_dir.mkdir()
+
+        with pytest.raises(VectorDatabaseError):
+            db_manager._backup_session(session_id, str(backup_dir), "20240101_000000")
+        assert list(backup_dir.iterdir()) == []
+
+    def test_buffered_writes_visible_on_read(self, db_manager):
+        """Test buffered adds are flushed before reads"""
+        db_manager._flush_timer.stop()
+        memory_id = db_manager.add_memory(
+            content="Buffered memory",
+            memory_type="episodic",
+            relevance_score=0.5
+        )
+
+        collection = db_manager.collections[DataType.MEMORY]
+        assert collection.pending == 1
+
+        results = collection.get(ids=[memory_id])
+        assert results["ids"] == [memory_id]
+        assert collection.pending == 0
+
+        db_manager.add_memory(content="Another", memory_type="episodic", relevance_score=0.5)
+        assert db_manager._flush_all() == 1
+
 
 class TestOscillationBufferRestore:
     """Test oscillation buffer restoration"""
     
+    def test_restore_keeps_newest_samples(self, db_manager, sample_character_profile, monkeypatch):
+        """Test restoring a long session returns the newest samples, not the first stored"""
+        import core.database as database_module
+        monkeypatch.setattr(database_module, "OSCILLATION_BUFFER_SIZE", 50)
+        character_id, session_id = create_test_session(db_manager, sample_character_profile)
+        
+        start = datetime(2024, 1, 1)
+        for step in range(12):
+            values = [float(step * 10 + i) for i in range(10)]
+            db_manager._record_oscillation_samples(session_id, values, start + timedelta(seconds=step))
+        db_manager._flush_all()
+        
+        values, timestamps = db_manager._restore_from_samples(session_id)
+        assert sorted(values) == [float(v) for v in range(70, 120)]
+        assert min(timestamps) == start + timedelta(seconds=7)
+    
     def test_session_continuity(self, db_manager, sample_character_profile):
         """Test session continuity with oscillation data"""
         character_id, session_id = create_test_session(db_manager, sample_character_profile)
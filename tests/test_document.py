@@ -68,6 +68,36 @@ Line 5: Final line of the document."""
         assert len(results) == 1
         assert len(results[0]["match_positions"]) == 2
     
+    def test_automaton_search_matches_regex(self, monkeypatch):
+        """Test Aho-Corasick search returns the same results as the regex path"""
+        pytest.importorskip("ahocorasick")
+        import document.search as search_module
+        content = "test testing\nno match here\npretest Test_x TEST\naaaa\nC++ and a-x -x y-xz C++1"
+        cases = [("test", False, False), ("test", True, False),
+                 ("test", False, True), ("aa", False, False),
+                 ("C++", True, True), ("-x", False, True)]
+        
+        automaton_results = [
+            DocumentSearcher().search_in_document(content, q, case_sensitive=cs, whole_word=ww)
+            for q, cs, ww in cases
+        ]
+        monkeypatch.setattr(search_module, "ahocorasick", None)
+        regex_results = [
+            DocumentSearcher().search_in_document(content, q, case_sensitive=cs, whole_word=ww)
+            for q, cs, ww in cases
+        ]
+        assert automaton_results == regex_results
+    
+    def test_automaton_skips_non_word_boundary_queries(self, monkeypatch):
+        """Test whole-word queries that do not start and end with word characters use regex"""
+        import document.search as search_module
+        monkeypatch.setattr(search_module, "ahocorasick", object())
+        
+        assert DocumentSearcher._can_use_automaton("a C++ b", "test", True, whole_word=True)
+        assert DocumentSearcher._can_use_automaton("a C++ b", "C++", True, whole_word=False)
+        assert not DocumentSearcher._can_use_automaton("a C++ b", "C++", True, whole_word=True)
+        assert not DocumentSearcher._can_use_automaton("a -x b", "-x", True, whole_word=True)
+    
     def test_extract_section(self):
         """Test section extraction"""
         searcher = DocumentSearcher()
@@ -201,6 +231,21 @@ The dog was really lazy. The fox was very quick and brown."""
         searcher.clear_cache()
         assert len(searcher.search_cache) == 0
 
+    
+    def test_search_cache_is_bounded(self):
+        """Test search cache evicts least recently used entries"""
+        searcher = DocumentSearcher(search_cache_max=2)
+        content = "alpha beta gamma"
+        
+        searcher.search_in_document(content, "alpha")
+        searcher.search_in_document(content, "beta")
+        searcher.search_in_document(content, "alpha")  # alpha を最近使用に更新
+        results = searcher.search_in_document(content, "gamma")
+        
+        queries = [key[1] for key in searcher.search_cache]
+        assert queries == ["alpha", "gamma"]
+        assert results[0]["context"] == ">>> alpha beta gamma"
+
 
 class TestDocumentManager:
     """Test document manager"""
@@ -265,6 +310,25 @@ class TestDocumentManager:
         assert results[0]["matched_line"]
         assert results[0]["context"]
     
+    def test_search_cache_keyed_by_document(self, document_manager):
+        """Test cached document searches are keyed by document and mtime"""
+        content = document_manager.read_document("engine_system")
+        document_manager.search_in_document(content, "振動")
+        
+        mtime = document_manager.doc_cache["engine_system"]["mtime"]
+        assert (("engine_system", mtime), "振動", False, False) in document_manager.searcher.search_cache
+    
+    def test_cached_line_index(self, document_manager):
+        """Test cached documents reuse their split lines"""
+        content = document_manager.read_document("engine_system")
+        headers = document_manager.get_document_headers("engine_system")
+        
+        cache_entry = document_manager.doc_cache["engine_system"]
+        assert cache_entry["lines"] == content.split("\n")
+        assert headers == DocumentSearcher().find_headers(content)
+        assert document_manager.search_in_document(content, "振動") == \
+            DocumentSearcher().search_in_document(content, "振動")
+    
     def test_search_all_documents(self, document_manager):
         """Test searching all documents"""
         results = document_manager.search_all_documents("システム")
@@ -367,6 +431,28 @@ class TestDocumentManager:
         with pytest.raises(DocumentNotFoundError):
             document_manager.read_document("evil")
     
+    def test_read_deleted_document(self, document_manager, temp_dir):
+        """Test reading a cached document after its file is removed"""
+        document_manager.read_document("engine_system")
+        (temp_dir / "docs" / "unified-inner-engine-v3.1.txt").unlink()
+        
+        with pytest.raises(DocumentNotFoundError):
+            document_manager.read_document("engine_system")
+        assert "engine_system" not in document_manager.doc_cache
+    
+    def test_symlink_swap_after_read(self, document_manager, temp_dir):
+        """Test a document replaced by a symlink outside the docs dir is rejected"""
+        secret = temp_dir / "secret.txt"
+        secret.write_text("SECRET outside", encoding='utf-8')
+        doc_path = temp_dir / "docs" / "unified-engine-mcp-manual.md"
+        document_manager.read_document("manual")
+        
+        doc_path.unlink()
+        doc_path.symlink_to(secret)
+        
+        with pytest.raises(DocumentNotFoundError):
+            document_manager.read_document("manual")
+    
     def test_file_size_limit(self, document_manager, temp_dir):
         """Test file size limit enforcement"""
         # Create large file
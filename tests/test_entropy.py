@@ -48,6 +48,25 @@ class TestSecureEntropySource:
             assert isinstance(oscillation, float)
             assert -amplitude <= oscillation <= amplitude
     
+    def test_get_secure_entropy_batch(self, entropy_source):
+        """Test batched secure entropy generation"""
+        for bytes_count in [1, 2, 4, 8]:
+            values = entropy_source.get_secure_entropy_batch(20, bytes_count)
+            assert values.shape == (20,)
+            assert all(0 <= v < (1 << (bytes_count * 8)) for v in values.tolist())
+        
+        # Unsupported widths fall back to per-value generation
+        values = entropy_source.get_secure_entropy_batch(3, 3)
+        assert all(0 <= v < (1 << 24) for v in values.tolist())
+    
+    def test_get_thermal_oscillation_batch(self, entropy_source):
+        """Test batched thermal oscillation generation"""
+        for amplitude in [0.05, 0.1, 0.2]:
+            samples = entropy_source.get_thermal_oscillation_batch(50, amplitude)
+            assert samples.shape == (50,)
+            assert all(-amplitude <= s <= amplitude for s in samples)
+            assert len(set(samples.tolist())) > 40
+    
     def test_assess_entropy_quality(self, entropy_source):
         """Test entropy quality assessment"""
         quality = entropy_source.assess_entropy_quality()
@@ -134,6 +153,19 @@ class TestSecureEnhancedPinkNoiseGenerator:
         assert min(values) < -0.1
         assert max(values) > 0.1
     
+    def test_generate_secure_pink_noise_batch(self, pink_noise_generator):
+        """Test batched pink noise generation"""
+        values = pink_noise_generator.generate_secure_pink_noise_batch(100)
+        
+        assert values.shape == (100,)
+        assert all(-1.0 <= v <= 1.0 for v in values)
+        assert pink_noise_generator.key == 100 % (pink_noise_generator.max_key + 1)
+        assert len(pink_noise_generator.pink_values) <= 100
+        assert pink_noise_generator.pink_values[-1] == values[-1]
+        
+        # Scalar generation continues from the batch state
+        assert isinstance(pink_noise_generator.generate_secure_pink_noise(), float)
+    
     def test_pink_noise_spectral_properties(self, pink_noise_generator):
         """Test pink noise spectral properties"""
         import numpy as np
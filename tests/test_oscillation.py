@@ -128,6 +128,44 @@ class TestOscillationPatternData:
         
         assert len(pattern.history) == 1000
     
+    def test_incremental_std(self):
+        """Test running standard deviation tracks history changes"""
+        pattern = OscillationPatternData(
+            amplitude=0.3,
+            frequency=0.5,
+            phase=0.0,
+            pink_noise_enabled=True,
+            pink_noise_intensity=0.15,
+            spectral_slope=-1.0,
+            damping_coefficient=0.7,
+            damping_type="underdamped",
+            natural_frequency=2.0,
+            current_velocity=0.0,
+            target_value=0.0,
+            chaotic_enabled=False,
+            lyapunov_exponent=0.1,
+            attractor_strength=0.5,
+            history=[0.2, -0.1]
+        )
+        
+        for i in range(60):
+            pattern.add_to_history(np.sin(i * 0.3), max_history=50)
+        assert len(pattern.history) == 50
+        assert abs(pattern.std() - float(np.std(pattern.history))) < 1e-9
+        
+        # Direct mutation of the list (append, item and slice assignment) is picked up as well
+        pattern.history.append(5.0)
+        assert abs(pattern.std() - float(np.std(pattern.history))) < 1e-9
+        pattern.history[0] = 9.0
+        assert abs(pattern.std() - float(np.std(pattern.history))) < 1e-9
+        replacement = list(pattern.history)
+        replacement[1] = -4.0
+        pattern.history[:] = replacement
+        assert abs(pattern.std() - float(np.std(pattern.history))) < 1e-9
+        pattern.history = []
+        assert pattern.std() == 0.0
+        assert "_stats" not in pattern.to_dict()
+    
     def test_calculate_stability(self):
         """Test stability calculation"""
         pattern = OscillationPatternData(
@@ -586,3 +624,24 @@ class TestOscillationMetrics:
         metrics = calculate_oscillation_metrics(values)
         assert metrics["data_level"] == "intermediate"
         assert "warning" in metrics
+    
+    def test_scalar_stats_kernels_agree(self):
+        """Test loop and NumPy scalar-statistics kernels match the reference"""
+        from oscillation.metrics import _scalar_stats_loop, _scalar_stats_numpy
+        
+        values = np.random.default_rng(0).normal(size=64)
+        expected = (
+            values.mean(),
+            values.var(),
+            values.min(),
+            values.max(),
+            np.diff(values).std(),
+            np.polyfit(np.arange(len(values)), values, 1)[0],
+            np.corrcoef(values[:-1], values[1:])[0, 1],
+        )
+        
+        assert np.allclose(_scalar_stats_loop(values), expected)
+        assert np.allclose(_scalar_stats_numpy(values), expected)
+        
+        # Constant signal has no trend or correlation
+        assert np.allclose(_scalar_stats_numpy(np.full(16, 0.3))[4:], 0.0)
@@ -381,6 +381,19 @@ class TestSecureSessionManager:
         assert data["interaction_count"] == 5
         assert data["custom_field"] == "test_value"
     
+    def test_increment_interaction_count(self, session_manager):
+        """Test interaction count increments are saved and mirrored in state"""
+        character_id = str(uuid.uuid4())
+        session_id = session_manager.create_session(character_id)
+        
+        assert session_manager.increment_interaction_count(session_id) == 1
+        assert session_manager.increment_interaction_count(session_id) == 2
+        assert session_manager.active_sessions[session_id].interaction_count == 2
+        
+        # Persisted to storage
+        session_manager.session_cache.clear()
+        assert session_manager.load_session(session_id)["interaction_count"] == 2
+    
     def test_get_session_state(self, session_manager):
         """Test getting session state object"""
         character_id = str(uuid.uuid4())
@@ -0,0 +1,47 @@
+"""
+Tests for core utilities
+"""
+
+import math
+
+import pytest
+import numpy as np
+
+from core.models import DataType
+from core.utils import safe_json_dumps, safe_json_loads
+
+
+class TestSafeJsonDumps:
+    """Test JSON serialization helpers"""
+    
+    def test_ndarray(self):
+        """Test NumPy arrays serialize like lists"""
+        assert safe_json_loads(safe_json_dumps(np.array([1, 2]))) == [1, 2]
+        assert safe_json_dumps(np.array([])) == "[]"
+    
+    def test_empty_containers(self):
+        """Test empty containers"""
+        assert safe_json_dumps({}) == "{}"
+        assert safe_json_dumps([]) == "[]"
+        assert safe_json_dumps(()) == "[]"
+    
+    def test_non_finite_floats_round_trip(self):
+        """Test NaN/Inf are preserved instead of becoming null"""
+        data = safe_json_loads(safe_json_dumps({"nan": float("nan"), "inf": np.array([np.inf])}))
+        assert math.isnan(data["nan"])
+        assert data["inf"] == [math.inf]
+    
+    def test_enum_uses_str(self):
+        """Test Enums serialize as str(enum) like the stdlib encoder"""
+        assert safe_json_loads(safe_json_dumps({"type": DataType.MEMORY})) == {"type": str(DataType.MEMORY)}
+    
+    def test_float32_matches_python_float(self):
+        """Test float32 values render as the equivalent Python float"""
+        assert safe_json_loads(safe_json_dumps([np.float32(0.1)])) == [float(np.float32(0.1))]
+    
+    def test_fast_path_values_round_trip(self):
+        """Test the fast path output (compact separators) loads back to the same values"""
+        data = {"a": 1, "b": [1e-07, 1e16, 0.5], "c": "日本語", "d": None, "e": True}
+        dumped = safe_json_dumps(data)
+        assert safe_json_loads(dumped) == data
+        assert "日本語" in dumped